@@ -1,6 +1,26 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def repair_search_index(sender, using, **kwargs):
+    from .search import repair_index
+
+    repair_index(connections[using])
 
 
 class BooksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'books' 
\ No newline at end of file
+    name = 'books'
+
+    def ready(self):
+        from bookswap import viewcache
+        from mediastore.references import track
+        from users.models import User
+        from . import cache as book_cache
+        from . import signals  # noqa: F401
+
+        track(self.get_model('Book'), 'cover_image', 'cover_variants')
+        viewcache.register(self.get_model('Book'), book_cache.invalidate_books)
+        viewcache.register(User, book_cache.invalidate_owners)
+        post_migrate.connect(repair_search_index, sender=self)
@@ -0,0 +1,135 @@
+"""
+Search-as-you-type suggestions for book titles and authors.
+
+Suggestions are read from ``BookSuggestion``, a prefix index of normalized
+titles and authors kept up to date by the signals in ``books/signals.py``.
+Hot prefixes are served from a small in-process LRU cache.
+"""
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import BookSuggestion
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 20
+
+CACHE_SIZE = 1024
+CACHE_TTL = 60
+
+# Upper bound for a prefix range scan: every string starting with the prefix
+# sorts before ``prefix + PREFIX_END``.
+PREFIX_END = '\U0010ffff'
+
+# Queries this short are looked up by the stored prefix of that length,
+# whose index is ordered by popularity; longer ones scan a narrower range
+# of ``normalized`` and sort it.
+SHORT_PREFIX_FIELDS = {1: 'prefix1', 2: 'prefix2'}
+
+
+def normalize(text):
+    """Lowercase, strip accents and collapse punctuation/whitespace."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    words = ''.join(ch if ch.isalnum() else ' ' for ch in text.casefold()).split()
+    return ' '.join(words)[:200]
+
+
+def short_prefixes(normalized):
+    """Return the ``BookSuggestion`` short prefix fields for ``normalized``."""
+    return {field: normalized[:length] for length, field in SHORT_PREFIX_FIELDS.items()}
+
+
+class PrefixCache:
+    """Thread-safe LRU cache with a time-to-live, bounded to ``maxsize`` entries."""
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+cache = PrefixCache()
+
+
+def suggest(query, limit=DEFAULT_LIMIT):
+    """Return up to ``limit`` distinct titles/authors starting with ``query``."""
+    prefix = normalize(query)
+    if not prefix:
+        return []
+
+    key = (prefix, limit)
+    results = cache.get(key)
+    if results is not None:
+        return results
+
+    rows = BookSuggestion.objects.filter(book_count__gt=0)
+    field = SHORT_PREFIX_FIELDS.get(len(prefix))
+    if field:
+        rows = rows.filter(**{field: prefix})
+    else:
+        rows = rows.filter(normalized__gte=prefix, normalized__lt=prefix + PREFIX_END)
+    rows = rows.order_by('-book_count', 'normalized').values_list('text', flat=True)
+
+    results = []
+    seen = set()
+    # A title and an author may normalize to the same string; over-fetch so
+    # de-duplicating still fills the page.
+    for text in rows[:limit * 2]:
+        folded = text.casefold()
+        if folded not in seen:
+            seen.add(folded)
+            results.append(text)
+            if len(results) == limit:
+                break
+
+    cache.set(key, results)
+    return results
+
+
+def adjust(kind, text, delta):
+    """Add ``delta`` to the book count of a title or author suggestion."""
+    normalized = normalize(text)
+    if not normalized:
+        return
+
+    suggestions = BookSuggestion.objects.filter(kind=kind, normalized=normalized)
+    if suggestions.update(book_count=F('book_count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            BookSuggestion.objects.create(
+                kind=kind, normalized=normalized, text=text.strip()[:200], book_count=delta,
+                **short_prefixes(normalized),
+            )
+    except IntegrityError:
+        # Created concurrently by another request.
+        suggestions.update(book_count=F('book_count') + delta)
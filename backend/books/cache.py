@@ -0,0 +1,82 @@
+"""
+Cache scopes of book responses (see ``bookswap.viewcache``).
+
+A list is filed under one scope: the most selective of its owner, genre,
+condition and availability filters, or ``all``. Any book in such a list
+has that value before or after a change, so bumping the scopes of a
+book's old and new values, ``all`` and ``book:<id>`` reaches every
+response showing it. Owners are nested in book responses, so profile
+changes bump the scopes of the owner's books too.
+"""
+from bookswap import viewcache
+
+from .models import Book
+
+SCOPE_FIELDS = ('id', 'owner_id', 'genre', 'condition', 'is_available')
+
+# Query parameters narrowing a list to one scope, most selective first.
+FILTER_SCOPES = (
+    ('owner', 'owner'),
+    ('genre', 'genre'),
+    ('condition', 'condition'),
+    ('is_available', 'available'),
+    ('available', 'available'),
+)
+
+
+def _flag(value):
+    return 'true' if value else 'false'
+
+
+def book_scopes(pk, owner_id, genre, condition, is_available):
+    return [
+        f'book:{pk}', f'owner:{owner_id}', f'genre:{genre}',
+        f'condition:{condition}', f'available:{_flag(is_available)}',
+    ]
+
+
+def list_scope(params, owner_id=None, available=None):
+    """Return the scope of a list filtered by ``params`` (plus the action's own filters)."""
+    if owner_id is not None:
+        return f'owner:{owner_id}'
+    for param, scope in FILTER_SCOPES:
+        value = params.get(param)
+        if not value:
+            continue
+        if scope == 'owner' and not value.isdigit():
+            continue
+        if scope == 'available':
+            if value not in ('true', 'false'):
+                continue
+            if param == 'available' and value == 'false':
+                # ``?available=false`` does not filter at all.
+                continue
+        return f'{scope}:{value}'
+    if available is not None:
+        return f'available:{_flag(available)}'
+    return 'all'
+
+
+def invalidate_rows(rows):
+    """Invalidate the scopes of ``(id, owner_id, genre, condition, is_available)`` rows."""
+    scopes = ['all']
+    for row in rows:
+        scopes.extend(book_scopes(*row))
+    viewcache.invalidate(scopes)
+
+
+def invalidate_books(pks):
+    """
+    Invalidate books by primary key after a bulk change. Both availability
+    scopes go, since that is what bulk updates flip; code moving books to
+    other owners or categories calls this before the change as well.
+    """
+    invalidate_rows(Book.objects.filter(pk__in=list(pks)).values_list(*SCOPE_FIELDS))
+    viewcache.invalidate(['available:true', 'available:false'])
+
+
+def invalidate_owners(user_ids):
+    """Invalidate every response nesting the profiles of ``user_ids``."""
+    user_ids = list(user_ids)
+    invalidate_rows(Book.objects.filter(owner_id__in=user_ids).values_list(*SCOPE_FIELDS))
+    viewcache.invalidate(f'owner:{user_id}' for user_id in user_ids)
@@ -0,0 +1,101 @@
+"""
+Per-genre, per-condition and availability counts for the filter sidebar.
+
+``BookFacetCount`` holds one row per (genre, condition, is_available)
+combination and is kept up to date by the signals in ``books/signals.py``,
+so facets for the plain genre/condition/availability filters never touch
+the books table. Any other filter context is answered with one grouped
+aggregate over the filtered queryset.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import Book, BookFacetCount
+
+
+BOOLEAN_VALUES = {'true': True, 'True': True, 'false': False, 'False': False}
+
+
+def stored_filters(params):
+    """
+    Translate list query params into ``BookFacetCount`` filters.
+
+    Returns None when the params need the books table (search, owner, or a
+    value the counts table cannot answer).
+    """
+    if params.get('search', '').strip() or params.get('owner'):
+        return None
+
+    filters = {}
+    for field, choices in (('genre', Book.GENRE_CHOICES), ('condition', Book.CONDITION_CHOICES)):
+        value = params.get(field)
+        if value:
+            if value not in dict(choices):
+                return None
+            filters[field] = value
+
+    availability = params.get('is_available')
+    if availability:
+        if availability not in BOOLEAN_VALUES:
+            return None
+        filters['is_available'] = BOOLEAN_VALUES[availability]
+    if params.get('available') == 'true':
+        if filters.get('is_available') is False:
+            return None
+        filters['is_available'] = True
+    return filters
+
+
+def cell_counts(queryset):
+    """Count books per (genre, condition, is_available) in one grouped query."""
+    return list(
+        queryset.order_by().values_list('genre', 'condition', 'is_available').annotate(Count('pk'))
+    )
+
+
+def stored_counts(**filters):
+    """Read the maintained counts for the given genre/condition/is_available filters."""
+    return list(
+        BookFacetCount.objects.filter(count__gt=0, **filters)
+        .values_list('genre', 'condition', 'is_available', 'count')
+    )
+
+
+def summarize(rows, excluded=()):
+    """Fold (genre, condition, is_available, count) rows into per-facet totals."""
+    facets = {
+        'genre': {value: 0 for value, _ in Book.GENRE_CHOICES},
+        'condition': {value: 0 for value, _ in Book.CONDITION_CHOICES},
+        'is_available': {'true': 0, 'false': 0},
+    }
+    for sign, source in ((1, rows), (-1, excluded)):
+        for genre, condition, is_available, count in source:
+            facets['genre'][genre] = facets['genre'].get(genre, 0) + sign * count
+            facets['condition'][condition] = facets['condition'].get(condition, 0) + sign * count
+            facets['is_available']['true' if is_available else 'false'] += sign * count
+    return facets
+
+
+def adjust(genre, condition, is_available, delta):
+    """Add ``delta`` to the stored count of one facet combination."""
+    counts = BookFacetCount.objects.filter(genre=genre, condition=condition, is_available=is_available)
+    if counts.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            BookFacetCount.objects.create(
+                genre=genre, condition=condition, is_available=is_available, count=delta
+            )
+    except IntegrityError:
+        # Created concurrently by another request.
+        counts.update(count=F('count') + delta)
+
+
+def move(counts, is_available):
+    """
+    Move books counted as ``{(genre, condition): n}`` into the ``is_available``
+    cells, after a bulk update that bypassed the Book signals.
+    """
+    for (genre, condition), count in counts.items():
+        adjust(genre, condition, not is_available, -count)
+        adjust(genre, condition, is_available, count)
@@ -0,0 +1,56 @@
+from bookswap.fastpath import FastListSerializer, datetime_formatter, file_url_formatter, variants_url_formatter
+from users.fast_serializers import compile_profile
+from .models import Book
+
+BOOK_COLUMNS = (
+    'id', 'title', 'author', 'isbn', 'publication', 'genre', 'condition',
+    'description', 'cover_image', 'cover_variants', 'is_available', 'created_at', 'updated_at',
+)
+
+
+def compile_book(columns, prefix, request):
+    """
+    Compile a row builder equivalent to ``BookSerializer``.
+
+    Rows of a nullable relation with no book (LEFT JOIN) build to None.
+    """
+    (
+        i_id, i_title, i_author, i_isbn, i_publication, i_genre, i_condition,
+        i_description, i_cover_image, i_cover_variants, i_is_available, i_created_at, i_updated_at,
+    ) = columns.add(*(prefix + name for name in BOOK_COLUMNS))
+    build_owner = compile_profile(columns, prefix + 'owner__', request)
+    cover_image_url = file_url_formatter(Book, 'cover_image', request)
+    cover_variant_urls = variants_url_formatter(Book, 'cover_image', request)
+    format_datetime = datetime_formatter()
+
+    def build(row):
+        if row[i_id] is None:
+            return None
+        owner = build_owner(row)
+        return {
+            'id': row[i_id],
+            'owner': owner,
+            'owner_name': f"{owner['first_name']} {owner['last_name']}",
+            'title': row[i_title],
+            'author': row[i_author],
+            'isbn': row[i_isbn],
+            'publication': row[i_publication],
+            'genre': row[i_genre],
+            'condition': row[i_condition],
+            'description': row[i_description],
+            'cover_image': cover_image_url(row[i_cover_image]),
+            'cover_variants': cover_variant_urls(row[i_cover_variants]),
+            'is_available': row[i_is_available],
+            'created_at': format_datetime(row[i_created_at]),
+            'updated_at': format_datetime(row[i_updated_at]),
+        }
+
+    return build
+
+
+class FastBookSerializer(FastListSerializer):
+    """Produces the same output as ``BookSerializer(many=True)`` from ``values_list`` rows."""
+
+    def __init__(self, request):
+        super().__init__(request)
+        self.build = compile_book(self.columns, '', request)
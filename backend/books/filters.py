@@ -0,0 +1,41 @@
+from rest_framework import filters
+
+from . import search
+
+
+class BookSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backed by the full-text index, or by the trigram index when
+    ``?search_mode=fuzzy`` is given.
+
+    Falls back to DRF's ``icontains`` search when the database has no
+    full-text index.
+    """
+    search_mode_param = 'search_mode'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, '')
+        if not terms.strip():
+            return queryset
+
+        results = None
+        if request.query_params.get(self.search_mode_param) == 'fuzzy':
+            results = search.fuzzy_search(queryset, terms)
+        if results is None:
+            results = search.search(queryset, terms)
+        if results is None:
+            return super().filter_queryset(request, queryset, view)
+        return results
+
+
+class RelevanceOrderingFilter(filters.OrderingFilter):
+    """OrderingFilter that sorts search results by relevance unless ``?ordering=`` is given."""
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get(self.ordering_param):
+            ordering = ['-search_rank', *(ordering or [])]
+
+        if ordering:
+            return queryset.order_by(*ordering)
+        return queryset
@@ -0,0 +1,29 @@
+"""Throwaway dataset shared by the benchmark commands; callers roll it back."""
+from django.contrib.auth import get_user_model
+
+from books.models import Book
+from trades.models import Trade, TradeMessage
+
+User = get_user_model()
+
+
+def seed(count):
+    users = User.objects.bulk_create([
+        User(username=f'bench-{i}', email=f'bench-{i}@example.com', first_name='Bench', last_name=str(i),
+             avatar=f'avatars/bench-{i}.jpg' if i % 2 else '')
+        for i in range(count)
+    ])
+    books = Book.objects.bulk_create([
+        Book(owner=user, title=f'Book {i}-{j}', author='Author', description='x' * 200,
+             cover_image=f'book_covers/bench-{i}-{j}.jpg' if j % 2 else '')
+        for i, user in enumerate(users) for j in range(3)
+    ])
+    trades = Trade.objects.bulk_create([
+        Trade(requester=users[i], recipient=users[i - 1], requested_book=books[(i - 1) * 3],
+              offered_book=books[i * 3], message='Swap?')
+        for i in range(1, count)
+    ])
+    TradeMessage.objects.bulk_create([
+        TradeMessage(trade=trade, sender=trade.requester, message=f'Message {n}')
+        for trade in trades for n in range(3)
+    ])
@@ -0,0 +1,81 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from books.models import Book
+from books.serializers import BookSerializer
+from bookswap.parsers import ORJSONParser
+from bookswap.renderers import ORJSONRenderer, orjson
+from trades.models import Trade, TradeMessage
+from trades.serializers import TradeSerializer
+
+from ._dataset import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's JSONRenderer/JSONParser with the orjson-backed ones on book and "
+        "trade list payloads from a generated dataset (rolled back afterwards)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--rounds', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed; ORJSONRenderer falls back to JSONRenderer")
+
+        request = Request(APIRequestFactory().get('/api/trades/', HTTP_HOST='localhost'))
+        context = {'request': request}
+        page_size = options['page_size']
+        with transaction.atomic():
+            seed(options['users'])
+            books = Book.objects.select_related('owner').order_by('-created_at', '-id')[:page_size]
+            trades = Trade.objects.select_related(
+                'requester', 'recipient',
+                'requested_book__owner', 'offered_book__owner', 'recipient_offered_book__owner',
+            ).with_message_summary().prefetch_related(Prefetch(
+                'messages',
+                queryset=TradeMessage.objects.select_related('sender').order_by('-id')[:1],
+                to_attr='recent_messages',
+            )).order_by('-created_at', '-id')[:page_size]
+            payloads = {
+                'books': {'next': None, 'previous': None,
+                          'results': BookSerializer(books, many=True, context=context).data},
+                'trades': {'next': None, 'previous': None,
+                           'results': TradeSerializer(trades, many=True, context=context).data},
+            }
+            transaction.set_rollback(True)
+
+        for label, data in payloads.items():
+            self.compare(label, data, options['rounds'])
+
+    def compare(self, label, data, rounds):
+        body = JSONRenderer().render(data)
+        if ORJSONRenderer().render(data) != body:
+            raise CommandError(f"{label}: ORJSONRenderer output differs from JSONRenderer")
+
+        for kind, stock, fast in (
+            ('render', lambda: JSONRenderer().render(data), lambda: ORJSONRenderer().render(data)),
+            ('parse', lambda: JSONParser().parse(io.BytesIO(body)), lambda: ORJSONParser().parse(io.BytesIO(body))),
+        ):
+            timings = []
+            for run in (stock, fast):
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    run()
+                timings.append(time.perf_counter() - start)
+            stock_rate, fast_rate = (rounds * len(body) / elapsed / 2 ** 20 for elapsed in timings)
+            self.stdout.write(
+                f"{label:>6} {kind:>6} ({len(body) // 1024} KiB): stdlib {stock_rate:7.1f} MiB/s, "
+                f"orjson {fast_rate:7.1f} MiB/s, {timings[0] / timings[1]:.1f}x"
+            )
@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from books.fast_serializers import FastBookSerializer
+from books.models import Book
+from books.serializers import BookSerializer
+from trades.fast_serializers import FastTradeSerializer
+from trades.models import Trade, TradeMessage
+from trades.serializers import TradeSerializer
+
+from ._dataset import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare BookSerializer/TradeSerializer with the fast list serializers on a "
+        "generated dataset (rolled back afterwards) and check the JSON is identical."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--rounds', type=int, default=20)
+
+    def handle(self, *args, **options):
+        request = Request(APIRequestFactory().get('/api/books/', HTTP_HOST='localhost'))
+        with transaction.atomic():
+            seed(options['users'])
+            page_size, rounds = options['page_size'], options['rounds']
+
+            books = Book.objects.order_by('-created_at', '-id')
+            self.compare(
+                'books',
+                lambda: BookSerializer(list(books.select_related('owner')[:page_size]),
+                                       many=True, context={'request': request}).data,
+                lambda: self.fast(FastBookSerializer(request), books, page_size),
+                page_size, rounds,
+            )
+
+            trades = Trade.objects.order_by('-created_at', '-id')
+            related = trades.select_related(
+                'requester', 'recipient',
+                'requested_book__owner', 'offered_book__owner', 'recipient_offered_book__owner',
+            ).with_message_summary().prefetch_related(Prefetch(
+                'messages',
+                queryset=TradeMessage.objects.select_related('sender').order_by('-id')[:1],
+                to_attr='recent_messages',
+            ))
+            self.compare(
+                'trades',
+                lambda: TradeSerializer(list(related[:page_size]), many=True, context={'request': request}).data,
+                lambda: self.fast(FastTradeSerializer(request), trades, page_size),
+                page_size, rounds,
+            )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def fast(serializer, queryset, page_size):
+        return serializer.serialize(list(serializer.prepare(queryset)[:page_size]))
+
+    def compare(self, label, standard, fast, page_size, rounds):
+        renderer = JSONRenderer()
+        if renderer.render(standard()) != renderer.render(fast()):
+            raise CommandError(f"{label}: fast serializer output differs from the standard serializer")
+
+        timings = {}
+        for name, serialize in (('standard', standard), ('fast', fast)):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                renderer.render(serialize())
+            timings[name] = time.perf_counter() - start
+
+        for name, elapsed in timings.items():
+            self.stdout.write(f"{label:>7} {name:>8}: {rounds * page_size / elapsed:10.0f} rows/s")
+        self.stdout.write(self.style.SUCCESS(
+            f"{label:>7}  speedup: {timings['standard'] / timings['fast']:.1f}x (identical JSON)"
+        ))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from books.models import Book
+from bookswap.images import process
+from users.models import User
+
+IMAGE_FIELDS = [
+    (Book, 'cover_image', 'cover_variants'),
+    (User, 'avatar', 'avatar_variants'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Render variants for uploaded covers and avatars that have none yet, e.g. uploads "
+        "made before the pipeline existed or queued when the server stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Re-render every image, not just missing variants.")
+
+    def handle(self, *args, **options):
+        for model, field, variants_field in IMAGE_FIELDS:
+            queryset = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            if not options['all']:
+                queryset = queryset.filter(**{variants_field: {}})
+            done = failed = 0
+            for pk in queryset.values_list('pk', flat=True).iterator():
+                try:
+                    process(model, pk, field, variants_field)
+                    done += 1
+                except (OSError, ValueError) as exc:
+                    failed += 1
+                    self.stderr.write(f"{model._meta.label} {pk}: {exc}")
+            self.stdout.write(f"{model._meta.label}.{field}: processed {done}, failed {failed}")
@@ -0,0 +1,92 @@
+from django.db import migrations
+
+# Full-text index DDL as of this migration.
+# Copied here rather than imported from ``books.search`` so that later
+# changes to the live module cannot alter what this migration does.
+
+SQLITE_CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+        title, author, description,
+        content='books', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO books_fts(rowid, title, author, description)
+        VALUES (new.id, new.title, new.author, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, description)
+        VALUES ('delete', old.id, old.title, old.author, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author, description ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, description)
+        VALUES ('delete', old.id, old.title, old.author, old.description);
+        INSERT INTO books_fts(rowid, title, author, description)
+        VALUES (new.id, new.title, new.author, new.description);
+    END
+    """,
+    "INSERT INTO books_fts(books_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS books_fts_ai",
+    "DROP TRIGGER IF EXISTS books_fts_ad",
+    "DROP TRIGGER IF EXISTS books_fts_au",
+    "DROP TABLE IF EXISTS books_fts",
+]
+
+POSTGRES_CREATE_SQL = [
+    """
+    CREATE INDEX IF NOT EXISTS books_search_vector_idx ON books USING GIN ((
+        setweight(to_tsvector('english', coalesce("books"."title", '')), 'A') ||
+        setweight(to_tsvector('english', coalesce("books"."author", '')), 'B') ||
+        setweight(to_tsvector('english', coalesce("books"."description", '')), 'C')
+    ))
+    """,
+]
+
+POSTGRES_DROP_SQL = [
+    "DROP INDEX IF EXISTS books_search_vector_idx",
+]
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        statements = SQLITE_CREATE_SQL
+    elif connection.vendor == 'postgresql':
+        statements = POSTGRES_CREATE_SQL
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        statements = SQLITE_DROP_SQL
+    elif connection.vendor == 'postgresql':
+        statements = POSTGRES_DROP_SQL
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0003_book_publication'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
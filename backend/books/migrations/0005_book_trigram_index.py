@@ -0,0 +1,89 @@
+from django.db import migrations
+
+# Trigram index DDL as of this migration.
+# Copied here rather than imported from ``books.search`` so that later
+# changes to the live module cannot alter what this migration does.
+
+SQLITE_TRIGRAM_CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS books_trigram USING fts5(
+        title, author,
+        content='books', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_trigram_ai AFTER INSERT ON books BEGIN
+        INSERT INTO books_trigram(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_trigram_ad AFTER DELETE ON books BEGIN
+        INSERT INTO books_trigram(books_trigram, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_trigram_au AFTER UPDATE OF title, author ON books BEGIN
+        INSERT INTO books_trigram(books_trigram, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO books_trigram(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    "INSERT INTO books_trigram(books_trigram) VALUES ('rebuild')",
+]
+
+SQLITE_TRIGRAM_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS books_trigram_ai",
+    "DROP TRIGGER IF EXISTS books_trigram_ad",
+    "DROP TRIGGER IF EXISTS books_trigram_au",
+    "DROP TABLE IF EXISTS books_trigram",
+]
+
+POSTGRES_TRIGRAM_CREATE_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS books_title_trgm_idx ON books USING GIN (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS books_author_trgm_idx ON books USING GIN (author gin_trgm_ops)",
+]
+
+POSTGRES_TRIGRAM_DROP_SQL = [
+    "DROP INDEX IF EXISTS books_title_trgm_idx",
+    "DROP INDEX IF EXISTS books_author_trgm_idx",
+]
+
+
+def create_trigram_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        statements = SQLITE_TRIGRAM_CREATE_SQL
+    elif connection.vendor == 'postgresql':
+        statements = POSTGRES_TRIGRAM_CREATE_SQL
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_trigram_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        statements = SQLITE_TRIGRAM_DROP_SQL
+    elif connection.vendor == 'postgresql':
+        statements = POSTGRES_TRIGRAM_DROP_SQL
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_book_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
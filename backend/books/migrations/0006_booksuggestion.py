@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:05
+
+import unicodedata
+from collections import Counter
+
+from django.db import migrations, models
+
+
+# Copied from ``books.autocomplete`` as it was when this migration was
+# written, so later changes there do not change what it builds.
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    words = ''.join(ch if ch.isalnum() else ' ' for ch in text.casefold()).split()
+    return ' '.join(words)[:200]
+
+
+def build_suggestions(apps, schema_editor):
+    Book = apps.get_model('books', 'Book')
+    BookSuggestion = apps.get_model('books', 'BookSuggestion')
+    counts = Counter()
+    texts = {}
+    for title, author in Book.objects.values_list('title', 'author').iterator():
+        for kind, text in (('title', title), ('author', author)):
+            key = (kind, normalize(text))
+            if key[1]:
+                counts[key] += 1
+                texts.setdefault(key, text.strip()[:200])
+    BookSuggestion.objects.bulk_create(
+        [
+            BookSuggestion(kind=kind, normalized=normalized, text=texts[kind, normalized], book_count=count)
+            for (kind, normalized), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0005_book_trigram_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('title', 'Title'), ('author', 'Author')], max_length=10)),
+                ('normalized', models.CharField(max_length=200)),
+                ('text', models.CharField(max_length=200)),
+                ('book_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'book_suggestions',
+                'indexes': [models.Index(fields=['normalized', 'book_count'], name='book_suggestion_prefix_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='booksuggestion',
+            constraint=models.UniqueConstraint(fields=('kind', 'normalized'), name='book_suggestion_unique'),
+        ),
+        migrations.RunPython(build_suggestions, migrations.RunPython.noop),
+    ]
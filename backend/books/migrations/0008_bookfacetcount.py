@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:07
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_facets(apps, schema_editor):
+    Book = apps.get_model('books', 'Book')
+    BookFacetCount = apps.get_model('books', 'BookFacetCount')
+    rows = Book.objects.order_by().values_list('genre', 'condition', 'is_available').annotate(Count('pk'))
+    BookFacetCount.objects.bulk_create([
+        BookFacetCount(genre=genre, condition=condition, is_available=is_available, count=count)
+        for genre, condition, is_available, count in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0007_book_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('genre', models.CharField(choices=[('fiction', 'Fiction'), ('non_fiction', 'Non-Fiction'), ('mystery', 'Mystery'), ('romance', 'Romance'), ('sci_fi', 'Science Fiction'), ('fantasy', 'Fantasy'), ('biography', 'Biography'), ('history', 'History'), ('science', 'Science'), ('technology', 'Technology'), ('self_help', 'Self-Help'), ('cookbook', 'Cookbook'), ('travel', 'Travel'), ('poetry', 'Poetry'), ('drama', 'Drama'), ('other', 'Other')], max_length=20)),
+                ('condition', models.CharField(choices=[('excellent', 'Excellent'), ('very_good', 'Very Good'), ('good', 'Good'), ('fair', 'Fair'), ('poor', 'Poor')], max_length=20)),
+                ('is_available', models.BooleanField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'book_facet_counts',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bookfacetcount',
+            constraint=models.UniqueConstraint(fields=('genre', 'condition', 'is_available'), name='book_facet_count_unique'),
+        ),
+        migrations.RunPython(count_facets, migrations.RunPython.noop),
+    ]
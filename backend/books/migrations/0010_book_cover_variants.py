@@ -0,0 +1,79 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:32
+
+from django.db import migrations, models
+
+# SQLite adds this column by rebuilding the books table, which drops the
+# triggers keeping the full-text (0004) and trigram (0005) indexes in step.
+# Their DDL as of this migration, copied rather than imported from
+# ``books.search`` so later changes to the live module cannot alter it.
+
+SQLITE_TRIGGER_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO books_fts(rowid, title, author, description)
+        VALUES (new.id, new.title, new.author, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, description)
+        VALUES ('delete', old.id, old.title, old.author, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author, description ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, description)
+        VALUES ('delete', old.id, old.title, old.author, old.description);
+        INSERT INTO books_fts(rowid, title, author, description)
+        VALUES (new.id, new.title, new.author, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_trigram_ai AFTER INSERT ON books BEGIN
+        INSERT INTO books_trigram(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_trigram_ad AFTER DELETE ON books BEGIN
+        INSERT INTO books_trigram(books_trigram, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_trigram_au AFTER UPDATE OF title, author ON books BEGIN
+        INSERT INTO books_trigram(books_trigram, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO books_trigram(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    # Rows written while the triggers were missing.
+    "INSERT INTO books_fts(books_fts) VALUES ('rebuild')",
+    "INSERT INTO books_trigram(books_trigram) VALUES ('rebuild')",
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in SQLITE_TRIGGER_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0009_book_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='cover_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        # Unapplying drops the column with another rebuild; the post_migrate
+        # repair in ``books.apps`` restores the triggers after that.
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
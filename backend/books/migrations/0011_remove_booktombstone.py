@@ -0,0 +1,16 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:28
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0010_book_cover_variants'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='BookTombstone',
+        ),
+    ]
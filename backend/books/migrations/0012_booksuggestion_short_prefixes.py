@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:51
+
+from django.db import migrations, models
+from django.db.models.functions import Substr
+
+
+def fill_prefixes(apps, schema_editor):
+    BookSuggestion = apps.get_model('books', 'BookSuggestion')
+    BookSuggestion.objects.update(prefix1=Substr('normalized', 1, 1), prefix2=Substr('normalized', 1, 2))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0011_remove_booktombstone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booksuggestion',
+            name='prefix1',
+            field=models.CharField(default='', max_length=1),
+        ),
+        migrations.AddField(
+            model_name='booksuggestion',
+            name='prefix2',
+            field=models.CharField(default='', max_length=2),
+        ),
+        migrations.RunPython(fill_prefixes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='booksuggestion',
+            index=models.Index(fields=['prefix1', '-book_count', 'normalized'], name='book_suggestion_prefix1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booksuggestion',
+            index=models.Index(fields=['prefix2', '-book_count', 'normalized'], name='book_suggestion_prefix2_idx'),
+        ),
+    ]
@@ -42,6 +42,8 @@ class Book(models.Model):
     condition = models.CharField(max_length=20, choices=CONDITION_CHOICES, default='good')
     description = models.TextField(blank=True)
     cover_image = models.ImageField(upload_to='book_covers/', blank=True, null=True)
+    # Resized copies of ``cover_image``, filled in by ``bookswap.images``.
+    cover_variants = models.JSONField(default=dict, blank=True)
     is_available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -49,10 +51,80 @@ class Book(models.Model):
     class Meta:
         db_table = 'books'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination walks (created_at, id) in both list feeds.
+            models.Index(fields=['-created_at', '-id'], name='books_recent_idx'),
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='books_available_recent_idx',
+                condition=models.Q(is_available=True),
+            ),
+            models.Index(
+                fields=['genre', '-created_at', '-id'],
+                name='books_genre_available_idx',
+                condition=models.Q(is_available=True),
+            ),
+            models.Index(
+                fields=['condition', '-created_at', '-id'],
+                name='books_cond_available_idx',
+                condition=models.Q(is_available=True),
+            ),
+            models.Index(fields=['owner', '-created_at', '-id'], name='books_owner_recent_idx'),
+            # Delta sync reads changes in (updated_at, id) order.
+            models.Index(fields=['updated_at', 'id'], name='books_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.author}"
 
     @property
     def owner_name(self):
-        return f"{self.owner.first_name} {self.owner.last_name}" 
\ No newline at end of file
+        return f"{self.owner.first_name} {self.owner.last_name}"
+
+
+class BookSuggestion(models.Model):
+    """Prefix index of normalized book titles and authors for autocomplete."""
+    KIND_CHOICES = [
+        ('title', 'Title'),
+        ('author', 'Author'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    normalized = models.CharField(max_length=200)
+    # The first one and two characters of ``normalized``, indexed in
+    # popularity order for short queries (see ``books.autocomplete``).
+    prefix1 = models.CharField(max_length=1, default='')
+    prefix2 = models.CharField(max_length=2, default='')
+    text = models.CharField(max_length=200)
+    book_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'book_suggestions'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'normalized'], name='book_suggestion_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['normalized', 'book_count'], name='book_suggestion_prefix_idx'),
+            models.Index(fields=['prefix1', '-book_count', 'normalized'], name='book_suggestion_prefix1_idx'),
+            models.Index(fields=['prefix2', '-book_count', 'normalized'], name='book_suggestion_prefix2_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.text} ({self.kind})"
+
+
+class BookFacetCount(models.Model):
+    """Number of books per (genre, condition, availability) combination."""
+    genre = models.CharField(max_length=20, choices=Book.GENRE_CHOICES)
+    condition = models.CharField(max_length=20, choices=Book.CONDITION_CHOICES)
+    is_available = models.BooleanField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'book_facet_counts'
+        constraints = [
+            models.UniqueConstraint(fields=['genre', 'condition', 'is_available'], name='book_facet_count_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.genre}/{self.condition}/{self.is_available}: {self.count}"
@@ -0,0 +1,309 @@
+"""
+Full-text and fuzzy search over the books table.
+
+SQLite uses an external-content FTS5 table (``books_fts``) kept in sync by
+triggers; PostgreSQL uses a GIN index over a weighted tsvector expression.
+Both are created in ``books/migrations/0004_book_search_index.py``.
+
+Fuzzy (typo-tolerant) search matches trigrams of ``title`` and ``author``:
+an FTS5 table with the ``trigram`` tokenizer on SQLite and ``pg_trgm`` GIN
+indexes on PostgreSQL, created in ``0005_book_trigram_index.py``.
+
+SQLite rebuilds a table to alter it, which drops its triggers; the index
+then silently stops seeing new and edited books. ``repair_index`` runs
+after every ``migrate`` and recreates whatever is missing, and searches
+fall back to ``icontains`` while an index is incomplete.
+"""
+import logging
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, Case, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'books_fts'
+TRIGRAM_TABLE = 'books_trigram'
+
+SQLITE_TRIGGERS = {
+    FTS_TABLE: ('books_fts_ai', 'books_fts_ad', 'books_fts_au'),
+    TRIGRAM_TABLE: ('books_trigram_ai', 'books_trigram_ad', 'books_trigram_au'),
+}
+
+logger = logging.getLogger(__name__)
+
+# Minimum share of the query's trigrams a book must contain to match.
+FUZZY_THRESHOLD = 0.3
+
+# Fuzzy matches are ranked in the database and capped to the best ones.
+FUZZY_MAX_RESULTS = 200
+
+# Books read per query trigram on SQLite; common trigrams ("the", "ing")
+# would otherwise pull in most of the table before ranking.
+FUZZY_CANDIDATES_PER_TRIGRAM = 1000
+
+# Relative weight of title, author and description matches.
+SQLITE_BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+# Must stay identical to the indexed expression in the migration, otherwise
+# PostgreSQL will not use the GIN index.
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(\"books\".\"title\", '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(\"books\".\"author\", '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(\"books\".\"description\", '')), 'C')"
+)
+
+SQLITE_CREATE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, author, description,
+        content='books', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, author, description)
+        VALUES (new.id, new.title, new.author, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author, description)
+        VALUES ('delete', old.id, old.title, old.author, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author, description ON books BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author, description)
+        VALUES ('delete', old.id, old.title, old.author, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, author, description)
+        VALUES (new.id, new.title, new.author, new.description);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS books_fts_ai",
+    "DROP TRIGGER IF EXISTS books_fts_ad",
+    "DROP TRIGGER IF EXISTS books_fts_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_CREATE_SQL = [
+    f"CREATE INDEX IF NOT EXISTS books_search_vector_idx ON books USING GIN (({POSTGRES_VECTOR}))",
+]
+
+POSTGRES_DROP_SQL = [
+    "DROP INDEX IF EXISTS books_search_vector_idx",
+]
+
+SQLITE_TRIGRAM_CREATE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TRIGRAM_TABLE} USING fts5(
+        title, author,
+        content='books', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_trigram_ai AFTER INSERT ON books BEGIN
+        INSERT INTO {TRIGRAM_TABLE}(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_trigram_ad AFTER DELETE ON books BEGIN
+        INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_trigram_au AFTER UPDATE OF title, author ON books BEGIN
+        INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO {TRIGRAM_TABLE}(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    f"INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_TRIGRAM_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS books_trigram_ai",
+    "DROP TRIGGER IF EXISTS books_trigram_ad",
+    "DROP TRIGGER IF EXISTS books_trigram_au",
+    f"DROP TABLE IF EXISTS {TRIGRAM_TABLE}",
+]
+
+POSTGRES_TRIGRAM_CREATE_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS books_title_trgm_idx ON books USING GIN (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS books_author_trgm_idx ON books USING GIN (author gin_trgm_ops)",
+]
+
+POSTGRES_TRIGRAM_DROP_SQL = [
+    "DROP INDEX IF EXISTS books_title_trgm_idx",
+    "DROP INDEX IF EXISTS books_author_trgm_idx",
+]
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(terms):
+    """Split raw user input into plain word tokens, dropping all query syntax."""
+    return _TOKEN_RE.findall(terms.lower())
+
+
+def trigrams(terms):
+    """Return the distinct three-letter substrings of each word in ``terms``."""
+    grams = []
+    for token in tokenize(terms):
+        for i in range(len(token) - 2):
+            gram = token[i:i + 3]
+            if gram not in grams:
+                grams.append(gram)
+    return grams
+
+
+def _sqlite_objects(connection, names):
+    placeholders = ', '.join(['%s'] * len(names))
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT name FROM sqlite_master WHERE name IN ({placeholders})", list(names))
+        return {name for name, in cursor.fetchall()}
+
+
+def is_supported(connection, table=FTS_TABLE):
+    """Return True if the search index backing ``table``, and what keeps it current, exist."""
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        names = (table, *SQLITE_TRIGGERS[table])
+        return len(_sqlite_objects(connection, names)) == len(names)
+    return False
+
+
+def repair_index(connection):
+    """Recreate missing SQLite index tables or triggers and rebuild the affected indexes."""
+    if connection.vendor != 'sqlite' or not _sqlite_objects(connection, ['books']):
+        return
+    for table, statements in ((FTS_TABLE, SQLITE_CREATE_SQL), (TRIGRAM_TABLE, SQLITE_TRIGRAM_CREATE_SQL)):
+        names = (table, *SQLITE_TRIGGERS[table])
+        missing = set(names) - _sqlite_objects(connection, names)
+        if not missing:
+            continue
+        logger.warning("Recreating %s and rebuilding %s", ', '.join(sorted(missing)), table)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def search(queryset, terms):
+    """
+    Restrict ``queryset`` to books matching ``terms`` and annotate each row
+    with ``search_rank`` (higher is more relevant).
+
+    Returns None when the database has no full-text index, so callers can
+    fall back to plain ``icontains`` matching.
+    """
+    tokens = tokenize(terms)
+    connection = connections[queryset.db]
+    if not tokens or not is_supported(connection):
+        return None
+
+    if connection.vendor == 'sqlite':
+        # Every token is a quoted prefix query, so partial words typed into
+        # the search box still match.
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        weights = ', '.join(str(weight) for weight in SQLITE_BM25_WEIGHTS)
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,))
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = \"books\".\"id\"",
+                (match,),
+                output_field=FloatField(),
+            )
+        )
+
+    tsquery = ' & '.join(f'{token}:*' for token in tokens)
+    return queryset.filter(
+        RawSQL(f"({POSTGRES_VECTOR}) @@ to_tsquery('english', %s)", (tsquery,), output_field=BooleanField())
+    ).annotate(
+        search_rank=RawSQL(
+            f"ts_rank(({POSTGRES_VECTOR}), to_tsquery('english', %s))",
+            (tsquery,),
+            output_field=FloatField(),
+        )
+    )
+
+
+def fuzzy_search(queryset, terms):
+    """
+    Restrict ``queryset`` to books whose title or author shares at least
+    ``FUZZY_THRESHOLD`` of the query's trigrams, annotated with
+    ``search_rank`` (the trigram similarity, higher is closer).
+
+    Returns None when the database has no trigram index or the query is too
+    short to produce trigrams.
+    """
+    connection = connections[queryset.db]
+    if not is_supported(connection, TRIGRAM_TABLE):
+        return None
+
+    if connection.vendor == 'postgresql':
+        query = ' '.join(tokenize(terms))
+        if not query:
+            return None
+        # ``<%`` is the word-similarity operator; both sides use the GIN index.
+        return queryset.filter(
+            RawSQL(
+                "(%s <%% \"books\".\"title\" OR %s <%% \"books\".\"author\")",
+                (query, query),
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                "GREATEST(word_similarity(%s, \"books\".\"title\"), word_similarity(%s, \"books\".\"author\"))",
+                (query, query),
+                output_field=FloatField(),
+            )
+        )
+
+    grams = trigrams(terms)
+    if not grams:
+        return None
+    if queryset.query.is_empty():
+        return queryset
+
+    # One indexed MATCH per trigram; counting hits per book gives the share
+    # of the query's trigrams it contains. Each trigram contributes at most
+    # its best ``FUZZY_CANDIDATES_PER_TRIGRAM`` books of the filtered
+    # queryset, so filters never empty the result and the rows grouped stay
+    # bounded however common the trigram is.
+    candidates, candidate_params = queryset.order_by().values('pk').query.sql_with_params()
+    hits = ' UNION ALL '.join(
+        f"SELECT rowid FROM (SELECT rowid FROM {TRIGRAM_TABLE} WHERE {TRIGRAM_TABLE} MATCH %s "
+        f"AND rowid IN ({candidates}) ORDER BY rank LIMIT %s)" for _ in grams
+    )
+    sql = (
+        f"SELECT rowid, COUNT(*) FROM ({hits}) GROUP BY rowid "
+        f"HAVING COUNT(*) >= %s ORDER BY COUNT(*) DESC LIMIT %s"
+    )
+    params = []
+    for gram in grams:
+        params += [f'"{gram}"', *candidate_params, FUZZY_CANDIDATES_PER_TRIGRAM]
+    params += [max(1, round(len(grams) * FUZZY_THRESHOLD)), FUZZY_MAX_RESULTS]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        scores = {book_id: count / len(grams) for book_id, count in cursor.fetchall()}
+
+    if not scores:
+        return queryset.none()
+    return queryset.filter(pk__in=scores).annotate(
+        search_rank=Case(
+            *(When(pk=book_id, then=Value(score)) for book_id, score in scores.items()),
+            output_field=FloatField(),
+        )
+    )
@@ -1,30 +1,44 @@
 from rest_framework import serializers
+from bookswap.images import ProcessedImagesMixin, variant_urls
+from bookswap.serializers import DynamicFieldsMixin
+from mediastore.serializers import CompletedUploadField, UploadedImagesMixin
 from .models import Book
 from users.serializers import UserProfileSerializer
 
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Book model."""
     owner = UserProfileSerializer(read_only=True)
     owner_name = serializers.CharField(read_only=True)
+    cover_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Book
         fields = [
             'id', 'owner', 'owner_name', 'title', 'author', 'isbn', 'publication', 'genre',
-            'condition', 'description', 'cover_image', 'is_available',
+            'condition', 'description', 'cover_image', 'cover_variants', 'is_available',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'owner', 'created_at', 'updated_at']
 
+    def get_compact_fields(self):
+        return {'owner': serializers.PrimaryKeyRelatedField(read_only=True)}
 
-class BookCreateSerializer(serializers.ModelSerializer):
+    def get_cover_variants(self, obj):
+        return variant_urls(obj.cover_variants, obj.cover_image.storage, self.context.get('request'))
+
+
+class BookCreateSerializer(ProcessedImagesMixin, UploadedImagesMixin, serializers.ModelSerializer):
     """Serializer for creating a new book."""
+    processed_image_fields = {'cover_image': 'cover_variants'}
+    uploaded_image_fields = {'cover_upload': 'cover_image'}
+    cover_upload = CompletedUploadField()
+
     class Meta:
         model = Book
         fields = [
             'title', 'author', 'isbn', 'publication', 'genre', 'condition',
-            'description', 'cover_image', 'is_available'
+            'description', 'cover_image', 'cover_upload', 'is_available'
         ]
 
     def create(self, validated_data):
@@ -32,11 +46,15 @@ class BookCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class BookUpdateSerializer(serializers.ModelSerializer):
+class BookUpdateSerializer(ProcessedImagesMixin, UploadedImagesMixin, serializers.ModelSerializer):
     """Serializer for updating a book."""
+    processed_image_fields = {'cover_image': 'cover_variants'}
+    uploaded_image_fields = {'cover_upload': 'cover_image'}
+    cover_upload = CompletedUploadField()
+
     class Meta:
         model = Book
         fields = [
             'title', 'author', 'isbn', 'publication', 'genre', 'condition',
-            'description', 'cover_image', 'is_available'
+            'description', 'cover_image', 'cover_upload', 'is_available'
         ] 
\ No newline at end of file
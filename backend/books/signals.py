@@ -0,0 +1,121 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from bookswap.models import SyncChange
+
+from users.fast_serializers import PROFILE_COLUMNS
+from users.models import User
+
+from . import autocomplete, facets
+from . import cache as book_cache
+from .models import Book
+
+SUGGESTION_FIELDS = ('title', 'author')
+FACET_FIELDS = ('genre', 'condition', 'is_available')
+
+
+@receiver(pre_save, sender=Book)
+def remember_indexed_fields(sender, instance, **kwargs):
+    """Remember the stored values so post_save can tell what changed."""
+    instance._indexed_previous = None
+    if instance.pk:
+        instance._indexed_previous = (
+            Book.objects.filter(pk=instance.pk).values(*SUGGESTION_FIELDS, *FACET_FIELDS, 'owner_id').first()
+        )
+
+
+@receiver(post_save, sender=Book)
+def update_suggestions(sender, instance, created, raw=False, **kwargs):
+    """Keep the autocomplete prefix index in step with the book."""
+    if raw:
+        return
+    previous = getattr(instance, '_indexed_previous', None)
+    changed = False
+    for field in SUGGESTION_FIELDS:
+        value = getattr(instance, field)
+        old = previous[field] if previous else None
+        if old == value:
+            continue
+        if old is not None:
+            autocomplete.adjust(field, old, -1)
+        autocomplete.adjust(field, value, 1)
+        changed = True
+    if changed:
+        autocomplete.cache.clear()
+
+
+@receiver(post_save, sender=Book)
+def update_facet_counts(sender, instance, created, raw=False, **kwargs):
+    """Move the book between facet counts when genre, condition or availability change."""
+    if raw:
+        return
+    current = tuple(getattr(instance, field) for field in FACET_FIELDS)
+    previous = getattr(instance, '_indexed_previous', None)
+    if previous:
+        old = tuple(previous[field] for field in FACET_FIELDS)
+        if old == current:
+            return
+        facets.adjust(*old, -1)
+    facets.adjust(*current, 1)
+
+
+@receiver(post_save, sender=Book)
+def invalidate_cached_responses(sender, instance, raw=False, **kwargs):
+    """Drop cached responses listing the book under its old or new values."""
+    if raw:
+        return
+    rows = [(instance.pk, instance.owner_id, *(getattr(instance, field) for field in FACET_FIELDS))]
+    previous = getattr(instance, '_indexed_previous', None)
+    if previous:
+        rows.append((instance.pk, previous['owner_id'], *(previous[field] for field in FACET_FIELDS)))
+    book_cache.invalidate_rows(rows)
+
+
+@receiver(post_save, sender=Book)
+def log_sync_change(sender, instance, raw=False, **kwargs):
+    """Resend the book, and the trades nesting it, to delta syncs."""
+    if not raw:
+        SyncChange.record(Book, [instance.pk])
+
+
+@receiver(post_delete, sender=Book)
+def remove_indexed_fields(sender, instance, **kwargs):
+    for field in SUGGESTION_FIELDS:
+        autocomplete.adjust(field, getattr(instance, field), -1)
+    autocomplete.cache.clear()
+    facets.adjust(*(getattr(instance, field) for field in FACET_FIELDS), -1)
+
+
+@receiver(post_delete, sender=Book)
+def log_sync_deletion(sender, instance, **kwargs):
+    SyncChange.record(Book, [instance.pk], deleted=True)
+
+
+@receiver(post_delete, sender=Book)
+def invalidate_deleted(sender, instance, **kwargs):
+    book_cache.invalidate_rows([(instance.pk, instance.owner_id, *(getattr(instance, field) for field in FACET_FIELDS))])
+
+
+@receiver(pre_save, sender=User)
+def remember_profile(sender, instance, **kwargs):
+    instance._profile_previous = None
+    if instance.pk:
+        instance._profile_previous = User.objects.filter(pk=instance.pk).values(*PROFILE_COLUMNS).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_owner_responses(sender, instance, created, raw=False, **kwargs):
+    """
+    Book and trade responses nest the user's profile: drop cached ones and
+    resend them to delta syncs. Logins and password changes leave them alone.
+    """
+    previous = getattr(instance, '_profile_previous', None)
+    if raw or created or previous is None:
+        return
+    for name in PROFILE_COLUMNS:
+        # Compare stored forms: an unsaved empty avatar is None, a loaded one ''.
+        field = User._meta.get_field(name)
+        if field.get_prep_value(previous[name]) != field.get_prep_value(getattr(instance, name)):
+            book_cache.invalidate_owners([instance.pk])
+            SyncChange.record(User, [instance.pk])
+            return
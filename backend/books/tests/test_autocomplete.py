@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from books import autocomplete
+from books.models import Book, BookSuggestion
+
+User = get_user_model()
+
+
+class AutocompleteTests(APITestCase):
+    def setUp(self):
+        autocomplete.cache.clear()
+        self.user = User.objects.create_user(username='reader', password='pw12345!')
+        self.client.force_authenticate(self.user)
+
+    def book(self, title, author='Someone'):
+        return Book.objects.create(owner=self.user, title=title, author=author)
+
+    def suggest(self, q, **params):
+        response = self.client.get('/api/books/autocomplete/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def counts(self, kind):
+        return dict(BookSuggestion.objects.filter(kind=kind).values_list('normalized', 'book_count'))
+
+    def test_most_popular_first(self):
+        self.book('Dune')
+        self.book('Dracula')
+        self.book('Dracula')
+        self.book('Emma')
+        self.assertEqual(self.suggest('d'), ['Dracula', 'Dune'])
+        self.assertEqual(self.suggest('du'), ['Dune'])
+        self.assertEqual(self.suggest('dra'), ['Dracula'])
+
+    def test_query_is_normalized(self):
+        self.book('Les Misérables', author='Victor Hugo')
+        self.assertEqual(self.suggest('  LES mise'), ['Les Misérables'])
+        self.assertEqual(self.suggest('victor-h'), ['Victor Hugo'])
+        self.assertEqual(self.suggest('?!'), [])
+
+    def test_limit_is_clamped(self):
+        for i in range(autocomplete.MAX_LIMIT + 5):
+            self.book(f'Tale {i:02d}')
+        self.assertEqual(len(self.suggest('ta', limit=3)), 3)
+        self.assertEqual(len(self.suggest('ta', limit=1000)), autocomplete.MAX_LIMIT)
+        self.assertEqual(len(self.suggest('ta', limit='x')), autocomplete.DEFAULT_LIMIT)
+
+    def test_title_and_author_with_the_same_text_are_suggested_once(self):
+        self.book('Homer', author='Homer')
+        self.assertEqual(self.suggest('hom'), ['Homer'])
+
+    def test_counts_follow_creates_updates_and_deletes(self):
+        first = self.book('Dune', author='Frank Herbert')
+        second = self.book('Dune', author='Brian Herbert')
+        self.assertEqual(self.counts('title'), {'dune': 2})
+
+        second.title = 'Dune Messiah'
+        second.save()
+        self.assertEqual(self.counts('title'), {'dune': 1, 'dune messiah': 1})
+        self.assertEqual(self.counts('author'), {'frank herbert': 1, 'brian herbert': 1})
+
+        first.delete()
+        self.assertEqual(self.counts('title'), {'dune': 0, 'dune messiah': 1})
+        self.assertEqual(self.suggest('dune'), ['Dune Messiah'])
+
+    def test_changes_clear_cached_prefixes(self):
+        book = self.book('Dune')
+        self.assertEqual(self.suggest('du'), ['Dune'])
+        book.title = 'Emma'
+        book.save()
+        self.assertEqual(self.suggest('du'), [])
+        self.assertEqual(self.suggest('em'), ['Emma'])
+
+    def test_short_prefixes_are_stored(self):
+        self.book('Éclair')
+        suggestion = BookSuggestion.objects.get(kind='title')
+        self.assertEqual((suggestion.normalized, suggestion.prefix1, suggestion.prefix2), ('eclair', 'e', 'ec'))
@@ -0,0 +1,118 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from trades.models import Trade
+
+User = get_user_model()
+
+
+class BookResponseCacheTests(APITestCase):
+    """Cached book responses are dropped by exactly the writes that change them."""
+
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username='reader', password='pw12345!')
+        self.owner = User.objects.create_user(username='owner', password='pw12345!', first_name='Olive')
+        self.poem = Book.objects.create(owner=self.owner, title='Poems', author='A', genre='poetry')
+        self.mystery = Book.objects.create(owner=self.owner, title='Whodunit', author='B', genre='mystery')
+        self.mine = Book.objects.create(owner=self.reader, title='Mine', author='C', genre='poetry')
+        self.client.force_authenticate(self.reader)
+
+    def get(self, url, user=None):
+        self.client.force_authenticate(user or self.reader)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def titles(self, url, user=None):
+        return sorted(book['title'] for book in self.get(url, user)['results'])
+
+    def assertCached(self, url, user=None):
+        self.client.force_authenticate(user or self.reader)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def change(self, func):
+        with self.captureOnCommitCallbacks(execute=True):
+            func()
+
+    def rename(self, book, title):
+        book.title = title
+        self.change(book.save)
+
+    def test_repeated_reads_are_cached(self):
+        for url in ('/api/books/', '/api/books/?genre=poetry', f'/api/books/{self.poem.pk}/'):
+            with self.subTest(url=url):
+                self.get(url)
+                self.assertCached(url)
+
+    def test_book_edit_reaches_every_list_and_the_detail(self):
+        urls = ['/api/books/', '/api/books/?genre=poetry', f'/api/books/?owner={self.owner.pk}']
+        for url in urls:
+            self.get(url)
+        self.get(f'/api/books/{self.poem.pk}/')
+        self.rename(self.poem, 'Sonnets')
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertIn('Sonnets', self.titles(url))
+        self.assertEqual(self.get(f'/api/books/{self.poem.pk}/')['title'], 'Sonnets')
+
+    def test_unrelated_lists_stay_cached(self):
+        self.get('/api/books/?genre=mystery')
+        self.get(f'/api/books/{self.mystery.pk}/')
+        self.rename(self.poem, 'Sonnets')
+        self.assertCached('/api/books/?genre=mystery')
+        self.assertCached(f'/api/books/{self.mystery.pk}/')
+
+    def test_moving_a_book_updates_its_old_and_new_lists(self):
+        self.get('/api/books/?genre=poetry')
+        self.get('/api/books/?genre=history')
+        self.poem.genre = 'history'
+        self.change(self.poem.save)
+        self.assertEqual(self.titles('/api/books/?genre=poetry'), ['Mine'])
+        self.assertEqual(self.titles('/api/books/?genre=history'), ['Poems'])
+
+    def test_delete(self):
+        self.get('/api/books/?genre=poetry')
+        self.change(self.poem.delete)
+        self.assertEqual(self.titles('/api/books/?genre=poetry'), ['Mine'])
+
+    def test_owner_profile_edit(self):
+        self.get('/api/books/?genre=mystery')
+        self.get(f'/api/books/{self.poem.pk}/')
+        self.owner.first_name = 'Oona'
+        self.change(self.owner.save)
+        self.assertEqual(self.get('/api/books/?genre=mystery')['results'][0]['owner']['first_name'], 'Oona')
+        self.assertEqual(self.get(f'/api/books/{self.poem.pk}/')['owner']['first_name'], 'Oona')
+
+    def test_login_keeps_the_cache(self):
+        self.get('/api/books/?genre=mystery')
+        self.owner.last_login = timezone.now()
+        self.change(self.owner.save)
+        self.assertCached('/api/books/?genre=mystery')
+
+    def test_trade_reservations(self):
+        self.get('/api/books/?is_available=true')
+        self.get('/api/books/?is_available=false')
+        trade = Trade.objects.create(requester=self.reader, recipient=self.owner, requested_book=self.poem)
+        self.change(lambda: trade.accept(trade_type='donation'))
+        self.assertEqual(self.titles('/api/books/?is_available=true'), ['Mine', 'Whodunit'])
+        self.assertEqual(self.titles('/api/books/?is_available=false'), ['Poems'])
+
+    def test_personal_lists_are_not_shared(self):
+        for url in ('/api/books/my_books/', '/api/books/available_books/', '/api/books/?exclude_own=true'):
+            with self.subTest(url=url):
+                reader_titles = self.titles(url, self.reader)
+                owner_titles = self.titles(url, self.owner)
+                self.assertNotEqual(reader_titles, owner_titles)
+                self.assertEqual(self.titles(url, self.reader), reader_titles)
+        self.assertEqual(self.titles('/api/books/my_books/', self.reader), ['Mine'])
+        self.assertEqual(self.titles('/api/books/my_books/', self.owner), ['Poems', 'Whodunit'])
+
+    def test_personal_lists_follow_edits(self):
+        self.get('/api/books/my_books/')
+        self.rename(self.mine, 'Still mine')
+        self.assertEqual(self.titles('/api/books/my_books/'), ['Still mine'])
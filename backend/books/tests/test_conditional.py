@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from books.models import Book
+
+User = get_user_model()
+
+
+class BookListValidatorTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', password='pw12345!')
+        self.client.force_authenticate(self.user)
+        self.books = [Book.objects.create(owner=self.user, title=f'Book {i}', author='Author') for i in range(5)]
+
+    def get(self, url, etag=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            pass
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def change(self, func):
+        with self.captureOnCommitCallbacks(execute=True):
+            func()
+
+    def test_unchanged_page_is_not_modified(self):
+        etag = self.get('/api/books/?page_size=2')['ETag']
+        self.assertEqual(self.get('/api/books/?page_size=2', etag).status_code, 304)
+
+    def test_edit_on_page_changes_etag(self):
+        etag = self.get('/api/books/?page_size=2')['ETag']
+        book = self.books[-1]
+        book.title = 'Renamed'
+        self.change(book.save)
+        self.assertEqual(self.get('/api/books/?page_size=2', etag).status_code, 200)
+
+    def test_edit_off_page_keeps_etag(self):
+        etag = self.get('/api/books/?page_size=2')['ETag']
+        book = self.books[0]
+        book.title = 'Renamed'
+        self.change(book.save)
+        self.assertEqual(self.get('/api/books/?page_size=2', etag).status_code, 304)
+
+    def test_offset_pages(self):
+        # Offset pages carry no total, so only rows landing on the page matter.
+        url = '/api/books/?ordering=title&page_size=2'
+        etag = self.get(url)['ETag']
+        self.change(lambda: Book.objects.create(owner=self.user, title='Zebra', author='Author'))
+        self.assertEqual(self.get(url, etag).status_code, 304)
+        self.change(lambda: Book.objects.create(owner=self.user, title='Aardvark', author='Author'))
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['title'], 'Aardvark')
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from books import facets
+from books.models import Book
+from trades.models import Trade
+
+User = get_user_model()
+
+
+class FacetCountTests(APITestCase):
+    """The maintained counts always agree with counting the books themselves."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', password='pw12345!')
+        self.other = User.objects.create_user(username='other', password='pw12345!')
+        self.client.force_authenticate(self.user)
+        self.mine = Book.objects.create(owner=self.user, title='Mine', author='A', genre='poetry')
+        self.theirs = Book.objects.create(owner=self.other, title='Theirs', author='B', genre='poetry', condition='fair')
+        Book.objects.create(owner=self.other, title='Lent', author='C', genre='mystery', is_available=False)
+
+    def facets(self, **params):
+        cache.clear()
+        response = self.client.get('/api/books/facets/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def counted(self, **filters):
+        books = Book.objects.filter(**filters)
+        return facets.summarize(facets.cell_counts(books))
+
+    def assertConsistent(self):
+        self.assertEqual(self.facets(), self.counted())
+        self.assertEqual(self.facets(genre='poetry'), self.counted(genre='poetry'))
+        self.assertEqual(self.facets(is_available='true'), self.counted(is_available=True))
+        self.assertEqual(
+            self.facets(genre='poetry', exclude_own='true'),
+            facets.summarize(facets.cell_counts(Book.objects.filter(genre='poetry').exclude(owner=self.user))),
+        )
+
+    def test_counts(self):
+        data = self.facets()
+        self.assertEqual((data['genre']['poetry'], data['genre']['mystery']), (2, 1))
+        self.assertEqual(data['condition'], {**data['condition'], 'good': 2, 'fair': 1})
+        self.assertEqual(data['is_available'], {'true': 2, 'false': 1})
+        self.assertEqual(self.facets(genre='poetry', exclude_own='true')['genre']['poetry'], 1)
+        self.assertConsistent()
+
+    def test_create(self):
+        Book.objects.create(owner=self.user, title='New', author='D', genre='poetry', condition='poor')
+        self.assertEqual(self.facets()['condition']['poor'], 1)
+        self.assertEqual(self.facets(genre='poetry', exclude_own='true')['genre']['poetry'], 1)
+        self.assertConsistent()
+
+    def test_update(self):
+        self.theirs.genre = 'history'
+        self.theirs.is_available = False
+        self.theirs.save()
+        data = self.facets()
+        self.assertEqual((data['genre']['poetry'], data['genre']['history']), (1, 1))
+        self.assertEqual(data['is_available'], {'true': 1, 'false': 2})
+        self.assertConsistent()
+
+    def test_delete(self):
+        self.mine.delete()
+        self.assertEqual(self.facets()['genre']['poetry'], 1)
+        self.assertConsistent()
+
+    def test_accepting_a_trade_moves_reserved_books(self):
+        trade = Trade.objects.create(
+            requester=self.user, recipient=self.other, requested_book=self.theirs, offered_book=self.mine,
+        )
+        trade.accept(trade_type='swap')
+        self.assertEqual(self.facets()['is_available'], {'true': 0, 'false': 3})
+        self.assertConsistent()
+
+    def test_filters_the_counts_table_cannot_answer(self):
+        self.assertEqual(self.facets(search='Theirs')['genre']['poetry'], 1)
+        self.assertEqual(self.facets(owner=self.other.pk), self.counted(owner=self.other))
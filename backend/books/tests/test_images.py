@@ -0,0 +1,109 @@
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from bookswap import images
+from bookswap.testing import TemporaryMediaMixin, image_bytes
+from mediastore.models import Blob
+
+User = get_user_model()
+
+
+class InlineExecutor:
+    """Runs submitted processing right away, on the test's connection."""
+
+    def submit(self, fn, model, pk, field, variants_field):
+        images.process(model, pk, field, variants_field)
+
+
+class CoverVariantTests(TemporaryMediaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='owner', password='pw12345!')
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch('bookswap.images.get_executor', return_value=InlineExecutor())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self, content, name='cover.jpg'):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/books/', {
+                'title': 'Covered', 'author': 'A', 'cover_image': SimpleUploadedFile(name, content),
+            }, format='multipart')
+        self.assertEqual(response.status_code, 201, response.data)
+        return Book.objects.get(title='Covered')
+
+    def test_variants_are_rendered_after_upload(self):
+        book = self.upload(image_bytes('JPEG', size=(1200, 1800)))
+        self.assertEqual(set(book.cover_variants), set(images.VARIANTS))
+        for variant, (width, height) in images.VARIANTS.items():
+            entry = book.cover_variants[variant]
+            self.assertEqual((entry['width'], entry['height']), (width, height))
+            for fmt in images.FORMATS:
+                self.assertTrue(default_storage.exists(entry[fmt]))
+                self.assertEqual(Blob.objects.get(name=entry[fmt]).ref_count, 1)
+
+        data = self.client.get(f'/api/books/{book.pk}/').data
+        self.assertTrue(data['cover_variants']['thumbnail']['webp'].startswith('http://testserver/'))
+
+    def test_small_images_are_not_enlarged(self):
+        book = self.upload(image_bytes('PNG', size=(100, 50)), name='cover.png')
+        detail = book.cover_variants['detail']
+        self.assertEqual((detail['width'], detail['height']), (100, 50))
+
+    def test_metadata_is_stripped(self):
+        exif = Image.Exif()
+        exif[0x010E] = 'Taken at home'
+        buffer = BytesIO()
+        Image.new('RGB', (40, 60), (10, 20, 30)).save(buffer, 'JPEG', exif=exif.tobytes())
+        book = self.upload(buffer.getvalue())
+        with default_storage.open(book.cover_image.name) as stored:
+            self.assertNotIn(0x010E, Image.open(stored).getexif())
+
+    def test_newer_upload_is_not_overwritten(self):
+        book = Book.objects.create(
+            owner=self.user, title='Raced', author='A', cover_image=ContentFile(image_bytes(), name='first.png'),
+        )
+        render = images.render
+
+        def replaced_meanwhile(storage, name):
+            result = render(storage, name)
+            Book.objects.filter(pk=book.pk).update(cover_image='blobs/newer.png')
+            return result
+
+        with mock.patch('bookswap.images.render', side_effect=replaced_meanwhile):
+            images.process(Book, book.pk, 'cover_image', 'cover_variants')
+        book.refresh_from_db()
+        self.assertEqual((book.cover_image.name, book.cover_variants), ('blobs/newer.png', {}))
+
+    def test_process_images_catches_up(self):
+        # Saved without the API, so nothing was queued.
+        book = Book.objects.create(
+            owner=self.user, title='Imported', author='A', cover_image=ContentFile(image_bytes(), name='old.png'),
+        )
+        Book.objects.create(owner=self.user, title='No cover', author='B')
+        stdout = mock.Mock()
+        call_command('process_images', stdout=stdout)
+        book.refresh_from_db()
+        self.assertEqual(set(book.cover_variants), set(images.VARIANTS))
+        self.assertIn('books.Book.cover_image: processed 1, failed 0', str(stdout.write.call_args_list))
+
+        stdout = mock.Mock()
+        call_command('process_images', stdout=stdout)
+        self.assertIn('books.Book.cover_image: processed 0, failed 0', str(stdout.write.call_args_list))
+
+    def test_process_images_reports_failures(self):
+        Book.objects.create(
+            owner=self.user, title='Broken', author='A', cover_image=ContentFile(b'not an image', name='bad.png'),
+        )
+        stdout, stderr = mock.Mock(), mock.Mock()
+        call_command('process_images', stdout=stdout, stderr=stderr)
+        self.assertIn('processed 0, failed 1', str(stdout.write.call_args_list))
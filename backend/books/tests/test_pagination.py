@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from books.models import Book
+
+User = get_user_model()
+
+
+class BookPaginationTests(APITestCase):
+    """Cursor and offset pages share one envelope and walk the whole list."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', password='pw12345!')
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        for i, title in enumerate(['Delta', 'Alpha', 'Echo', 'Charlie', 'Bravo']):
+            book = Book.objects.create(owner=self.user, title=title, author='Author')
+            Book.objects.filter(pk=book.pk).update(created_at=now - timedelta(minutes=i))
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def walk(self, url, link='next'):
+        pages = [self.get(url)]
+        while pages[-1][link]:
+            pages.append(self.get(pages[-1][link]))
+        return pages
+
+    def titles(self, pages):
+        return [book['title'] for page in pages for book in page['results']]
+
+    def test_envelopes_match(self):
+        for url in ('/api/books/?page_size=2', '/api/books/?ordering=title&page_size=2', '/api/books/?search=Alpha'):
+            with self.subTest(url=url):
+                self.assertEqual(list(self.get(url)), ['next', 'previous', 'results'])
+
+    def test_cursor_pages(self):
+        pages = self.walk('/api/books/?page_size=2')
+        self.assertEqual(self.titles(pages), ['Delta', 'Alpha', 'Echo', 'Charlie', 'Bravo'])
+        self.assertIn('cursor=', pages[1]['next'])
+        self.assertEqual(self.titles(self.walk(pages[-1]['previous'], 'previous')), ['Echo', 'Charlie', 'Delta', 'Alpha'])
+
+    def test_offset_pages(self):
+        pages = self.walk('/api/books/?ordering=title&page_size=2')
+        self.assertEqual(self.titles(pages), ['Alpha', 'Bravo', 'Charlie', 'Delta', 'Echo'])
+        self.assertIsNone(pages[0]['previous'])
+        self.assertEqual(pages[1]['previous'], 'http://testserver/api/books/?ordering=title&page_size=2')
+        self.assertIn('page=2', pages[2]['previous'])
+        self.assertIsNone(pages[-1]['next'])
+
+    def test_offset_pages_skip_the_count(self):
+        with self.assertNumQueries(1):
+            self.client.get('/api/books/?ordering=title&page_size=2&page=2')
+
+    def test_invalid_pages(self):
+        for page in ('0', 'two', '9'):
+            with self.subTest(page=page):
+                self.assertEqual(self.client.get(f'/api/books/?ordering=title&page={page}').status_code, 404)
+        self.assertEqual(self.client.get('/api/books/?cursor=bogus').status_code, 404)
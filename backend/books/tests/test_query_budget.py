@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from books import autocomplete
+from books.models import Book
+
+User = get_user_model()
+
+PAGE_SIZES = (5, 20)
+
+
+class BookQueryBudgetTests(APITestCase):
+    """Query counts of every read endpoint stay flat whatever the page size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pw12345!')
+        cls.other = User.objects.create_user(username='owner', password='pw12345!')
+        for i in range(25):
+            Book.objects.create(owner=cls.user, title=f'Mine {i}', author='Reader', genre='fiction')
+            Book.objects.create(owner=cls.other, title=f'Theirs {i}', author='Owner', genre='mystery')
+        cls.book = Book.objects.filter(owner=cls.other).first()
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def assertBudget(self, url, queries, **params):
+        for page_size in PAGE_SIZES:
+            with self.subTest(url=url, page_size=page_size):
+                # Measure a cache miss.
+                cache.clear()
+                autocomplete.cache.clear()
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url, {'page_size': page_size, **params})
+                self.assertEqual(response.status_code, 200)
+
+    def test_list(self):
+        self.assertBudget('/api/books/', 1)
+        self.assertBudget('/api/books/', 1, genre='mystery', exclude_own='true')
+
+    def test_retrieve(self):
+        self.assertBudget(f'/api/books/{self.book.pk}/', 1)
+
+    def test_my_books(self):
+        self.assertBudget('/api/books/my_books/', 1)
+
+    def test_available_books(self):
+        self.assertBudget('/api/books/available_books/', 1)
+
+    def test_facets(self):
+        self.assertBudget('/api/books/facets/', 1)
+
+    def test_autocomplete(self):
+        # Served from the prefix table; counted once per request.
+        self.assertBudget('/api/books/autocomplete/', 1, q='the')
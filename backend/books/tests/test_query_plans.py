@@ -0,0 +1,78 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework.test import APITestCase
+
+from books import autocomplete
+from books.models import Book
+from bookswap.testing import query_plans
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plans are checked on SQLite')
+class BookQueryPlanTests(APITestCase):
+    """The hot book list queries are answered from their indexes, without sorting."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pw12345!')
+        for i in range(10):
+            Book.objects.create(owner=cls.user, title=f'Book {i}', author='Author', genre='poetry')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def assertUsesIndex(self, url, index):
+        plans = query_plans(self.client, url, 'books')
+        self.assertEqual(len(plans), 1, plans)
+        plan = ' | '.join(plans[0])
+        self.assertIn(f'books USING INDEX {index}', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_recent(self):
+        self.assertUsesIndex('/api/books/', 'books_recent_idx')
+
+    def test_available(self):
+        self.assertUsesIndex('/api/books/?is_available=true', 'books_available_recent_idx')
+        self.assertUsesIndex('/api/books/available_books/', 'books_available_recent_idx')
+
+    def test_genre(self):
+        self.assertUsesIndex('/api/books/?genre=poetry&is_available=true', 'books_genre_available_idx')
+
+    def test_condition(self):
+        self.assertUsesIndex('/api/books/?condition=good&is_available=true', 'books_cond_available_idx')
+
+    def test_owner(self):
+        self.assertUsesIndex('/api/books/my_books/', 'books_owner_recent_idx')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plans are checked on SQLite')
+class SuggestionQueryPlanTests(APITestCase):
+    """Autocomplete walks an index in popularity order for short queries and a prefix range for longer ones."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pw12345!')
+        for i in range(10):
+            Book.objects.create(owner=cls.user, title=f'Book {i}', author='Author')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        autocomplete.cache.clear()
+
+    def plan(self, q):
+        plans = query_plans(self.client, f'/api/books/autocomplete/?q={q}', 'book_suggestions')
+        self.assertEqual(len(plans), 1, plans)
+        return ' | '.join(plans[0])
+
+    def test_short_prefixes_are_read_in_order(self):
+        for q, index in (('b', 'book_suggestion_prefix1_idx'), ('bo', 'book_suggestion_prefix2_idx')):
+            with self.subTest(q=q):
+                plan = self.plan(q)
+                self.assertIn(f'USING INDEX {index}', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_longer_prefixes_scan_a_range(self):
+        self.assertIn('USING INDEX book_suggestion_prefix_idx', self.plan('book 1'))
@@ -0,0 +1,99 @@
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from rest_framework.test import APITestCase
+
+from books import search
+from books.models import Book
+
+User = get_user_model()
+
+
+class SearchIndexTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', password='pw12345!')
+        self.client.force_authenticate(self.user)
+
+    def add_book(self, title, author='Agatha Christie', **fields):
+        return Book.objects.create(owner=self.user, title=title, author=author, **fields)
+
+    def search_ids(self, query, **params):
+        response = self.client.get('/api/books/', {'search': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return {book['id'] for book in response.data['results']}
+
+    def test_books_created_after_migrate_are_searchable(self):
+        book = self.add_book('Crime and Punishment', author='Fyodor Dostoevsky')
+        self.add_book('Emma', author='Jane Austen')
+        self.assertTrue(search.is_supported(connection))
+        self.assertEqual(self.search_ids('crime'), {book.id})
+        self.assertEqual(self.search_ids('Dostoyevsky', search_mode='fuzzy'), {book.id})
+
+    def test_edited_books_are_reindexed(self):
+        book = self.add_book('Draft title')
+        book.title = 'Murder on the Orient Express'
+        book.save()
+        self.assertEqual(self.search_ids('orient'), {book.id})
+        self.assertEqual(self.search_ids('draft'), set())
+
+    def test_missing_trigger_falls_back_and_is_repaired(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER books_fts_ai")
+        self.assertFalse(search.is_supported(connection))
+        book = self.add_book('The Crime at Black Dudley')
+        # Not indexed, but the icontains fallback still finds it.
+        self.assertEqual(self.search_ids('crime'), {book.id})
+
+        search.repair_index(connection)
+        self.assertTrue(search.is_supported(connection))
+        self.assertEqual(
+            set(search.search(Book.objects.all(), 'crime').values_list('id', flat=True)), {book.id}
+        )
+
+    def test_fuzzy_cap_applies_after_filters(self):
+        Book.objects.bulk_create([
+            # Closer matches than the poetry book, enough to fill the cap.
+            Book(owner=self.user, title=f'Notes {i}', author='Fyodor Dostoyevsky', genre='fiction')
+            for i in range(search.FUZZY_MAX_RESULTS + 50)
+        ])
+        poems = self.add_book('Poems', author='Fyodor Dostoevsky', genre='poetry')
+        self.assertEqual(self.search_ids('Dostoyevsky', search_mode='fuzzy', genre='poetry'), {poems.id})
+
+    @skipUnless(connection.vendor == 'sqlite', 'Only SQLite reads candidates per trigram.')
+    def test_fuzzy_candidates_are_capped_per_trigram(self):
+        Book.objects.bulk_create([
+            Book(owner=self.user, title=f'Notes {i}', author='Fyodor Dostoyevsky') for i in range(100)
+        ])
+        closest = self.add_book('Dostoyevsky', author='Dostoyevsky')
+        grams = search.trigrams('Dostoyevsky')
+        with mock.patch.object(search, 'FUZZY_CANDIDATES_PER_TRIGRAM', 5), \
+                mock.patch.object(search, 'FUZZY_MAX_RESULTS', 1000):
+            ids = list(search.fuzzy_search(Book.objects.all(), 'Dostoyevsky').values_list('id', flat=True))
+        self.assertLessEqual(len(ids), 5 * len(grams))
+        self.assertIn(closest.id, ids)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite rebuilds the books table to add columns.')
+class SearchMigrationTests(TransactionTestCase):
+    """Migrations alone keep the index triggers, without the post_migrate repair."""
+
+    def test_books_created_after_migrating_are_searchable(self):
+        # Replay the migrations that rebuild the books table.
+        executor = MigrationExecutor(connection)
+        executor.migrate([('books', '0009_book_sync')])
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        self.assertTrue(search.is_supported(connection))
+
+        user = User.objects.create_user(username='reader', password='pw12345!')
+        book = Book.objects.create(owner=user, title='Crime and Punishment', author='Fyodor Dostoevsky')
+        Book.objects.create(owner=user, title='Emma', author='Jane Austen')
+        self.assertEqual(list(search.search(Book.objects.all(), 'crime').values_list('id', flat=True)), [book.id])
+        self.assertEqual(
+            list(search.fuzzy_search(Book.objects.all(), 'Dostoyevsky').values_list('id', flat=True)), [book.id]
+        )
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from books.views import BookViewSet
+from bookswap import sync
+from bookswap.models import SyncChange
+
+User = get_user_model()
+
+
+class BookDeltaSyncTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='pw12345!')
+        self.owner = User.objects.create_user(username='owner', password='pw12345!')
+        self.book = Book.objects.create(owner=self.owner, title='Mine', author='A')
+        self.other = Book.objects.create(owner=self.user, title='Other', author='B')
+        self.client.force_authenticate(self.user)
+        full = self.sync('')
+        self.assertFalse(full['has_more'])
+        self.token = full['since']
+
+    def sync(self, token):
+        response = self.client.get('/api/books/', {'since': token})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def synced_ids(self):
+        return [book['id'] for book in self.sync(self.token)['results']]
+
+    def test_full_sync_pages_by_id(self):
+        with mock.patch.object(BookViewSet, 'sync_page_size', 1):
+            first = self.sync('')
+            self.assertEqual([book['id'] for book in first['results']], [self.book.pk])
+            self.assertTrue(first['has_more'])
+            second = self.sync(first['since'])
+            self.assertEqual([book['id'] for book in second['results']], [self.other.pk])
+            self.assertFalse(second['has_more'])
+        # Carries on from the log position it started at.
+        self.assertEqual(self.sync(second['since'])['results'], [])
+
+    def test_nothing_changed(self):
+        data = self.sync(self.token)
+        self.assertEqual((data['results'], data['deleted'], data['has_more']), ([], [], False))
+
+    def test_changed_and_deleted_books(self):
+        self.book.title = 'Renamed'
+        self.book.save()
+        pk = self.other.pk
+        self.other.delete()
+        data = self.sync(self.token)
+        self.assertEqual([book['title'] for book in data['results']], ['Renamed'])
+        self.assertEqual(data['deleted'], [pk])
+        self.assertEqual(self.sync(data['since'])['results'], [])
+
+    def test_owner_profile_change_resends_books(self):
+        stamped = Book.objects.get(pk=self.book.pk).updated_at
+        self.owner.location = 'Lisbon'
+        self.owner.save()
+        self.assertEqual(self.synced_ids(), [self.book.pk])
+        # Only the log is written; the book's own timestamp is left alone.
+        self.assertEqual(Book.objects.get(pk=self.book.pk).updated_at, stamped)
+
+    def test_page_can_end_inside_a_change(self):
+        more = [Book.objects.create(owner=self.owner, title=f'More {i}', author='C').pk for i in range(2)]
+        after_creates = self.sync(self.token)['since']
+        self.owner.location = 'Porto'
+        self.owner.save()
+        with mock.patch.object(BookViewSet, 'sync_page_size', 2):
+            first = self.sync(after_creates)
+            self.assertTrue(first['has_more'])
+            second = self.sync(first['since'])
+        self.assertFalse(second['has_more'])
+        synced = [book['id'] for book in first['results'] + second['results']]
+        self.assertEqual(sorted(synced), sorted([self.book.pk, *more]))
+
+    def test_slow_transaction_is_picked_up(self):
+        with mock.patch('bookswap.commitorder.horizon', return_value=7):
+            token = self.sync('')['since']
+            # Transaction 8 committed; 7 is still running.
+            SyncChange.objects.create(xid=8, kind='book', object_id=self.book.pk)
+            data = self.sync(token)
+            self.assertEqual(data['results'], [])
+            token = data['since']
+        SyncChange.objects.create(xid=7, kind='book', object_id=self.other.pk)
+        with mock.patch('bookswap.commitorder.horizon', return_value=9):
+            data = self.sync(token)
+        self.assertEqual(sorted(book['id'] for book in data['results']), sorted([self.book.pk, self.other.pk]))
+
+    def test_old_tokens_expire(self):
+        long_ago = timezone.now() - timedelta(days=365)
+        with mock.patch('django.utils.timezone.now', return_value=long_ago):
+            token = sync.encode_token((0, 0, 0))
+        response = self.client.get('/api/books/', {'since': token})
+        self.assertEqual(response.status_code, 410)
+
+    def test_invalid_token(self):
+        self.assertEqual(self.client.get('/api/books/', {'since': 'nope'}).status_code, 404)
+
+    def test_prune_keeps_recent_changes(self):
+        SyncChange.objects.update(created_at=timezone.now() - timedelta(days=365))
+        self.book.save()
+        call_command('prune_sync_changes', stdout=mock.Mock())
+        self.assertEqual(list(SyncChange.objects.values_list('object_id', flat=True)), [self.book.pk])
@@ -1,21 +1,35 @@
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from bookswap.conditional import ConditionalGetMixin
+from bookswap.models import SyncChange
+from bookswap.serializers import customized, is_referenced
+from bookswap.sync import DeltaSyncMixin
+from bookswap.viewcache import VersionedCacheMixin
+from users.serializers import UserProfileSerializer
+from . import autocomplete as suggestions
+from . import cache as book_cache
+from . import facets as facet_counts
+from .fast_serializers import FastBookSerializer
+from .filters import BookSearchFilter, RelevanceOrderingFilter
 from .models import Book
 from .serializers import BookSerializer, BookCreateSerializer, BookUpdateSerializer
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(DeltaSyncMixin, VersionedCacheMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Book model."""
-    queryset = Book.objects.all()
+    queryset = Book.objects.select_related('owner')
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, BookSearchFilter, RelevanceOrderingFilter]
     filterset_fields = ['genre', 'condition', 'is_available', 'owner']
     search_fields = ['title', 'author', 'description']
     ordering_fields = ['created_at', 'title', 'author']
     ordering = ['-created_at']
+    conditional_timestamp_fields = ['updated_at', 'owner__updated_at']
+    fast_list_actions = ['list', 'my_books', 'available_books']
+    cached_actions = ['list', 'retrieve', 'my_books', 'available_books']
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -40,6 +54,48 @@ class BookViewSet(viewsets.ModelViewSet):
         
         return queryset
 
+    def get_sync_queryset(self):
+        # Sync covers every book, whatever ``available``/``exclude_own`` say.
+        return super().get_queryset()
+
+    def get_cache_scopes(self):
+        params = self.request.query_params
+        if self.action == 'retrieve':
+            return [f"book:{self.kwargs['pk']}"]
+        if self.action == 'my_books':
+            return [book_cache.list_scope(params, owner_id=self.request.user.pk)]
+        if self.action == 'available_books':
+            return [book_cache.list_scope(params, available=True)]
+        return [book_cache.list_scope(params)]
+
+    def is_personal(self):
+        return (
+            self.action in ('my_books', 'available_books')
+            or self.request.query_params.get('exclude_own') == 'true'
+        )
+
+    def get_sync_changes(self):
+        return SyncChange.objects.filter(kind__in=['book', 'user'])
+
+    def get_nesting_rows(self, kind, object_ids):
+        # Book responses nest the owner's profile.
+        if kind != 'user':
+            return ()
+        return self.get_sync_queryset().filter(owner_id__in=object_ids).values_list('owner_id', 'pk')
+
+    def get_fast_list_serializer(self):
+        if self.action in self.fast_list_actions and not customized(self.request):
+            return FastBookSerializer(self.request)
+        return None
+
+    def get_included(self, books):
+        """Side-load the owners that compact responses reference by id."""
+        if not is_referenced(self.request, 'owner'):
+            return {}
+        owners = {book.owner_id: book.owner for book in books}
+        serializer = UserProfileSerializer(owners.values(), many=True, context=self.get_serializer_context())
+        return {'users': serializer.data}
+
     def perform_create(self, serializer):
         """Set the owner to the current user when creating a book."""
         serializer.save(owner=self.request.user)
@@ -67,8 +123,7 @@ class BookViewSet(viewsets.ModelViewSet):
     def my_books(self, request):
         """Get current user's books."""
         books = self.get_queryset().filter(owner=request.user)
-        serializer = self.get_serializer(books, many=True)
-        return Response(serializer.data)
+        return self.list_response(books)
 
     @action(detail=False, methods=['get'])
     def available_books(self, request):
@@ -76,8 +131,34 @@ class BookViewSet(viewsets.ModelViewSet):
         books = self.get_queryset().filter(
             is_available=True
         ).exclude(owner=request.user)
-        serializer = self.get_serializer(books, many=True)
-        return Response(serializer.data)
+        return self.list_response(books)
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Suggest titles and authors starting with ``?q=``."""
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', suggestions.DEFAULT_LIMIT))
+        except ValueError:
+            limit = suggestions.DEFAULT_LIMIT
+        limit = max(1, min(limit, suggestions.MAX_LIMIT))
+        return Response({
+            'query': query,
+            'results': suggestions.suggest(query, limit),
+        })
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Count books per genre, condition and availability for the current filters."""
+        filters = facet_counts.stored_filters(request.query_params)
+        if filters is None:
+            rows = facet_counts.cell_counts(self.filter_queryset(self.get_queryset()))
+            return Response(facet_counts.summarize(rows))
+
+        excluded = ()
+        if request.query_params.get('exclude_own') == 'true':
+            excluded = facet_counts.cell_counts(Book.objects.filter(owner=request.user, **filters))
+        return Response(facet_counts.summarize(facet_counts.stored_counts(**filters), excluded))
 
     @action(detail=True, methods=['delete'])
     def delete_image(self, request, pk=None):
@@ -93,8 +174,9 @@ class BookViewSet(viewsets.ModelViewSet):
         
         # Delete the image file
         if book.cover_image:
-            book.cover_image.delete(save=False)
+            # The file may be shared; gc_blobs removes it once unreferenced.
             book.cover_image = None
+            book.cover_variants = {}
             book.save()
             return Response({'message': 'Image deleted successfully'})
         else:
@@ -2,6 +2,8 @@
 ASGI config for bookswap project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests go to Django; WebSocket connections are routed by path to the
+handlers in ``websocket_routes``. Served by uvicorn (see the Dockerfile).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -9,8 +11,31 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bookswap.settings')
 
-application = get_asgi_application() 
\ No newline at end of file
+django_application = get_asgi_application()
+if settings.DEBUG:
+    # Serve static files in development, as ``runserver`` does.
+    django_application = ASGIStaticFilesHandler(django_application)
+
+# Imported after Django is set up, since they use models.
+from trades.consumers import trade_events  # noqa: E402
+
+websocket_routes = {
+    '/ws/trades/': trade_events,
+}
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        handler = websocket_routes.get(scope['path'])
+        if handler is None:
+            await receive()
+            await send({'type': 'websocket.close'})
+            return
+        return await handler(scope, receive, send)
+    return await django_application(scope, receive, send)
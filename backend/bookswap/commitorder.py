@@ -0,0 +1,89 @@
+"""
+Reading append-only tables in commit order.
+
+Ids are allocated when a row is inserted, not when its transaction commits,
+so with concurrent writers a reader paging by id can step past a row that
+commits later and never see it. Log tables therefore also store the id of
+the writing transaction (insert ``TransactionId()``) and are read by
+``(xid, id)`` up to the oldest transaction still in flight (``horizon``):
+every row before such a position has committed, and every row committed
+later sorts after it. Positions are plain ``(xid, id)`` tuples.
+
+Postgres provides both values (``txid_current()`` and the snapshot's xmin).
+SQLite runs one writer at a time, so ids already are in commit order there;
+the xid is always 0 and there is no horizon.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections, models
+from django.db.models import Func, Q
+from rest_framework.exceptions import NotFound
+
+START = (0, 0)
+
+
+class TransactionId(Func):
+    """The id of the transaction writing the row, for the ``xid`` column of a log table."""
+    function = 'txid_current'
+    arity = 0
+    output_field = models.BigIntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return '0', []
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, **extra_context)
+
+
+def horizon(using=DEFAULT_DB_ALIAS):
+    """Return the oldest transaction id still in flight, or None if ids are commit-ordered."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT txid_snapshot_xmin(txid_current_snapshot())')
+        return cursor.fetchone()[0]
+
+
+def visible(queryset, limit, after=None, before=None):
+    """
+    Restrict ``queryset`` to the rows committed before the ``horizon``
+    ``limit`` and between the positions ``after`` and ``before`` (both
+    exclusive, either may be None), in commit order.
+    """
+    if after is not None:
+        queryset = queryset.filter(Q(xid__gt=after[0]) | Q(xid=after[0], id__gt=after[1]))
+    if before is not None:
+        queryset = queryset.filter(Q(xid__lt=before[0]) | Q(xid=before[0], id__lt=before[1]))
+    if limit is not None:
+        queryset = queryset.filter(xid__lt=limit)
+    return queryset.order_by('xid', 'id')
+
+
+def caught_up(after, limit):
+    """
+    Return the position to resume from after reading every row ``visible``
+    past ``after`` up to ``limit``, skipping ahead to it where nothing was
+    committed.
+    """
+    if limit is None:
+        return after
+    return max(after, (limit, 0))
+
+
+def position_of(row):
+    return (row.xid, row.id)
+
+
+def encode_position(position):
+    return '%d.%d' % position
+
+
+def decode_position(value, message='Invalid position'):
+    """Parse an ``encode_position`` string, raising ``NotFound`` if it is malformed."""
+    try:
+        xid, pk = value.split('.')
+        position = (int(xid), int(pk))
+    except ValueError:
+        raise NotFound(message)
+    if min(position) < 0:
+        raise NotFound(message)
+    return position
@@ -0,0 +1,164 @@
+"""
+Conditional GET support (ETag / Last-Modified) for API responses.
+
+Validators are computed from ``updated_at`` columns before anything is
+serialized, so a client holding a current copy gets a 304 without the
+serializers running. List validators only look at the page being
+returned, never at the whole collection.
+"""
+import hashlib
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def build_validators(request, *parts):
+    """
+    Return ``(etag, last_modified)`` for a response built from ``parts``.
+
+    The ETag also covers the user, the full path (filters, cursor) and the
+    negotiated media type, since all of them change the response body.
+    Datetimes among ``parts`` determine Last-Modified.
+    """
+    timestamps = [part for part in parts if hasattr(part, 'timestamp')]
+    last_modified = int(max(timestamps).timestamp()) if timestamps else None
+    fingerprint = '|'.join(str(part) for part in (
+        getattr(request.user, 'pk', None),
+        request.get_full_path(),
+        getattr(request, 'accepted_media_type', ''),
+        *parts,
+    ))
+    etag = '"%s"' % hashlib.md5(fingerprint.encode()).hexdigest()
+    return etag, last_modified
+
+
+def not_modified(request, etag, last_modified):
+    """Return a 304 response if the request's validators still match, else None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Authenticated data: browsers may keep it but must revalidate.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def resolve_path(instance, path):
+    """
+    Follow a ``related__field`` path on a model instance.
+
+    Reverse relations (e.g. ``messages__created_at``) resolve to the largest
+    value among the related rows, using prefetched rows when available and
+    a ``MAX()`` query otherwise.
+    """
+    name, _, rest = path.partition('__')
+    value = getattr(instance, name, None)
+    if value is None or not rest:
+        return value
+    if hasattr(value, 'all'):
+        if name not in getattr(instance, '_prefetched_objects_cache', {}):
+            return value.aggregate(latest=Max(rest))['latest']
+        values = [resolve_path(related, rest) for related in value.all()]
+        values = [v for v in values if v is not None]
+        return max(values) if values else None
+    return resolve_path(value, rest)
+
+
+def row_value(row, path):
+    """Read ``path`` from a model instance or a named ``values_list`` row."""
+    if hasattr(row, '_fields'):
+        return getattr(row, path)
+    return resolve_path(row, path)
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin answering ``list``, ``retrieve`` and list-style actions
+    with ETag / Last-Modified validators.
+
+    ``conditional_timestamp_fields`` lists every timestamp the serialized
+    output depends on, including nested objects (``owner__updated_at``).
+    Paginated list responses also carry whatever ``get_included`` returns
+    for the page, e.g. side-loaded users.
+    """
+    conditional_timestamp_fields = ['updated_at']
+
+    def get_included(self, page):
+        """Extra top-level keys to add to a paginated list response."""
+        return {}
+
+    def get_fast_list_serializer(self):
+        """
+        Optionally return a ``FastListSerializer`` rendering list responses
+        from ``values_list`` rows instead of model instances.
+        """
+        return None
+
+    def get_page_validators(self, rows, paginated):
+        """
+        Validators of one page: the ids and timestamps of its rows, plus the
+        paginator's envelope (links, count) since rows outside the page
+        change it too.
+        """
+        parts = []
+        for row in rows:
+            parts.append(row_value(row, 'id'))
+            parts.extend(row_value(row, path) for path in self.conditional_timestamp_fields)
+        if paginated:
+            envelope = self.paginator.get_paginated_response([]).data
+            parts.extend(value for key, value in envelope.items() if key != 'results')
+        return build_validators(self.request, *parts)
+
+    def get_object_validators(self, instance):
+        values = [resolve_path(instance, path) for path in self.conditional_timestamp_fields]
+        return build_validators(self.request, instance.pk, *values)
+
+    def list_response(self, queryset):
+        """Serialize one page of ``queryset``, or answer 304 if it is unchanged."""
+        fast_serializer = self.get_fast_list_serializer()
+        if fast_serializer is not None:
+            selected = fast_serializer.columns.names
+            fast_serializer.columns.add(
+                *(path for path in ['id', *self.conditional_timestamp_fields] if path not in selected)
+            )
+            queryset = fast_serializer.prepare(queryset)
+
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+        etag, last_modified = self.get_page_validators(rows, page is not None)
+        response = not_modified(self.request, etag, last_modified)
+        if response is not None:
+            return response
+
+        if fast_serializer is not None:
+            data = fast_serializer.serialize(rows)
+        else:
+            data = self.get_serializer(rows, many=True).data
+
+        if page is not None:
+            response = self.get_paginated_response(data)
+            if fast_serializer is None:
+                response.data.update(self.get_included(page))
+        else:
+            response = Response(data)
+        return set_validators(response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.get_object_validators(instance)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag, last_modified)
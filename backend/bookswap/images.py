@@ -0,0 +1,191 @@
+"""
+Background processing of uploaded images (book covers, avatars).
+
+After an upload commits, a worker thread stores a copy of the original
+without its metadata (EXIF, GPS, ICC comments) in its place and renders
+resized WebP and JPEG variants. The variant file names are then stored in
+the model's JSON variants field, which serializers turn into URLs. Until
+the worker is done the field is empty and clients fall back to the
+original. Files are kept in the content-addressed ``mediastore``, so
+identical images share their variants too.
+
+Work queued in the thread pool is lost if the process exits; run
+``manage.py process_images`` to catch up on anything left unprocessed.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from mediastore import references
+from PIL import Image, ImageOps
+
+from . import viewcache
+from .models import SyncChange
+
+logger = logging.getLogger(__name__)
+
+# Bounding boxes; images are only ever scaled down.
+VARIANTS = {
+    'thumbnail': (160, 240),
+    'card': (400, 600),
+    'detail': (1000, 1500),
+}
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Pillow formats the original is re-saved in after stripping metadata.
+# Multi-picture JPEGs from phones are saved as plain JPEGs; animated GIFs
+# are left alone.
+ORIGINAL_FORMATS = {'JPEG': 'JPEG', 'MPO': 'JPEG', 'PNG': 'PNG', 'WEBP': 'WEBP'}
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    return ThreadPoolExecutor(max_workers=settings.IMAGE_PROCESSING_WORKERS, thread_name_prefix='images')
+
+
+def variant_names(name):
+    """Return ``{variant: {format: file name}}`` to save the variants of the stored file ``name`` as."""
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return {
+        variant: {fmt: f'{directory}/variants/{stem}/{variant}.{fmt}' for fmt in FORMATS}
+        for variant in VARIANTS
+    }
+
+
+def flatten(image):
+    """Return ``image`` as RGB, with any transparency drawn over white."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def encode(image, fmt, **options):
+    buffer = BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def render(storage, name):
+    """
+    Store a copy of the image ``name`` without metadata, and its variants.
+
+    Returns the name of the clean copy (``name`` itself if the format is
+    left alone) and the variants as ``{variant: {'webp': name, 'jpeg':
+    name, 'width': w, 'height': h}}``.
+    """
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        original_format = image.format
+        image.load()
+    # Apply the EXIF rotation before the EXIF block is dropped.
+    image = ImageOps.exif_transpose(image)
+
+    clean_name = name
+    original_format = ORIGINAL_FORMATS.get(original_format)
+    if original_format is not None:
+        clean = image if original_format != 'JPEG' else flatten(image)
+        data = encode(clean, original_format, **({'quality': 92} if original_format == 'JPEG' else {}))
+        clean_name = storage.save(name, ContentFile(data))
+
+    rgb = flatten(image)
+    variants = {}
+    for variant, names in variant_names(name).items():
+        resized = rgb.copy()
+        resized.thumbnail(VARIANTS[variant], Image.LANCZOS)
+        files = {
+            fmt: storage.save(names[fmt], ContentFile(encode(resized, pillow_format, **options)))
+            for fmt, (pillow_format, options) in FORMATS.items()
+        }
+        variants[variant] = {**files, 'width': resized.width, 'height': resized.height}
+    return clean_name, variants
+
+
+def process(model, pk, field, variants_field):
+    """
+    Render the variants of ``model`` row ``pk``'s image ``field``.
+
+    The result is only stored if the row still holds the same file, so a
+    newer upload processed in parallel is never overwritten. Files of a
+    result that was not stored are left to ``gc_blobs``. Cached responses
+    showing the row are invalidated and rows nesting it are resent to
+    delta syncs.
+    """
+    row = model.objects.filter(pk=pk).values(field, variants_field).first()
+    if row is None or not row[field]:
+        return None
+    name = row[field]
+    clean_name, variants = render(model._meta.get_field(field).storage, name)
+    with transaction.atomic():
+        updated = model.objects.filter(pk=pk, **{field: name}).update(
+            **{field: clean_name, variants_field: variants, 'updated_at': timezone.now()}
+        )
+        if updated:
+            # ``update()`` bypasses the signals keeping blob references.
+            references.replace(references.row_names(model, row), references.names_in(clean_name, variants))
+            viewcache.rows_updated(model, [pk])
+            SyncChange.record(model, [pk])
+    return variants
+
+
+def run(model, pk, field, variants_field):
+    """Worker thread entry point for ``process``."""
+    close_old_connections()
+    try:
+        process(model, pk, field, variants_field)
+    except Exception:
+        logger.exception("Processing %s %s %s failed", model._meta.label, pk, field)
+    finally:
+        close_old_connections()
+
+
+def schedule(instance, field, variants_field):
+    """Process ``instance``'s image ``field`` in the background once the current transaction commits."""
+    if not getattr(instance, field):
+        return
+    args = (type(instance), instance.pk, field, variants_field)
+    transaction.on_commit(lambda: get_executor().submit(run, *args))
+
+
+def variant_urls(variants, storage, request=None):
+    """Turn stored variants into ``{variant: {'webp': url, 'jpeg': url, 'width', 'height'}}``."""
+    urls = {}
+    for variant, files in (variants or {}).items():
+        entry = dict(files)
+        for fmt in FORMATS:
+            url = storage.url(files[fmt])
+            entry[fmt] = request.build_absolute_uri(url) if request is not None else url
+        urls[variant] = entry
+    return urls
+
+
+class ProcessedImagesMixin:
+    """
+    ModelSerializer mixin clearing the variants of newly uploaded images
+    and queueing their processing, so saving never waits for Pillow.
+
+    ``processed_image_fields`` maps image fields to their variants field.
+    """
+    processed_image_fields = {}
+
+    def save(self, **kwargs):
+        uploaded = [field for field in self.processed_image_fields if field in self.validated_data]
+        for field in uploaded:
+            kwargs[self.processed_image_fields[field]] = {}
+        instance = super().save(**kwargs)
+        for field in uploaded:
+            schedule(instance, field, self.processed_image_fields[field])
+        return instance
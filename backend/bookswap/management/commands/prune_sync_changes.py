@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from bookswap.sync import prune_changes
+
+
+class Command(BaseCommand):
+    help = "Delete delta sync change log entries older than any valid sync token (SYNC_TOKEN_RETENTION_DAYS)."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"sync_changes: pruned {prune_changes()}")
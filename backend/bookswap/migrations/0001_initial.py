@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('xid', models.BigIntegerField(default=0, editable=False)),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('requester_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('recipient_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'sync_changes',
+                'indexes': [models.Index(fields=['xid', 'id'], name='sync_changes_commit_idx'), models.Index(fields=['created_at'], name='sync_changes_created_idx')],
+            },
+        ),
+    ]
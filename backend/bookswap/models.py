@@ -0,0 +1,56 @@
+from django.db import models
+
+from .commitorder import TransactionId
+
+
+class SyncChange(models.Model):
+    """
+    Log of rows changed or deleted, read by delta sync in commit order (see
+    ``bookswap.sync``). One entry per row written; the rows whose responses
+    nest it are worked out by the reader, so a change never fans out into
+    further writes.
+
+    Entries for trades carry both parties, so a deletion still reaches them
+    after the trade is gone.
+    """
+    id = models.BigAutoField(primary_key=True)
+    # The writing transaction, see ``bookswap.commitorder``.
+    xid = models.BigIntegerField(default=0, editable=False)
+    # ``model_name`` of the row: 'user', 'book' or 'trade'.
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    deleted = models.BooleanField(default=False)
+    requester_id = models.PositiveBigIntegerField(null=True, blank=True)
+    recipient_id = models.PositiveBigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'sync_changes'
+        indexes = [
+            models.Index(fields=['xid', 'id'], name='sync_changes_commit_idx'),
+            # Pruning walks the oldest entries.
+            models.Index(fields=['created_at'], name='sync_changes_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} {'deleted' if self.deleted else 'changed'}"
+
+    @classmethod
+    def record(cls, model, pks, deleted=False):
+        """Log ``model`` rows ``pks`` as changed (or deleted)."""
+        kind = model._meta.model_name
+        return cls.objects.bulk_create([
+            cls(xid=TransactionId(), kind=kind, object_id=pk, deleted=deleted)
+            for pk in sorted(set(pks))
+        ])
+
+    @classmethod
+    def record_trades(cls, trades, deleted=False):
+        """Log ``trades`` as changed (or deleted), with their parties."""
+        return cls.objects.bulk_create([
+            cls(
+                xid=TransactionId(), kind='trade', object_id=trade.pk, deleted=deleted,
+                requester_id=trade.requester_id, recipient_id=trade.recipient_id,
+            )
+            for trade in trades
+        ])
@@ -0,0 +1,324 @@
+"""
+Keyset pagination: ``KeysetPagination`` keyed on ``(created_at, id)`` for
+feeds, ``IdRangePagination`` keyed on ``id`` for append-only streams and
+``CommitOrderPagination`` keyed on ``(xid, id)`` for logs read in commit
+order.
+
+Each page is fetched with an indexed range condition instead of
+``COUNT(*)`` plus ``OFFSET``, so deep pages cost the same as the first.
+"""
+import base64
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import commitorder
+
+
+class SizedPagination(BasePagination):
+    """Base class reading the page size from ``?page_size=``, capped at ``max_page_size``."""
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+
+class KeysetPagination(SizedPagination):
+    """
+    Paginate querysets ordered by ``created_at`` (either direction) with an
+    opaque ``?cursor=`` holding the ``(created_at, id)`` of the page edge.
+
+    Querysets with any other ordering (``?ordering=title``, search
+    relevance, ...) are paged by offset with ``?page=`` instead. Both
+    return the same ``next``/``previous``/``results`` envelope, and the
+    offset pages skip ``COUNT(*)`` too by fetching one extra row.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    page_query_param = 'page'
+    invalid_page_message = 'Invalid page'
+
+    keyset_orderings = {
+        ('-created_at',): True,
+        ('-created_at', '-id'): True,
+        ('created_at',): False,
+        ('created_at', 'id'): False,
+    }
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.next_link = self.previous_link = None
+
+        ordering = tuple(queryset.query.order_by or queryset.model._meta.ordering)
+        if ordering not in self.keyset_orderings:
+            return self.paginate_by_offset(queryset, request)
+
+        descending = self.keyset_orderings[ordering]
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        # Reversed cursors walk back towards the start of the list.
+        reverse = bool(position and position['reverse'])
+        forward = descending != reverse
+        if forward:
+            queryset = queryset.order_by('-created_at', '-id')
+        else:
+            queryset = queryset.order_by('created_at', 'id')
+
+        if position:
+            created_at, pk = position['created_at'], position['id']
+            if forward:
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+            else:
+                queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+            has_next, has_previous = position is not None, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        if results and has_next:
+            self.next_link = self.encode_link(self.position_of(results[-1], reverse=False))
+        if results and has_previous:
+            self.previous_link = self.encode_link(self.position_of(results[0], reverse=True))
+        return results
+
+    def paginate_by_offset(self, queryset, request):
+        page_size = self.get_page_size(request)
+        number = self.get_page_number(request)
+        offset = (number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        if not results and number > 1:
+            raise NotFound(self.invalid_page_message)
+        has_next = len(results) > page_size
+        results = results[:page_size]
+
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        if has_next:
+            self.next_link = replace_query_param(url, self.page_query_param, number + 1)
+        if number == 2:
+            self.previous_link = remove_query_param(url, self.page_query_param)
+        elif number > 2:
+            self.previous_link = replace_query_param(url, self.page_query_param, number - 1)
+        return results
+
+    def get_page_number(self, request):
+        value = request.query_params.get(self.page_query_param)
+        if not value:
+            return 1
+        try:
+            number = int(value)
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        if number < 1:
+            raise NotFound(self.invalid_page_message)
+        return number
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        return self.next_link
+
+    def get_previous_link(self):
+        return self.previous_link
+
+    @staticmethod
+    def position_of(obj, reverse):
+        # ``obj`` is a model instance or a named ``values_list`` row.
+        return {'created_at': obj.created_at, 'id': obj.id, 'reverse': reverse}
+
+    def encode_link(self, position):
+        payload = json.dumps([position['created_at'].isoformat(), position['id'], int(position['reverse'])])
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(remove_query_param(self.base_url, 'page'), self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            created_at, pk, reverse = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            return {
+                'created_at': datetime.fromisoformat(created_at),
+                'id': int(pk),
+                'reverse': bool(reverse),
+            }
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class IdRangePagination(SizedPagination):
+    """
+    Paginate an append-only stream, such as chat messages, by primary key.
+
+    ``?after_id=`` returns the rows following a known id, so clients only
+    fetch what is new; ``?before_id=`` returns the rows just before one.
+    Without either, the latest page is returned. Results are always in
+    ascending id order.
+    """
+    page_size = 50
+    after_query_param = 'after_id'
+    before_query_param = 'before_id'
+    invalid_id_message = 'Invalid message id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        after = self.get_id(request, self.after_query_param)
+        before = self.get_id(request, self.before_query_param)
+        page_size = self.get_page_size(request)
+
+        if after is not None:
+            queryset = queryset.filter(id__gt=after)
+        if before is not None:
+            queryset = queryset.filter(id__lt=before)
+
+        # Walk forwards from ``after_id``, otherwise backwards from the end.
+        forward = after is not None
+        results = list(queryset.order_by('id' if forward else '-id')[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if forward:
+            has_newer, has_older = has_more, True
+        else:
+            results.reverse()
+            has_newer, has_older = before is not None, has_more
+
+        self.next_id = results[-1].id if results and has_newer else None
+        self.previous_id = results[0].id if results and has_older else None
+        return results
+
+    def get_id(self, request, param):
+        value = request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise NotFound(self.invalid_id_message)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return KeysetPagination.get_paginated_response_schema(self, schema)
+
+    def get_next_link(self):
+        if self.next_id is None:
+            return None
+        url = remove_query_param(self.base_url, self.before_query_param)
+        return replace_query_param(url, self.after_query_param, self.next_id)
+
+    def get_previous_link(self):
+        if self.previous_id is None:
+            return None
+        url = remove_query_param(self.base_url, self.after_query_param)
+        return replace_query_param(url, self.before_query_param, self.previous_id)
+
+
+class CommitOrderPagination(SizedPagination):
+    """
+    Paginate a log table in commit order, see ``bookswap.commitorder``.
+
+    ``?after=`` takes an opaque position and returns the entries committed
+    after it; ``next`` then always links to the following entries, even
+    once caught up, so clients poll it for new ones. ``?before=`` returns
+    the entries just before a position. Without either, the latest page is
+    returned. Results are always in commit order.
+    """
+    page_size = 50
+    after_query_param = 'after'
+    before_query_param = 'before'
+    invalid_position_message = 'Invalid position'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        after = self.get_position(request, self.after_query_param)
+        before = self.get_position(request, self.before_query_param)
+        page_size = self.get_page_size(request)
+        limit = commitorder.horizon(queryset.db)
+        queryset = commitorder.visible(queryset, limit, after=after, before=before)
+
+        # Walk forwards from ``after``, otherwise backwards from the end.
+        forward = after is not None
+        results = list((queryset if forward else queryset.reverse())[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if not forward:
+            results.reverse()
+
+        first = commitorder.position_of(results[0]) if results else None
+        last = commitorder.position_of(results[-1]) if results else None
+        if forward:
+            self.previous_position = first
+            self.next_position = last if has_more else commitorder.caught_up(last or after, limit)
+        else:
+            self.previous_position = first if has_more else None
+            if before is None:
+                self.next_position = commitorder.caught_up(last or commitorder.START, limit)
+            else:
+                self.next_position = last
+        return results
+
+    def get_position(self, request, param):
+        value = request.query_params.get(param)
+        if not value:
+            return None
+        return commitorder.decode_position(value, self.invalid_position_message)
+
+    def get_paginated_response(self, data):
+        return IdRangePagination.get_paginated_response(self, data)
+
+    def get_paginated_response_schema(self, schema):
+        return KeysetPagination.get_paginated_response_schema(self, schema)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = remove_query_param(self.base_url, self.before_query_param)
+        return replace_query_param(url, self.after_query_param, commitorder.encode_position(self.next_position))
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        url = remove_query_param(self.base_url, self.after_query_param)
+        return replace_query_param(url, self.before_query_param, commitorder.encode_position(self.previous_position))
@@ -0,0 +1,43 @@
+"""
+JSON renderer backed by orjson.
+
+Produces the same bytes as DRF's ``JSONRenderer`` for compact, unicode
+output, and defers to it whenever orjson is not installed or the response
+needs indentation or ASCII escaping.
+"""
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+ORJSON_OPTIONS = (
+    # Datetimes go through DRF's encoder, which writes UTC as ``Z``.
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+)
+
+_encoder = encoders.JSONEncoder()
+
+
+def encode_default(obj):
+    """Encode anything orjson does not handle itself (Decimal, lazy strings, ...)."""
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+        # Same escaping as JSONRenderer: keep the output a strict JavaScript subset.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
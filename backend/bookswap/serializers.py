@@ -0,0 +1,79 @@
+"""
+Sparse fieldsets and compact representations for API serializers.
+
+Query parameters understood by ``DynamicFieldsMixin`` serializers:
+
+- ``?fields=id,title,owner`` keeps only the listed top-level fields.
+- ``?compact=true`` renders related objects by primary key; list endpoints
+  then side-load each referenced user once per response.
+- ``?expand=owner`` keeps the listed relations nested in compact mode.
+"""
+
+
+def _param_set(request, name):
+    if request is None:
+        return None
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+def requested_fields(request):
+    """Return the ``?fields=`` names, or None when every field was requested."""
+    return _param_set(request, 'fields')
+
+
+def expanded_fields(request):
+    return _param_set(request, 'expand') or set()
+
+
+def customized(request):
+    """True if the request asks for anything but the default representation."""
+    return request is not None and any(
+        request.query_params.get(name) for name in ('fields', 'compact', 'expand')
+    )
+
+
+def compact_requested(request):
+    return request is not None and request.query_params.get('compact') == 'true'
+
+
+def is_referenced(request, name):
+    """True if relation ``name`` is rendered by primary key for this request."""
+    if not compact_requested(request) or name in expanded_fields(request):
+        return False
+    fields = requested_fields(request)
+    return fields is None or name in fields
+
+
+class DynamicFieldsMixin:
+    """
+    Apply ``?fields=``, ``?compact=`` and ``?expand=`` to a ModelSerializer.
+
+    Only the serializer built by the view (which receives the request in
+    its context) reads the query string. Nested serializers are switched
+    to compact mode explicitly by passing ``compact=True``.
+    Subclasses list their compact replacements in ``get_compact_fields``.
+    """
+
+    def __init__(self, *args, compact=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self._context.get('request')
+
+        if compact is None:
+            compact = compact_requested(request)
+        if compact:
+            expanded = expanded_fields(request)
+            for name, field in self.get_compact_fields().items():
+                if name in self.fields and name not in expanded:
+                    self.fields[name] = field
+
+        allowed = requested_fields(request)
+        if allowed is not None:
+            for name in set(self.fields) - allowed:
+                self.fields.pop(name)
+
+    def get_compact_fields(self):
+        """Map field names to the replacement field used in compact mode."""
+        return {}
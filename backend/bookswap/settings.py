@@ -29,6 +29,8 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'corsheaders',
     'django_filters',
+    'mediastore',
+    'bookswap',
     'users',
     'books',
     'trades',
@@ -68,11 +70,42 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'bookswap.wsgi.application'
 
-# Database
+# Local memory is per process, so invalidations only reach the process
+# making the write. With several workers use a shared server, e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and
+# CACHE_LOCATION=redis://127.0.0.1:6379/1 (requires the `redis` package).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='bookswap'),
+    }
+}
+
+# Backstop lifetime of cached book responses (see bookswap/viewcache.py).
+VIEW_CACHE_TIMEOUT = config('VIEW_CACHE_TIMEOUT', default=300, cast=int)
+
+# Real-time trade events (see trades/realtime.py). The in-process broker
+# only reaches WebSocket clients connected to the same ASGI worker.
+TRADE_EVENTS_BROKER = config('TRADE_EVENTS_BROKER', default='trades.realtime.InProcessBroker')
+
+# Pending trades older than this are expired by `manage.py expire_trades`.
+TRADE_PENDING_MAX_AGE_DAYS = config('TRADE_PENDING_MAX_AGE_DAYS', default=30, cast=int)
+
+# `?since=` delta sync tokens are valid this long; older ones get 410 Gone
+# and must start over. The change log behind them is pruned by
+# `manage.py prune_sync_changes`.
+SYNC_TOKEN_RETENTION_DAYS = config('SYNC_TOKEN_RETENTION_DAYS', default=90, cast=int)
+
+# Database: SQLite unless DATABASE_ENGINE names another backend, e.g.
+# django.db.backends.postgresql (which CI also runs the tests against).
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': config('DATABASE_ENGINE', default='django.db.backends.sqlite3'),
+        'NAME': config('DATABASE_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        'USER': config('DATABASE_USER', default=''),
+        'PASSWORD': config('DATABASE_PASSWORD', default=''),
+        'HOST': config('DATABASE_HOST', default=''),
+        'PORT': config('DATABASE_PORT', default=''),
     }
 }
 
@@ -106,6 +139,28 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploads are stored once per distinct content and shared between rows;
+# `manage.py gc_blobs` deletes the ones nothing references.
+STORAGES = {
+    'default': {'BACKEND': 'mediastore.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Media is served by mediastore.views.serve_media when SERVE_MEDIA is on.
+# MEDIA_ACCEL ('nginx' or 'sendfile') hands the bytes to the front server
+# via X-Accel-Redirect (to MEDIA_ACCEL_PREFIX + path) or X-Sendfile.
+SERVE_MEDIA = config('SERVE_MEDIA', default=DEBUG, cast=bool)
+MEDIA_ACCEL = config('MEDIA_ACCEL', default='')
+MEDIA_ACCEL_PREFIX = config('MEDIA_ACCEL_PREFIX', default='/protected-media/')
+
+# Resumable uploads (/api/uploads/): largest accepted file, and how long an
+# unfinished or unused session is kept before `gc_blobs` removes it.
+UPLOAD_MAX_SIZE = config('UPLOAD_MAX_SIZE', default=50 * 1024 * 1024, cast=int)
+UPLOAD_SESSION_TTL_HOURS = config('UPLOAD_SESSION_TTL_HOURS', default=24, cast=int)
+
+# Threads resizing uploaded covers and avatars (see bookswap/images.py).
+IMAGE_PROCESSING_WORKERS = config('IMAGE_PROCESSING_WORKERS', default=2, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -117,7 +172,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'bookswap.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'bookswap.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'bookswap.pagination.KeysetPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
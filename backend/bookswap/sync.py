@@ -0,0 +1,224 @@
+"""
+Delta sync for list endpoints: ``?since=<token>`` returns only the rows
+created, updated or deleted after the token, plus a token for next time.
+``?since=`` with an empty value starts a full sync.
+
+Writes log every row they change or delete to ``SyncChange`` in the same
+transaction: signals do for saves and deletes, code writing with
+``QuerySet.update()`` calls ``SyncChange.record`` itself. A sync reads the
+log after its token in commit order (see ``bookswap.commitorder``), so a
+slow transaction is picked up whenever it commits, and maps each entry to
+the rows it resends: the row itself, or the rows whose responses nest it
+(``get_nesting_rows``), e.g. the books of a user whose profile changed.
+Nothing but the log is written for a sync, and ``updated_at`` keeps
+meaning when the row itself changed.
+
+A full sync pages through the rows by id, then carries on from the log
+position it started at.
+"""
+import base64
+import json
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.response import Response
+
+from . import commitorder
+from .models import SyncChange
+
+# The log is pruned this long after tokens expire, keeping the entries of
+# transactions that were still running when a valid token was handed out.
+PRUNE_MARGIN = timedelta(days=1)
+
+
+class SyncTokenExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Sync token is older than the change log; start a full sync.'
+    default_code = 'sync_token_expired'
+
+
+def token_horizon():
+    """Tokens handed out before this time are expired."""
+    return timezone.now() - timedelta(days=settings.SYNC_TOKEN_RETENTION_DAYS)
+
+
+def prune_changes():
+    """Delete log entries no valid token can still need; return how many were removed."""
+    deleted, _ = SyncChange.objects.filter(created_at__lt=token_horizon() - PRUNE_MARGIN).delete()
+    return deleted
+
+
+def encode_token(position, full=False):
+    """
+    Encode a log ``(xid, id, pk)`` position. ``pk`` is the last row sent
+    for that entry when a page ended inside it, or the last row of a full
+    sync (``full``) still paging through the table; otherwise 0.
+    """
+    payload = json.dumps([int(full), *position, timezone.now().isoformat()])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_token(token):
+    """Return the ``(full, position)`` held by ``token``; raise ``SyncTokenExpired`` if it is too old."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (TypeError, ValueError):
+        raise NotFound('Invalid sync token')
+    if not isinstance(payload, list):
+        raise NotFound('Invalid sync token')
+    if len(payload) == 2:
+        # ``(updated_at, id)`` tokens from before the change log.
+        raise SyncTokenExpired()
+    try:
+        full, xid, entry_id, pk, issued = payload
+        position = (int(xid), int(entry_id), int(pk))
+        issued = datetime.fromisoformat(issued)
+    except (TypeError, ValueError):
+        raise NotFound('Invalid sync token')
+    if issued < token_horizon():
+        raise SyncTokenExpired()
+    return bool(full), position
+
+
+class DeltaSyncMixin:
+    """
+    ViewSet mixin answering ``list?since=<token>`` with
+    ``{"results", "deleted", "since", "has_more"}``.
+
+    Pages hold at most ``sync_page_size`` rows and deleted ids; while
+    ``has_more`` is true, clients call again with the returned token. List
+    filters do not apply: a sync covers every row the user can see, so rows
+    moving in or out of a filter arrive as updates. A row may be sent more
+    than once.
+    """
+    sync_query_param = 'since'
+    sync_page_size = 500
+
+    def get_sync_queryset(self):
+        return self.get_queryset()
+
+    def get_sync_changes(self):
+        """Return the ``SyncChange`` entries that can resend the user's rows; by default the model's own."""
+        return SyncChange.objects.filter(kind=self.get_sync_queryset().model._meta.model_name)
+
+    def get_nesting_rows(self, kind, object_ids):
+        """
+        Return ``(object_id, pk)`` pairs for the user's rows whose responses
+        nest the ``kind`` rows ``object_ids``; none by default.
+        """
+        return ()
+
+    def list(self, request, *args, **kwargs):
+        if self.sync_query_param not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        return self.sync_response(request.query_params[self.sync_query_param])
+
+    def sync_response(self, token):
+        if token:
+            full, position = decode_token(token)
+        else:
+            full, position = True, (*self.log_end(), 0)
+        fast_serializer = self.get_fast_list_serializer()
+        if full:
+            rows, has_more, position, full = self.read_table(position, fast_serializer)
+            deleted = []
+        else:
+            pks, deleted, has_more, position = self.read_changes(position)
+            rows = self.load_rows(self.get_sync_queryset().filter(pk__in=set(pks)), fast_serializer)
+
+        if fast_serializer is not None:
+            data = fast_serializer.serialize(rows)
+        else:
+            data = self.get_serializer(rows, many=True).data
+        return Response(OrderedDict([
+            ('results', data),
+            ('deleted', deleted),
+            ('since', encode_token(position, full)),
+            ('has_more', has_more),
+        ]))
+
+    @staticmethod
+    def load_rows(queryset, fast_serializer, limit=None):
+        queryset = queryset.order_by('id')
+        if fast_serializer is not None:
+            queryset = fast_serializer.prepare(queryset)
+        return list(queryset[:limit])
+
+    def log_end(self):
+        """Return the log position a full sync starting now continues from."""
+        changes = SyncChange.objects.all()
+        limit = commitorder.horizon(changes.db)
+        last = commitorder.visible(changes, limit).reverse().values_list('xid', 'id').first()
+        return commitorder.caught_up(last or commitorder.START, limit)
+
+    def read_table(self, position, fast_serializer):
+        """
+        One page of a full sync: the rows after the ``pk`` of ``position``,
+        with the position to continue from and whether that is still a full
+        sync.
+        """
+        xid, entry_id, after_pk = position
+        queryset = self.get_sync_queryset().filter(pk__gt=after_pk)
+        rows = self.load_rows(queryset, fast_serializer, limit=self.sync_page_size + 1)
+        has_more = len(rows) > self.sync_page_size
+        rows = rows[:self.sync_page_size]
+        if has_more:
+            return rows, True, (xid, entry_id, rows[-1].id), True
+        return rows, False, (xid, entry_id, 0), False
+
+    def read_changes(self, position):
+        """
+        One page of a delta sync: the ids of the rows resent and deleted by
+        the log entries after ``position``, with the position they end at.
+        """
+        xid, entry_id, after_pk = position
+        changes = self.get_sync_changes()
+        limit = commitorder.horizon(changes.db)
+        # A page that ended inside an entry resumes with it.
+        after = (xid, entry_id - 1) if after_pk else (xid, entry_id)
+        entries = list(commitorder.visible(changes, limit, after=after)[:self.sync_page_size])
+        kind = self.get_sync_queryset().model._meta.model_name
+        nesting = self.nesting_map(entries, kind)
+
+        pks, deleted, end = [], [], position
+        for entry in entries:
+            room = self.sync_page_size - len(pks) - len(deleted)
+            if entry.kind == kind and entry.deleted:
+                if not room:
+                    return pks, deleted, True, end
+                deleted.append(entry.object_id)
+            else:
+                if entry.kind == kind:
+                    targets = [] if entry.deleted else [entry.object_id]
+                else:
+                    targets = nesting.get((entry.kind, entry.object_id), [])
+                if (entry.xid, entry.id) == (xid, entry_id):
+                    targets = [pk for pk in targets if pk > after_pk]
+                if len(targets) > room:
+                    pks.extend(targets[:room])
+                    if room:
+                        end = (entry.xid, entry.id, targets[room - 1])
+                    return pks, deleted, True, end
+                pks.extend(targets)
+            end = (entry.xid, entry.id, 0)
+
+        if len(entries) == self.sync_page_size:
+            return pks, deleted, True, end
+        return pks, deleted, False, (*commitorder.caught_up(end[:2], limit), 0)
+
+    def nesting_map(self, entries, kind):
+        """Map ``(kind, object_id)`` of the nested rows changed in ``entries`` to the ids of the rows resent."""
+        changed = defaultdict(set)
+        for entry in entries:
+            if entry.kind != kind and not entry.deleted:
+                changed[entry.kind].add(entry.object_id)
+        nesting = defaultdict(set)
+        for other, object_ids in changed.items():
+            for object_id, pk in self.get_nesting_rows(other, object_ids):
+                nesting[other, object_id].add(pk)
+        return {key: sorted(pks) for key, pks in nesting.items()}
@@ -0,0 +1,48 @@
+"""Helpers shared by the apps' test suites."""
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+
+def query_plans(client, url, table):
+    """
+    GET ``url`` and return the SQLite query plan (one string per step) of
+    every query it ran that reads a page of ``table``.
+    """
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, response.status_code
+    plans = []
+    for query in queries.captured_queries:
+        sql = query['sql']
+        if sql.startswith('SELECT') and f'FROM "{table}"' in sql and 'LIMIT' in sql:
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans.append([row[-1] for row in cursor.fetchall()])
+    return plans
+
+
+def image_bytes(fmt='PNG', size=(32, 48), color=(200, 30, 30)):
+    """Return a small solid-colour image encoded as ``fmt``."""
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class TemporaryMediaMixin:
+    """Store each test's uploads in a fresh ``MEDIA_ROOT``, removed afterwards."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
@@ -0,0 +1,116 @@
+"""
+Versioned response cache for read-only ViewSet actions.
+
+Every cached response is filed under the versions of the *scopes* it
+depends on (``genre:fiction``, ``book:12``…). Writes bump the versions of
+the scopes they touch once their transaction commits, which makes every
+entry built from the old data unreachable; nothing has to know which
+filters or pages were cached. Entries expire after
+``VIEW_CACHE_TIMEOUT`` as a backstop.
+
+Rows changed with ``QuerySet.update()`` send no signals; the code doing so
+calls ``rows_updated`` with the model and primary keys instead.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from .conditional import not_modified, set_validators
+
+# model -> callable(pks) invalidating the scopes of those rows.
+INVALIDATORS = {}
+
+
+def _version_key(scope):
+    return f'views:version:{scope}'
+
+
+def get_versions(scopes):
+    """Return the current version of each scope, starting missing ones."""
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(scopes):
+    """Drop every response depending on ``scopes`` once the current transaction commits."""
+    keys = [_version_key(scope) for scope in set(scopes)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def register(model, invalidator):
+    INVALIDATORS[model] = invalidator
+
+
+def rows_updated(model, pks):
+    """Invalidate cached responses showing the ``model`` rows ``pks`` after a bulk ``update()``."""
+    invalidator = INVALIDATORS.get(model)
+    if invalidator is not None:
+        invalidator(pks)
+
+
+class VersionedCacheMixin:
+    """
+    ViewSet mixin caching ``ConditionalGetMixin`` responses of
+    ``cached_actions``, including their validators, so hits skip the
+    database altogether.
+
+    ``get_cache_scopes`` names the scopes a response depends on; return
+    None to bypass the cache. ``is_personal`` marks responses that differ
+    per user.
+    """
+    cached_actions = ['list', 'retrieve']
+
+    def get_cache_scopes(self):
+        raise NotImplementedError
+
+    def is_personal(self):
+        return False
+
+    def get_response_cache_key(self):
+        if self.action not in self.cached_actions:
+            return None
+        scopes = self.get_cache_scopes()
+        if scopes is None:
+            return None
+        request = self.request
+        fingerprint = '|'.join(str(part) for part in (
+            request.build_absolute_uri(),
+            getattr(request, 'accepted_media_type', ''),
+            request.user.pk if self.is_personal() else '',
+            *get_versions(scopes),
+        ))
+        return f'views:{self.basename}:{self.action}:{hashlib.md5(fingerprint.encode()).hexdigest()}'
+
+    def cached_response(self, build):
+        key = self.get_response_cache_key()
+        if key is None:
+            return build()
+        cached = cache.get(key)
+        if cached is None:
+            response = build()
+            if response.status_code == 200:
+                last_modified = parse_http_date_safe(response.get('Last-Modified', ''))
+                cache.set(key, (response.data, response['ETag'], last_modified), settings.VIEW_CACHE_TIMEOUT)
+            return response
+        data, etag, last_modified = cached
+        response = not_modified(self.request, etag, last_modified)
+        if response is not None:
+            return response
+        return set_validators(Response(data), etag, last_modified)
+
+    def list_response(self, queryset):
+        return self.cached_response(lambda: super(VersionedCacheMixin, self).list_response(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(lambda: super(VersionedCacheMixin, self).retrieve(request, *args, **kwargs))
@@ -0,0 +1,68 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.views.static import serve
+
+from mediastore.models import Blob
+from mediastore.views import serve_media
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare how long a worker is tied up per media request: Django's static() view "
+        "against serve_media streaming directly, answering Range and conditional requests, "
+        "and handing off through X-Accel-Redirect."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size-kb', type=int, default=4096, help="Size of the served file.")
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--client-mbps', type=float, default=20,
+            help="Client download speed, to estimate the time a worker spends draining the response.",
+        )
+
+    def handle(self, *args, **options):
+        name = default_storage.save('benchmark.jpg', ContentFile(os.urandom(options['size_kb'] * 1024)))
+        etag = '"%s"' % os.path.splitext(os.path.basename(name))[0]
+        url = settings.MEDIA_URL + name
+        factory = RequestFactory()
+        cases = [
+            ("static() (before)", lambda: serve(factory.get(url), name, document_root=settings.MEDIA_ROOT), ''),
+            ("serve_media, full", lambda: serve_media(factory.get(url), name), ''),
+            ("serve_media, 64 KiB Range", lambda: serve_media(factory.get(url, HTTP_RANGE='bytes=0-65535'), name), ''),
+            ("serve_media, If-None-Match", lambda: serve_media(factory.get(url, HTTP_IF_NONE_MATCH=etag), name), ''),
+            ("serve_media, X-Accel-Redirect", lambda: serve_media(factory.get(url), name), 'nginx'),
+        ]
+        bytes_per_second = options['client_mbps'] * 1_000_000 / 8
+        try:
+            self.stdout.write(
+                f"{options['requests']} requests for a {options['size_kb']} KiB file, "
+                f"client at {options['client_mbps']:g} Mbit/s"
+            )
+            for label, view, accel in cases:
+                with override_settings(MEDIA_ACCEL=accel):
+                    sent = 0
+                    start = time.perf_counter()
+                    for _ in range(options['requests']):
+                        response = view()
+                        if response.streaming:
+                            sent += sum(len(chunk) for chunk in response.streaming_content)
+                        else:
+                            sent += len(response.content)
+                        response.close()
+                    elapsed = (time.perf_counter() - start) / options['requests']
+                per_request = sent / options['requests']
+                occupancy = elapsed + per_request / bytes_per_second
+                self.stdout.write(
+                    f"{label:>30}: {response.status_code}, {elapsed * 1000:7.3f} ms CPU, "
+                    f"{per_request / 1024:8.1f} KiB through the worker, ~{occupancy * 1000:8.1f} ms occupied"
+                )
+        finally:
+            default_storage.purge(name)
+            Blob.objects.filter(name=name).delete()
@@ -0,0 +1,95 @@
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from mediastore import uploads
+from mediastore.models import Blob, UploadSession
+from mediastore.references import TRACKED, adjust, row_names
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete blobs no model references any more, in batches. Blobs uploaded or released "
+        "within the grace period are kept, since the row referencing a fresh upload may not "
+        "have committed yet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--grace-hours', type=float, default=24)
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument(
+            '--recount', action='store_true',
+            help="Recompute every reference count from the tracked models first.",
+        )
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            self.recount()
+        self.expire_uploads(options['dry_run'])
+
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        # Completed uploads not yet attached to a book hold their blob.
+        pending = UploadSession.objects.filter(status='complete').values('blob_name')
+        unreferenced = (
+            Blob.objects.filter(ref_count__lte=0, updated_at__lt=cutoff)
+            .exclude(name__in=pending).order_by('id')
+        )
+        deleted = freed = batches = 0
+        last_id = 0
+        started = time.perf_counter()
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    unreferenced.filter(id__gt=last_id).select_for_update()
+                    .values_list('id', 'name', 'size')[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                batches += 1
+                last_id = batch[-1][0]
+                if not options['dry_run']:
+                    # Re-checked by the DELETE itself: blobs referenced or
+                    # uploaded again since the SELECT stay.
+                    ids = [pk for pk, _, _ in batch]
+                    unreferenced.filter(pk__in=ids).delete()
+                    kept = set(Blob.objects.filter(pk__in=ids).values_list('pk', flat=True))
+                    batch = [blob for blob in batch if blob[0] not in kept]
+                    # Files go before the deletion commits; uploads of the
+                    # same content wait for it and then store the file anew.
+                    for _, name, _ in batch:
+                        default_storage.purge(name)
+            deleted += len(batch)
+            freed += sum(size for _, _, size in batch)
+        self.stdout.write(
+            f"{'would delete' if options['dry_run'] else 'deleted'} {deleted} blobs "
+            f"({freed / 1024 / 1024:.1f} MiB) in {batches} batches, {time.perf_counter() - started:.2f}s"
+        )
+
+    def expire_uploads(self, dry_run):
+        sessions = list(uploads.expired_sessions())
+        if not dry_run:
+            for session in sessions:
+                uploads.discard(session)
+        self.stdout.write(f"{'would expire' if dry_run else 'expired'} {len(sessions)} upload sessions")
+
+    def recount(self):
+        counts = Counter()
+        for model, (field, variants_field) in TRACKED.items():
+            columns = [field, *filter(None, [variants_field])]
+            for row in model.objects.values(*columns).iterator(chunk_size=2000):
+                counts.update(row_names(model, row))
+        with transaction.atomic():
+            stored = dict(Blob.objects.select_for_update().values_list('name', 'ref_count'))
+            changed = 0
+            for name in stored.keys() | counts.keys():
+                delta = counts[name] - stored.get(name, 0)
+                if delta:
+                    adjust(name, delta)
+                    changed += 1
+        self.stdout.write(f"recounted references: {changed} blobs corrected")
@@ -0,0 +1,66 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class Blob(models.Model):
+    """
+    One stored file, named by the SHA-256 of its content, and the number of
+    model fields currently referencing it (see ``mediastore.references``).
+    """
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Last upload or reference change; garbage collection waits a grace
+    # period after it.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'media_blobs'
+        indexes = [
+            # Garbage collection only visits unreferenced blobs.
+            models.Index(
+                fields=['updated_at', 'id'],
+                name='media_blobs_unreferenced_idx',
+                condition=models.Q(ref_count__lte=0),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+class UploadSession(models.Model):
+    """
+    A resumable upload: chunks are appended to a part file on disk at
+    ``received`` until the declared ``size`` is reached, then the file is
+    checked against ``sha256`` and stored as a blob (see ``mediastore.uploads``).
+    """
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('complete', 'Complete'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
+    # Stored blob, once complete.
+    blob_name = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'media_upload_sessions'
+        indexes = [
+            # Expired sessions are cleaned up oldest first.
+            models.Index(fields=['updated_at'], name='media_uploads_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
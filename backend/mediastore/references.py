@@ -0,0 +1,91 @@
+"""
+Reference counts of blobs used by model file fields.
+
+``track(Model, 'file_field', 'variants_field')`` counts the file and every
+variant file (see ``bookswap.images``) stored on each row: saves and
+deletes adjust ``Blob.ref_count`` through signals, and code that changes
+those fields with ``QuerySet.update()`` calls ``replace`` itself.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from .models import Blob
+
+# Model -> (file field, variants field or None)
+TRACKED = {}
+
+
+def names_in(file_name, variants=None):
+    """Return the stored file names of one row's file and its variants."""
+    names = Counter()
+    if file_name:
+        names[file_name] += 1
+    for files in (variants or {}).values():
+        for key, value in files.items():
+            if isinstance(value, str):
+                names[value] += 1
+    return names
+
+
+def row_names(model, row):
+    field, variants_field = TRACKED[model]
+    return names_in(row[field], row[variants_field] if variants_field else None)
+
+
+def instance_names(instance):
+    field, variants_field = TRACKED[type(instance)]
+    file = getattr(instance, field)
+    return names_in(file.name if file else None, getattr(instance, variants_field) if variants_field else None)
+
+
+def adjust(name, delta):
+    """Add ``delta`` references to the blob called ``name``."""
+    blobs = Blob.objects.filter(name=name)
+    if blobs.update(ref_count=F('ref_count') + delta, updated_at=timezone.now()) or delta < 0:
+        # Files stored before reference counting have no blob to release.
+        return
+    try:
+        with transaction.atomic():
+            Blob.objects.create(name=name, ref_count=delta)
+    except IntegrityError:
+        # Created concurrently by another request.
+        blobs.update(ref_count=F('ref_count') + delta, updated_at=timezone.now())
+
+
+def replace(old, new):
+    """Move references from the ``old`` names to the ``new`` ones (both Counters)."""
+    changes = Counter(new)
+    changes.subtract(old)
+    for name, delta in changes.items():
+        if delta:
+            adjust(name, delta)
+
+
+def remember_files(sender, instance, raw=False, **kwargs):
+    instance._stored_files = Counter()
+    if instance.pk and not raw:
+        field, variants_field = TRACKED[sender]
+        row = sender.objects.filter(pk=instance.pk).values(field, *filter(None, [variants_field])).first()
+        if row is not None:
+            instance._stored_files = row_names(sender, row)
+
+
+def count_files(sender, instance, raw=False, **kwargs):
+    if not raw:
+        replace(getattr(instance, '_stored_files', Counter()), instance_names(instance))
+
+
+def release_files(sender, instance, **kwargs):
+    replace(instance_names(instance), Counter())
+
+
+def track(model, field, variants_field=None):
+    TRACKED[model] = (field, variants_field)
+    uid = f'mediastore.{model._meta.label}'
+    pre_save.connect(remember_files, sender=model, dispatch_uid=uid)
+    post_save.connect(count_files, sender=model, dispatch_uid=uid)
+    post_delete.connect(release_files, sender=model, dispatch_uid=uid)
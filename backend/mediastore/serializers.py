@@ -0,0 +1,81 @@
+import os
+
+from django.conf import settings
+from rest_framework import serializers
+
+from .models import UploadSession
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif'}
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for resumable upload sessions."""
+    complete = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'size', 'sha256', 'received', 'status', 'complete', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'received', 'status', 'created_at', 'updated_at']
+
+    def get_complete(self, obj):
+        return obj.status == 'complete'
+
+    def validate_filename(self, value):
+        value = os.path.basename(value)
+        if os.path.splitext(value)[1].lower() not in IMAGE_EXTENSIONS:
+            raise serializers.ValidationError("Only JPEG, PNG, WebP and GIF images can be uploaded.")
+        return value
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Uploads must be between 1 and {settings.UPLOAD_MAX_SIZE} bytes.")
+        return value
+
+    def validate_sha256(self, value):
+        value = value.lower()
+        if len(value) != 64 or any(c not in '0123456789abcdef' for c in value):
+            raise serializers.ValidationError("Expected a hex SHA-256 digest.")
+        return value
+
+
+class CompletedUploadField(serializers.PrimaryKeyRelatedField):
+    """Write-only reference to one of the requesting user's completed uploads."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('write_only', True)
+        kwargs.setdefault('required', False)
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        return UploadSession.objects.filter(user=getattr(request, 'user', None), status='complete')
+
+
+class UploadedImagesMixin:
+    """
+    ModelSerializer mixin filling image fields from completed uploads.
+
+    ``uploaded_image_fields`` maps a ``CompletedUploadField`` to the image
+    field it sets. The upload session is consumed once the row is saved.
+    """
+    uploaded_image_fields = {}
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        for upload_field, image_field in self.uploaded_image_fields.items():
+            session = attrs.pop(upload_field, None)
+            if session is None:
+                continue
+            if image_field in attrs:
+                raise serializers.ValidationError(
+                    {upload_field: f"Send either {image_field} or {upload_field}, not both."}
+                )
+            attrs[image_field] = session.blob_name
+            self._uploads = [*getattr(self, '_uploads', []), session]
+        return attrs
+
+    def save(self, **kwargs):
+        instance = super().save(**kwargs)
+        for session in getattr(self, '_uploads', []):
+            session.delete()
+        return instance
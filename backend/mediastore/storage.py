@@ -0,0 +1,89 @@
+"""
+Content-addressed file storage.
+
+Files are named after the SHA-256 of their content
+(``blobs/ab/cd/abcd….jpg``), so identical uploads share one file whatever
+model or field they come from. The hash is computed while the upload is
+streamed to a temporary file next to its destination, chunk by chunk, and
+the file is only moved into place if no blob with that hash exists yet.
+
+Deleting through the storage is a no-op: blobs may be shared, so they are
+reference-counted (``mediastore.references``) and removed by
+``manage.py gc_blobs`` once nothing uses them.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Blob
+
+BLOB_DIR = 'blobs'
+
+
+def blob_name(digest, extension):
+    return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content in ``_save``.
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        tmp_dir = self.path(os.path.join(BLOB_DIR, 'tmp'))
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+            name = blob_name(digest.hexdigest(), extension)
+            # Registered before the file is checked, so a concurrent
+            # ``gc_blobs`` either keeps the blob or has removed it already.
+            self.register(name, size)
+            path = self.path(name)
+            if os.path.exists(path):
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(tmp_path, self.file_permissions_mode)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return name
+
+    @staticmethod
+    def register(name, size):
+        """Record the blob, or refresh it so garbage collection leaves it alone for a while."""
+        blobs = Blob.objects.filter(name=name)
+        if blobs.update(updated_at=timezone.now()):
+            return
+        try:
+            with transaction.atomic():
+                Blob.objects.create(name=name, size=size)
+        except IntegrityError:
+            # Uploaded concurrently by another request.
+            blobs.update(updated_at=timezone.now())
+
+    def delete(self, name):
+        """Blobs are shared; ``gc_blobs`` deletes them once unreferenced."""
+
+    def purge(self, name):
+        """Actually remove the file behind ``name``."""
+        super().delete(name)
@@ -0,0 +1,113 @@
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from books.models import Book
+from bookswap.testing import TemporaryMediaMixin, image_bytes
+from mediastore import references
+from mediastore.models import Blob, UploadSession
+
+User = get_user_model()
+
+
+class BlobReferenceTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='owner', password='pw12345!')
+
+    def book(self, content, name='cover.png'):
+        return Book.objects.create(
+            owner=self.user, title='Covered', author='A', cover_image=ContentFile(content, name=name),
+        )
+
+    def refs(self, name):
+        return Blob.objects.get(name=name).ref_count
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.book(image_bytes())
+        second = self.book(image_bytes(), name='other.png')
+        self.assertEqual(first.cover_image.name, second.cover_image.name)
+        self.assertTrue(first.cover_image.name.startswith('blobs/'))
+        self.assertEqual(self.refs(first.cover_image.name), 2)
+
+    def test_counts_follow_saves_and_deletes(self):
+        book = self.book(image_bytes())
+        old = book.cover_image.name
+        book.cover_image = ContentFile(image_bytes(color=(0, 0, 255)), name='blue.png')
+        book.save()
+        new = book.cover_image.name
+        self.assertEqual((self.refs(old), self.refs(new)), (0, 1))
+
+        book.save()
+        self.assertEqual(self.refs(new), 1)
+
+        book.delete()
+        self.assertEqual(self.refs(new), 0)
+        # Deleting the row leaves the shared file to gc_blobs.
+        self.assertTrue(default_storage.exists(new))
+
+    def test_variants_are_counted(self):
+        book = self.book(image_bytes())
+        variant = default_storage.save('thumb.webp', ContentFile(b'variant'))
+        # Code writing with QuerySet.update() moves the references itself.
+        Book.objects.filter(pk=book.pk).update(cover_variants={'thumbnail': {'webp': variant}})
+        references.replace(Counter(), Counter([variant]))
+        self.assertEqual(self.refs(variant), 1)
+        Book.objects.get(pk=book.pk).delete()
+        self.assertEqual(self.refs(variant), 0)
+
+    def test_recount_repairs_drifted_counts(self):
+        name = self.book(image_bytes()).cover_image.name
+        Blob.objects.filter(name=name).update(ref_count=5)
+        call_command('gc_blobs', '--recount', stdout=mock.Mock())
+        self.assertEqual(self.refs(name), 1)
+
+
+class GarbageCollectionTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='owner', password='pw12345!')
+
+    def blob(self, content, refs=0, hours_ago=48):
+        name = default_storage.save('file.png', ContentFile(content))
+        Blob.objects.filter(name=name).update(
+            ref_count=refs, updated_at=timezone.now() - timedelta(hours=hours_ago),
+        )
+        return name
+
+    def gc(self, *args):
+        call_command('gc_blobs', *args, stdout=mock.Mock())
+
+    def test_only_old_unreferenced_blobs_are_deleted(self):
+        unreferenced = self.blob(b'unreferenced')
+        referenced = self.blob(b'referenced', refs=1)
+        fresh = self.blob(b'fresh', hours_ago=1)
+        self.gc()
+        self.assertFalse(default_storage.exists(unreferenced))
+        self.assertEqual(set(Blob.objects.values_list('name', flat=True)), {referenced, fresh})
+        self.assertTrue(default_storage.exists(referenced))
+        self.assertTrue(default_storage.exists(fresh))
+
+    def test_completed_uploads_keep_their_blob(self):
+        name = self.blob(b'uploaded')
+        UploadSession.objects.create(
+            user=self.user, filename='cover.png', size=8, sha256='0' * 64, received=8,
+            status='complete', blob_name=name,
+        )
+        self.gc()
+        self.assertTrue(default_storage.exists(name))
+
+    def test_grace_period_and_dry_run(self):
+        name = self.blob(b'recent', hours_ago=3)
+        self.gc('--dry-run', '--grace-hours', '1')
+        self.assertTrue(Blob.objects.filter(name=name).exists())
+        self.gc('--grace-hours', '1', '--batch-size', '1')
+        self.assertFalse(Blob.objects.filter(name=name).exists())
+        self.assertFalse(default_storage.exists(name))
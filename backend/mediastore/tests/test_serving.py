@@ -0,0 +1,116 @@
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from bookswap.testing import TemporaryMediaMixin
+from mediastore.views import IMMUTABLE_CACHE_CONTROL, parse_range, resolve, serve_media
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        cases = {
+            'bytes=0-9': (0, 9),
+            'bytes=10-10': (10, 10),
+            'bytes=95-200': (95, 99),
+            # Open-ended.
+            'bytes=90-': (90, 99),
+            # Suffix: the last n bytes, or the whole file if it is shorter.
+            'bytes=-10': (90, 99),
+            'bytes=-500': (0, 99),
+            ' bytes=0-0 ': (0, 0),
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 100), expected)
+
+    def test_unsatisfiable(self):
+        for header in ('bytes=100-', 'bytes=150-200', 'bytes=5-2', 'bytes=-0'):
+            with self.subTest(header=header):
+                self.assertIs(parse_range(header, 100), False)
+
+    def test_full_file_for_multiple_or_malformed_ranges(self):
+        for header in ('bytes=0-1,5-6', 'bytes=-', 'items=0-9', 'bytes=a-b', ''):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 100))
+
+
+class ServeMediaTests(TemporaryMediaMixin, TestCase):
+    content = bytes(range(256)) * 4
+
+    def setUp(self):
+        super().setUp()
+        self.name = default_storage.save('cover.jpg', ContentFile(self.content))
+        self.etag = '"%s"' % os.path.splitext(os.path.basename(self.name))[0]
+        self.factory = RequestFactory()
+
+    def get(self, path=None, method='get', **headers):
+        request = getattr(self.factory, method)('/media/', **headers)
+        return serve_media(request, path or self.name)
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_full_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_range(self):
+        response = self.get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.content[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(response['Content-Length'], '10')
+
+    def test_suffix_range(self):
+        response = self.get(HTTP_RANGE='bytes=-4')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.content[-4:])
+
+    def test_if_range(self):
+        response = self.get(HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE=self.etag)
+        self.assertEqual(response.status_code, 206)
+        # A stale validator gets the whole file instead of a range of it.
+        response = self.get(HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_not_modified(self):
+        response = self.get(HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], self.etag)
+        # Takes precedence over Range.
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=self.etag, HTTP_RANGE='bytes=0-3').status_code, 304)
+
+    def test_head_and_unsafe_methods(self):
+        self.assertEqual(self.get(method='head').status_code, 200)
+        self.assertEqual(self.get(method='post').status_code, 405)
+
+    @override_settings(MEDIA_ACCEL='nginx', MEDIA_ACCEL_PREFIX='/protected-media/')
+    def test_nginx_handoff(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+        self.assertEqual(response.content, b'')
+
+    def test_resolve_rejects_paths_outside_the_media(self):
+        part = default_storage.path('blobs/tmp/uploads/session.part')
+        os.makedirs(os.path.dirname(part))
+        open(part, 'wb').close()
+        for path in ('../settings.py', 'blobs/../../settings.py', '/../etc/passwd', '.',
+                     'blobs/tmp/uploads/session.part', 'blobs/missing.jpg'):
+            with self.subTest(path=path):
+                with self.assertRaises(Http404):
+                    resolve(path)
+        self.assertEqual(resolve('/' + self.name)[0], self.name)
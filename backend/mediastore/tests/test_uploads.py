@@ -0,0 +1,182 @@
+import errno
+import hashlib
+import io
+import os
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.http import UnreadablePostError
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from bookswap.testing import TemporaryMediaMixin, image_bytes
+from mediastore import uploads
+from mediastore.models import Blob, UploadSession
+from mediastore.uploads import open_part
+
+User = get_user_model()
+
+
+class DroppedStream(io.BytesIO):
+    """A request body whose connection drops after ``content``."""
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        if not chunk:
+            raise UnreadablePostError('connection reset')
+        return chunk
+
+
+class FullDisk:
+    """A part file whose writes fail as if the disk were full."""
+
+    def __init__(self, part):
+        self.part = part
+
+    def __getattr__(self, name):
+        return getattr(self.part, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.part.close()
+
+    def write(self, data):
+        raise OSError(errno.ENOSPC, 'No space left on device')
+
+
+class ResumableUploadTests(TemporaryMediaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='uploader', password='pw12345!')
+        self.client.force_authenticate(self.user)
+        self.content = image_bytes('JPEG', size=(64, 96))
+
+    def open(self, content=None, filename='cover.jpg'):
+        content = self.content if content is None else content
+        response = self.client.post('/api/uploads/', {
+            'filename': filename, 'size': len(content), 'sha256': hashlib.sha256(content).hexdigest(),
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        return UploadSession.objects.get(pk=response.data['id'])
+
+    def put(self, session, offset, body):
+        return self.client.put(
+            f'/api/uploads/{session.pk}/', body, content_type='application/octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def complete(self, session):
+        return self.client.post(f'/api/uploads/{session.pk}/complete/')
+
+    def upload(self, content=None):
+        session = self.open(content)
+        content = self.content if content is None else content
+        self.assertEqual(self.put(session, 0, content).status_code, 200)
+        return session
+
+    def test_upload_in_chunks(self):
+        session = self.open()
+        half = len(self.content) // 2
+        self.assertEqual(self.put(session, 0, self.content[:half]).data['received'], half)
+        self.assertEqual(self.client.get(f'/api/uploads/{session.pk}/').data['received'], half)
+        self.assertEqual(self.put(session, half, self.content[half:]).data['received'], len(self.content))
+
+        response = self.complete(session)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['complete'])
+        session.refresh_from_db()
+        with default_storage.open(session.blob_name) as stored:
+            self.assertEqual(stored.read(), self.content)
+        self.assertFalse(os.path.exists(uploads.part_path(session)))
+        # Completing again is harmless.
+        self.assertEqual(self.complete(session).status_code, 200)
+
+    def test_offset_mismatch(self):
+        session = self.open()
+        self.put(session, 0, self.content[:10])
+        response = self.put(session, 5, self.content[5:20])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['received'], 10)
+
+    def test_chunk_past_the_declared_size(self):
+        session = self.open()
+        self.assertEqual(self.put(session, 0, self.content + b'extra').status_code, 400)
+
+    def test_missing_headers(self):
+        session = self.open()
+        response = self.client.put(f'/api/uploads/{session.pk}/', b'x', content_type='application/octet-stream')
+        self.assertEqual(response.status_code, 400)
+
+    def test_resume_after_dropped_connection(self):
+        session = self.open()
+        received = uploads.write_chunk(session, 0, DroppedStream(self.content[:100]), len(self.content))
+        self.assertEqual(received, 100)
+        self.assertEqual(UploadSession.objects.get(pk=session.pk).received, 100)
+
+        self.assertEqual(self.put(session, 100, self.content[100:]).status_code, 200)
+        self.assertEqual(self.complete(session).status_code, 200)
+
+    def test_disk_errors_are_not_swallowed(self):
+        session = self.open()
+        self.put(session, 0, self.content[:10])
+        full_disk = mock.patch('mediastore.uploads.open_part', side_effect=lambda s: FullDisk(open_part(s)))
+        with full_disk, self.assertRaises(OSError):
+            uploads.write_chunk(session, 10, io.BytesIO(self.content[10:20]), 10)
+        self.assertEqual(UploadSession.objects.get(pk=session.pk).received, 10)
+
+        self.client.raise_request_exception = False
+        with full_disk:
+            self.assertEqual(self.put(session, 10, self.content[10:20]).status_code, 500)
+        self.assertEqual(self.put(session, 10, self.content[10:]).status_code, 200)
+        self.assertEqual(self.complete(session).status_code, 200)
+
+    def test_incomplete_upload_cannot_complete(self):
+        session = self.open()
+        self.put(session, 0, self.content[:10])
+        self.assertEqual(self.complete(session).status_code, 409)
+
+    def test_checksum_mismatch_discards_the_upload(self):
+        session = self.open()
+        corrupted = b'\0' + self.content[1:]
+        self.put(session, 0, corrupted)
+        self.assertEqual(self.complete(session).status_code, 422)
+        self.assertFalse(UploadSession.objects.filter(pk=session.pk).exists())
+        self.assertFalse(os.path.exists(uploads.part_path(session)))
+
+    def test_non_images_are_rejected(self):
+        session = self.upload(b'not an image at all')
+        self.assertEqual(self.complete(session).status_code, 422)
+        self.assertFalse(UploadSession.objects.filter(pk=session.pk).exists())
+        self.assertFalse(Blob.objects.exists())
+
+    def test_only_image_file_names(self):
+        response = self.client.post('/api/uploads/', {'filename': 'notes.txt', 'size': 3, 'sha256': '0' * 64})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cover_upload_consumes_the_session(self):
+        session = self.upload()
+        self.assertEqual(self.complete(session).status_code, 200)
+        session.refresh_from_db()
+
+        response = self.client.post('/api/books/', {'title': 'Uploaded', 'author': 'A', 'cover_upload': session.pk})
+        self.assertEqual(response.status_code, 201, response.data)
+        book = Book.objects.get(title='Uploaded')
+        self.assertEqual(book.cover_image.name, session.blob_name)
+        self.assertEqual(Blob.objects.get(name=session.blob_name).ref_count, 1)
+        self.assertFalse(UploadSession.objects.filter(pk=session.pk).exists())
+
+        # A consumed session cannot be used again.
+        response = self.client.post('/api/books/', {'title': 'Again', 'author': 'A', 'cover_upload': session.pk})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cover_upload_of_another_user(self):
+        session = self.upload()
+        self.complete(session)
+        other = User.objects.create_user(username='other', password='pw12345!')
+        self.client.force_authenticate(other)
+        response = self.client.post('/api/books/', {'title': 'Taken', 'author': 'A', 'cover_upload': session.pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(UploadSession.objects.filter(pk=session.pk).exists())
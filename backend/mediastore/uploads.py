@@ -0,0 +1,144 @@
+"""
+Chunked, resumable uploads.
+
+A client opens an ``UploadSession`` with the file's name, size and
+SHA-256, then sends the bytes as raw request bodies at the session's
+``Upload-Offset``, in as many requests as it likes. Each body is copied to
+a part file in fixed-size pieces, so memory stays constant whatever the
+file size; a dropped connection keeps everything written so far and the
+client resumes from the offset the session reports. When every byte is
+in, ``complete`` checks the hash and that the file is an image, and stores
+it as a blob that a ``Book`` can then reference (``cover_upload``).
+"""
+import fcntl
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.http import UnreadablePostError
+from django.utils import timezone
+from PIL import Image
+
+from .models import UploadSession
+from .storage import BLOB_DIR
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """The chunk or upload was rejected; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def part_path(session):
+    return default_storage.path(f'{BLOB_DIR}/tmp/uploads/{session.pk}.part')
+
+
+def open_part(session):
+    path = part_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'ab').close()
+    return open(path, 'r+b')
+
+
+def write_chunk(session, offset, stream, length):
+    """
+    Copy ``length`` bytes of ``stream`` into the session at ``offset``.
+
+    Returns the new offset. Bytes received before a broken connection are
+    kept, so the client can resume right after them.
+    """
+    if length is None or offset + length > session.size:
+        raise UploadError("The chunk does not fit the declared upload size.")
+
+    with open_part(session) as part:
+        try:
+            # One writer per session; a retry racing a stalled request is refused.
+            fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError("Another chunk of this upload is being written.", status=409)
+        session.status, session.received = UploadSession.objects.values_list('status', 'received').get(pk=session.pk)
+        if session.status != 'open':
+            raise UploadError("This upload is already complete.", status=409)
+        if offset != session.received:
+            raise UploadError(f"Expected Upload-Offset {session.received}.", status=409)
+        part.seek(offset)
+        part.truncate()
+        written = 0
+        while written < length:
+            try:
+                chunk = stream.read(min(CHUNK_SIZE, length - written))
+            except UnreadablePostError:
+                # The connection dropped; keep what arrived.
+                break
+            if not chunk:
+                break
+            part.write(chunk)
+            written += len(chunk)
+        # Errors writing the part file (e.g. a full disk) propagate before
+        # the offset moves; the next chunk truncates whatever they left.
+        part.flush()
+        os.fsync(part.fileno())
+        session.received = offset + written
+        UploadSession.objects.filter(pk=session.pk).update(received=session.received, updated_at=timezone.now())
+    return session.received
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as part:
+        for chunk in iter(lambda: part.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def complete(session):
+    """Verify the finished upload and store it as a blob; return the blob name."""
+    with open_part(session) as part:
+        try:
+            fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError("This upload is still being written.", status=409)
+        session.refresh_from_db()
+        if session.status == 'complete':
+            return session.blob_name
+        if session.received != session.size:
+            raise UploadError(f"Only {session.received} of {session.size} bytes were received.", status=409)
+
+        path = part_path(session)
+        if file_sha256(path) != session.sha256:
+            discard(session)
+            raise UploadError("Checksum mismatch; the upload was discarded.", status=422)
+        try:
+            with Image.open(path) as image:
+                image.verify()
+        except Exception:
+            discard(session)
+            raise UploadError("The upload is not a supported image.", status=422)
+
+        part.seek(0)
+        name = default_storage.save(session.filename, File(part))
+        session.status, session.blob_name = 'complete', name
+        session.save(update_fields=['status', 'blob_name', 'updated_at'])
+        os.unlink(path)
+    return name
+
+
+def discard(session):
+    """Delete the session and its part file."""
+    try:
+        os.unlink(part_path(session))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+def expired_sessions():
+    cutoff = timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    return UploadSession.objects.filter(updated_at__lt=cutoff)
@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import UploadSessionViewSet
+
+router = DefaultRouter()
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
+
+app_name = 'mediastore'
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,203 @@
+"""
+Serving uploaded media, and the resumable upload API.
+
+Content-addressed blobs never change, so they are sent with a year-long
+``immutable`` Cache-Control and their hash as ETag. With ``MEDIA_ACCEL``
+set the worker only checks the file and answers with headers, leaving the
+bytes to the front web server:
+
+- ``nginx``: ``X-Accel-Redirect`` to ``MEDIA_ACCEL_PREFIX`` + path, which
+  must be an ``internal`` location aliased to ``MEDIA_ROOT``.
+- ``sendfile``: ``X-Sendfile`` with the absolute path (Apache mod_xsendfile,
+  lighttpd).
+
+Otherwise the file is streamed by Django, with single-range ``Range``
+requests, ``If-Range`` and conditional GET handled here.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from . import uploads
+from .models import UploadSession
+from .serializers import UploadSessionSerializer
+from .storage import BLOB_DIR
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Files stored before content addressing may be replaced under the same name.
+MUTABLE_CACHE_CONTROL = 'public, max-age=3600'
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def resolve(path):
+    """Return the absolute file path for media ``path``, or raise Http404."""
+    path = posixpath.normpath(path).lstrip('/')
+    if path.startswith('..') or path == '.' or path.startswith(f'{BLOB_DIR}/tmp/'):
+        raise Http404
+    try:
+        full_path = default_storage.path(path)
+    except Exception:
+        # SuspiciousFileOperation for paths escaping MEDIA_ROOT.
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    return path, full_path
+
+
+def validators(path, stat):
+    """Return ``(etag, cache_control)`` for the file ``path``."""
+    if path.startswith(f'{BLOB_DIR}/'):
+        digest = posixpath.splitext(posixpath.basename(path))[0]
+        return f'"{digest}"', IMMUTABLE_CACHE_CONTROL
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"', MUTABLE_CACHE_CONTROL
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single-range ``Range`` header,
+    None to serve the whole file, or ``False`` if the range cannot be
+    satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        # Multiple or malformed ranges: the full file is a valid answer.
+        return None
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def read_range(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def set_headers(response, etag, cache_control, stat):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = cache_control
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    path, full_path = resolve(path)
+    stat = os.stat(full_path)
+    etag, cache_control = validators(path, stat)
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is not None:
+        return set_headers(response, etag, cache_control, stat)
+
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    accel = settings.MEDIA_ACCEL
+    if accel:
+        # The front server streams the file and handles Range itself.
+        response = HttpResponse(content_type=content_type)
+        if accel == 'nginx':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + path
+        else:
+            response['X-Sendfile'] = full_path
+        return set_headers(response, etag, cache_control, stat)
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and request.META.get('HTTP_IF_RANGE', etag) == etag:
+        byte_range = parse_range(range_header, stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return set_headers(response, etag, cache_control, stat)
+    if byte_range is None:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        return set_headers(response, etag, cache_control, stat)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        read_range(open(full_path, 'rb'), start, length), status=206, content_type=content_type,
+    )
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    return set_headers(response, etag, cache_control, stat)
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable uploads, see ``mediastore.uploads``.
+
+    ``POST /uploads/`` opens a session, ``PUT /uploads/<id>/`` with an
+    ``Upload-Offset`` header appends the raw request body, ``GET`` reports
+    the offset to resume from, ``POST /uploads/<id>/complete/`` verifies and
+    stores the file and ``DELETE`` abandons it.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def update(self, request, *args, **kwargs):
+        """Append one chunk; the body is streamed to disk, never parsed."""
+        session = self.get_object()
+        try:
+            offset = int(request.META['HTTP_UPLOAD_OFFSET'])
+            length = int(request.META['CONTENT_LENGTH'])
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'Upload-Offset and Content-Length headers are required.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            uploads.write_chunk(session, offset, request._request, length)
+        except uploads.UploadError as exc:
+            return Response({'error': str(exc), 'received': session.received}, status=exc.status)
+        return Response(self.get_serializer(session).data)
+
+    def destroy(self, request, *args, **kwargs):
+        uploads.discard(self.get_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """Check the checksum and image format, then store the upload for ``cover_upload``."""
+        session = self.get_object()
+        try:
+            uploads.complete(session)
+        except uploads.UploadError as exc:
+            return Response({'error': str(exc)}, status=exc.status)
+        return Response(self.get_serializer(session).data)
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class TradesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'trades' 
\ No newline at end of file
+    name = 'trades'
+
+    def ready(self):
+        from . import signals  # noqa: F401
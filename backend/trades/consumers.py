@@ -0,0 +1,74 @@
+"""
+WebSocket endpoint streaming trade events to the connected user.
+
+Clients connect to ``/ws/trades/?token=<access token>`` with a SimpleJWT
+access token (browsers cannot set headers on WebSocket requests) and then
+receive one JSON text frame per event, see ``trades/realtime.py``. The
+connection is closed with code 4401 when the token is missing, invalid or
+expires; a rejected token is accepted first, since a handshake refused
+outright reaches browsers without a close code.
+"""
+import asyncio
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .realtime import get_broker
+
+UNAUTHORIZED = 4401
+
+
+def authenticate(query_string):
+    """Return ``(user, expires_at)`` for the access token in the query string, or ``(None, None)``."""
+    token = parse_qs(query_string.decode()).get('token', [None])[0]
+    if not token:
+        return None, None
+    authentication = JWTAuthentication()
+    try:
+        validated = authentication.get_validated_token(token)
+        return authentication.get_user(validated), validated['exp']
+    except (InvalidToken, AuthenticationFailed):
+        return None, None
+
+
+async def trade_events(scope, receive, send):
+    event = await receive()
+    if event['type'] != 'websocket.connect':
+        return
+
+    user, expires_at = await sync_to_async(authenticate)(scope.get('query_string', b''))
+    if user is None:
+        await send({'type': 'websocket.accept'})
+        await send({'type': 'websocket.close', 'code': UNAUTHORIZED})
+        return
+
+    broker = get_broker()
+    queue = broker.subscribe(user.pk)
+    incoming = asyncio.ensure_future(receive())
+    outgoing = asyncio.ensure_future(queue.get())
+    try:
+        await send({'type': 'websocket.accept'})
+        while True:
+            done, _ = await asyncio.wait(
+                {incoming, outgoing},
+                timeout=max(expires_at - time.time(), 0),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                await send({'type': 'websocket.close', 'code': UNAUTHORIZED})
+                break
+            if outgoing in done:
+                await send({'type': 'websocket.send', 'text': outgoing.result()})
+                outgoing = asyncio.ensure_future(queue.get())
+            if incoming in done:
+                # Nothing is expected from the client; just watch for disconnects.
+                if incoming.result()['type'] == 'websocket.disconnect':
+                    break
+                incoming = asyncio.ensure_future(receive())
+    finally:
+        incoming.cancel()
+        outgoing.cancel()
+        broker.unsubscribe(user.pk, queue)
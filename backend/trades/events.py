@@ -0,0 +1,46 @@
+"""
+Reading the trade event log (``TradeEvent``).
+
+Every trade transition appends an event in the transaction that makes it,
+so the log holds exactly the committed changes. Downstream consumers
+(notifications, analytics, cache invalidation) read it in batches after
+the position of the last event they processed instead of re-querying the
+trades table; ``consume`` keeps that position in a ``TradeEventCursor``.
+
+Positions follow commit order rather than id order (see
+``bookswap.commitorder``), so a slow transaction committing its events
+after newer ones have been read is still picked up, however long it took.
+"""
+from django.db import transaction
+
+from bookswap import commitorder
+
+from .models import TradeEvent, TradeEventCursor
+
+DEFAULT_BATCH_SIZE = 100
+
+
+def read_batch(after=commitorder.START, limit=DEFAULT_BATCH_SIZE, queryset=None):
+    """Return up to ``limit`` committed events past the position ``after``, in commit order."""
+    if queryset is None:
+        queryset = TradeEvent.objects.all()
+    return list(commitorder.visible(queryset, commitorder.horizon(queryset.db), after=after)[:limit])
+
+
+def consume(name, handler, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Pass the next batch of events to ``handler`` on behalf of consumer
+    ``name`` and move its cursor past them; return the batch size.
+
+    Handler and cursor run in one transaction, so database work done by the
+    handler happens exactly once. If the handler raises, the cursor stays
+    put and the batch is delivered again next time.
+    """
+    with transaction.atomic():
+        cursor, _ = TradeEventCursor.objects.select_for_update().get_or_create(name=name)
+        batch = read_batch((cursor.last_xid, cursor.last_event_id), batch_size)
+        if batch:
+            handler(batch)
+            cursor.last_xid, cursor.last_event_id = commitorder.position_of(batch[-1])
+            cursor.save(update_fields=['last_xid', 'last_event_id', 'updated_at'])
+    return len(batch)
@@ -0,0 +1,87 @@
+"""
+Expire pending trades that nobody answered.
+
+Trades are expired oldest first in bounded batches, each in its own short
+transaction, walking the partial ``trades_pending_age_idx`` index so every
+batch costs the same however many rows are left.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from bookswap.models import SyncChange
+
+from .models import Trade, TradeEvent
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def default_cutoff():
+    return timezone.now() - timedelta(days=settings.TRADE_PENDING_MAX_AGE_DAYS)
+
+
+def pending_before(cutoff, limit):
+    """Lock and return the ids of up to ``limit`` pending trades created before ``cutoff``, oldest first."""
+    return list(
+        Trade.objects.select_for_update(skip_locked=True).filter(
+            status='pending', created_at__lt=cutoff,
+        ).order_by('created_at', 'id').values_list('pk', flat=True)[:limit]
+    )
+
+
+def expire_batch(cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Expire up to ``batch_size`` pending trades created before ``cutoff``.
+
+    Returns how many trades were selected and how many of them were
+    expired; the others were answered in the meantime.
+    """
+    with transaction.atomic():
+        selected = pending_before(cutoff, batch_size)
+        if not selected:
+            return 0, 0
+        now = timezone.now()
+        # Pending trades hold no book reservations (those are taken on
+        # acceptance), so there is nothing to release. Re-checking the status
+        # skips trades answered since they were selected.
+        Trade.objects.filter(pk__in=selected, status='pending').update(status='expired', updated_at=now)
+        # Only the rows the UPDATE changed are logged and pushed.
+        trades = list(
+            Trade.objects.filter(pk__in=selected, status='expired', updated_at=now).only(
+                'status', 'requester', 'recipient', 'trade_type', 'requester_confirmed', 'recipient_confirmed',
+            )
+        )
+        TradeEvent.record(trades, 'expired')
+        SyncChange.record_trades(trades)
+        Trade.notify_all_changed(trades)
+    return len(selected), len(trades)
+
+
+def expire_pending_trades(cutoff=None, batch_size=DEFAULT_BATCH_SIZE, pause=0, max_batches=None):
+    """
+    Expire every pending trade created before ``cutoff`` (default:
+    ``TRADE_PENDING_MAX_AGE_DAYS`` ago), sleeping ``pause`` seconds between
+    batches to leave room for other writers.
+
+    Returns throughput metrics for the run.
+    """
+    cutoff = cutoff or default_cutoff()
+    stats = {'expired': 0, 'batches': 0, 'seconds': 0.0, 'slowest_batch': 0.0}
+    started = time.perf_counter()
+    while max_batches is None or stats['batches'] < max_batches:
+        batch_started = time.perf_counter()
+        # A batch whose trades were all answered meanwhile expires nothing,
+        # but older pending trades may still be left.
+        selected, expired = expire_batch(cutoff, batch_size)
+        if not selected:
+            break
+        stats['expired'] += expired
+        stats['batches'] += 1
+        stats['slowest_batch'] = max(stats['slowest_batch'], time.perf_counter() - batch_started)
+        if pause:
+            time.sleep(pause)
+    stats['seconds'] = time.perf_counter() - started
+    return stats
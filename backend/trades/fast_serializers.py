@@ -0,0 +1,102 @@
+from books.fast_serializers import compile_book
+from bookswap.fastpath import Columns, FastListSerializer, datetime_formatter
+from users.fast_serializers import compile_profile
+from .models import Trade, TradeMessage
+
+TRADE_COLUMNS = (
+    'id', 'message', 'status', 'trade_type', 'requester_confirmed',
+    'recipient_confirmed', 'message_count', 'last_message_id', 'created_at', 'updated_at',
+)
+
+
+def compile_trade(columns, request):
+    """
+    Compile a row builder equivalent to ``TradeSerializer`` minus
+    ``last_message``, which is passed in already built.
+
+    Rows must come from a queryset annotated by ``with_message_summary()``;
+    ``FastTradeSerializer.prepare`` adds it when missing.
+    """
+    (
+        i_id, i_message, i_status, i_trade_type, i_requester_confirmed,
+        i_recipient_confirmed, i_message_count, _, i_created_at, i_updated_at,
+    ) = columns.add(*TRADE_COLUMNS)
+    build_requester = compile_profile(columns, 'requester__', request)
+    build_recipient = compile_profile(columns, 'recipient__', request)
+    build_requested_book = compile_book(columns, 'requested_book__', request)
+    build_offered_book = compile_book(columns, 'offered_book__', request)
+    build_recipient_offered_book = compile_book(columns, 'recipient_offered_book__', request)
+    format_datetime = datetime_formatter()
+    confirmed_by_all = Trade.confirmed_by_all
+
+    def build(row, last_message):
+        status = row[i_status]
+        is_completed = confirmed_by_all(row[i_trade_type], row[i_requester_confirmed], row[i_recipient_confirmed])
+        return {
+            'id': row[i_id],
+            'requester': build_requester(row),
+            'recipient': build_recipient(row),
+            'requested_book': build_requested_book(row),
+            'offered_book': build_offered_book(row),
+            'recipient_offered_book': build_recipient_offered_book(row),
+            'message': row[i_message],
+            'status': status,
+            'trade_type': row[i_trade_type],
+            'requester_confirmed': row[i_requester_confirmed],
+            'recipient_confirmed': row[i_recipient_confirmed],
+            'is_completed': is_completed,
+            'can_be_completed': status == 'accepted' and is_completed,
+            'message_count': row[i_message_count],
+            'last_message': last_message,
+            'created_at': format_datetime(row[i_created_at]),
+            'updated_at': format_datetime(row[i_updated_at]),
+        }
+
+    return build
+
+
+def compile_message(columns, request):
+    """Compile a row builder equivalent to ``TradeMessageSerializer``."""
+    i_id, i_message, i_created_at = columns.add('id', 'message', 'created_at')
+    build_sender = compile_profile(columns, 'sender__', request)
+    format_datetime = datetime_formatter()
+
+    def build(row):
+        return {
+            'id': row[i_id],
+            'sender': build_sender(row),
+            'message': row[i_message],
+            'created_at': format_datetime(row[i_created_at]),
+        }
+
+    return build
+
+
+class FastTradeSerializer(FastListSerializer):
+    """
+    Produces the same output as ``TradeSerializer(many=True)`` from
+    ``values_list`` rows, fetching the page's last messages in one extra query.
+    """
+
+    def __init__(self, request):
+        super().__init__(request)
+        self.build = compile_trade(self.columns, request)
+        self.message_columns = Columns()
+        self.build_message = compile_message(self.message_columns, request)
+        self.i_message_id = self.message_columns.names.index('id')
+
+    def prepare(self, queryset):
+        if 'message_count' not in queryset.query.annotations:
+            queryset = queryset.with_message_summary()
+        return super().prepare(queryset)
+
+    def serialize(self, rows):
+        last_messages = {}
+        message_ids = [row.last_message_id for row in rows if row.last_message_id is not None]
+        if message_ids:
+            build_message, i_id = self.build_message, self.i_message_id
+            message_rows = TradeMessage.objects.filter(pk__in=message_ids).values_list(*self.message_columns.names)
+            last_messages = {message[i_id]: build_message(message) for message in message_rows}
+
+        build = self.build
+        return [build(row, last_messages.get(row.last_message_id)) for row in rows]
@@ -0,0 +1,77 @@
+import asyncio
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from trades.consumers import trade_events
+from trades.realtime import encode, get_broker
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Open many idle /ws/trades/ connections against the in-process broker, "
+        "then report memory per connection and the time to fan one event out to all of them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=5000)
+        parser.add_argument('--users', type=int, default=50)
+
+    def handle(self, *args, **options):
+        users = User.objects.bulk_create([
+            User(username=f'bench-events-{i}', email=f'bench-events-{i}@example.com')
+            for i in range(options['users'])
+        ])
+        try:
+            tokens = [str(AccessToken.for_user(user)).encode() for user in users]
+            asyncio.run(self.run(options['connections'], users, tokens))
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    async def run(self, count, users, tokens):
+        broker = get_broker()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        connections = []
+        for i in range(count):
+            incoming, outgoing = asyncio.Queue(), asyncio.Queue()
+            scope = {'type': 'websocket', 'path': '/ws/trades/', 'query_string': b'token=' + tokens[i % len(tokens)]}
+            task = asyncio.create_task(trade_events(scope, incoming.get, outgoing.put))
+            incoming.put_nowait({'type': 'websocket.connect'})
+            connections.append((incoming, outgoing, task))
+        for _, outgoing, _ in connections:
+            message = await outgoing.get()
+            if message['type'] != 'websocket.accept':
+                raise CommandError(f"Connection refused: {message}")
+        connected = time.perf_counter() - start
+
+        await asyncio.sleep(0.1)
+        per_connection = (tracemalloc.get_traced_memory()[0] - baseline) / count
+        tracemalloc.stop()
+
+        # Publish from a worker thread, as a sync Django view would.
+        data = encode({'type': 'trade.updated', 'trade': {'id': 0}})
+        start = time.perf_counter()
+        await asyncio.to_thread(broker.publish, [user.pk for user in users], data)
+        for _, outgoing, _ in connections:
+            await outgoing.get()
+        fan_out = time.perf_counter() - start
+
+        for incoming, _, _ in connections:
+            incoming.put_nowait({'type': 'websocket.disconnect', 'code': 1000})
+        await asyncio.gather(*(task for _, _, task in connections))
+        if broker.subscribers:
+            raise CommandError("Subscribers left behind after disconnecting")
+
+        self.stdout.write(f"{count} connections for {len(users)} users opened in {connected:.2f}s")
+        self.stdout.write(f"idle memory per connection: {per_connection / 1024:.1f} KiB")
+        self.stdout.write(self.style.SUCCESS(
+            f"one event per user delivered to all {count} connections in {fan_out * 1000:.1f} ms"
+        ))
@@ -0,0 +1,41 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from trades.events import DEFAULT_BATCH_SIZE, consume
+
+
+class Command(BaseCommand):
+    help = (
+        "Print new trade events as JSON lines for the named consumer and advance its cursor. "
+        "Pipe the output into whatever processes the events."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help="Consumer name; each name keeps its own position in the log.")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--follow', action='store_true', help="Keep polling for new events.")
+        parser.add_argument('--interval', type=float, default=1.0, help="Seconds between polls with --follow.")
+
+    def handle(self, *args, **options):
+        while True:
+            while consume(options['name'], self.write_batch, options['batch_size']):
+                pass
+            if not options['follow']:
+                return
+            time.sleep(options['interval'])
+
+    def write_batch(self, events):
+        for event in events:
+            self.stdout.write(json.dumps({
+                'id': event.id,
+                'kind': event.kind,
+                'trade_id': event.trade_id,
+                'requester_id': event.requester_id,
+                'recipient_id': event.recipient_id,
+                'status': event.status,
+                'actor_id': event.actor_id,
+                'data': event.data,
+                'created_at': event.created_at.isoformat(),
+            }))
@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from trades.expiry import DEFAULT_BATCH_SIZE, expire_pending_trades
+
+
+class Command(BaseCommand):
+    help = (
+        "Expire pending trades older than TRADE_PENDING_MAX_AGE_DAYS in small batches. "
+        "Run it from cron, or keep it running with --every."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age-days', type=int, default=settings.TRADE_PENDING_MAX_AGE_DAYS)
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0, help="Seconds to sleep between batches.")
+        parser.add_argument(
+            '--every', type=float, default=None,
+            help="Repeat the run every N seconds instead of exiting.",
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0 or options['max_age_days'] < 0:
+            raise CommandError("--batch-size must be positive and --max-age-days not negative.")
+        while True:
+            cutoff = timezone.now() - timedelta(days=options['max_age_days'])
+            stats = expire_pending_trades(cutoff, options['batch_size'], options['pause'])
+            rate = stats['expired'] / stats['seconds'] if stats['seconds'] else 0
+            self.stdout.write(
+                f"expired {stats['expired']} trades in {stats['batches']} batches, "
+                f"{stats['seconds']:.2f}s ({rate:.0f} rows/s, slowest batch {stats['slowest_batch'] * 1000:.1f} ms)"
+            )
+            if options['every'] is None:
+                return
+            time.sleep(options['every'])
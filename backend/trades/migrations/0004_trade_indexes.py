@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trades', '0003_trade_recipient_confirmed_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['requester', 'status', '-created_at'], name='trades_requester_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['recipient', 'status', '-created_at'], name='trades_recipient_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['requester', '-created_at', '-id'], name='trades_requester_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['recipient', '-created_at', '-id'], name='trades_recipient_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['recipient', '-created_at', '-id'], name='trades_recipient_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trades', '0004_trade_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trademessage',
+            index=models.Index(fields=['trade', 'id'], name='trade_messages_trade_id_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('trades', '0005_trademessage_trade_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TradeReadState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_message_id', models.PositiveBigIntegerField(default=0)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('trade', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_states', to='trades.trade')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trade_read_states', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'trade_read_states',
+                'indexes': [models.Index(condition=models.Q(('unread_count__gt', 0)), fields=['user', 'unread_count'], name='trade_read_states_unread_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tradereadstate',
+            constraint=models.UniqueConstraint(fields=('trade', 'user'), name='trade_read_states_trade_user_uniq'),
+        ),
+    ]
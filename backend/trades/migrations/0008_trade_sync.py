@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trades', '0007_trade_expired_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TradeTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('requester_id', models.PositiveBigIntegerField()),
+                ('recipient_id', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'trade_tombstones',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['requester', 'updated_at', 'id'], name='trades_requester_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['recipient', 'updated_at', 'id'], name='trades_recipient_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tradetombstone',
+            index=models.Index(fields=['requester_id', 'deleted_at'], name='trade_tombstones_requester_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tradetombstone',
+            index=models.Index(fields=['recipient_id', 'deleted_at'], name='trade_tombstones_recipient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tradetombstone',
+            index=models.Index(fields=['deleted_at'], name='trade_tombstones_deleted_idx'),
+        ),
+    ]
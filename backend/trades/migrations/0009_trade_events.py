@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trades', '0008_trade_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TradeEventCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('last_event_id', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'trade_event_cursors',
+            },
+        ),
+        migrations.CreateModel(
+            name='TradeEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('accepted', 'Accepted'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled'), ('confirmed', 'Confirmed'), ('completed', 'Completed'), ('expired', 'Expired'), ('deleted', 'Deleted')], max_length=20)),
+                ('trade_id', models.PositiveBigIntegerField()),
+                ('requester_id', models.PositiveBigIntegerField()),
+                ('recipient_id', models.PositiveBigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled'), ('completed', 'Completed'), ('expired', 'Expired')], max_length=20)),
+                ('actor_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'trade_events',
+                'indexes': [models.Index(fields=['requester_id', 'id'], name='trade_events_requester_idx'), models.Index(fields=['recipient_id', 'id'], name='trade_events_recipient_idx')],
+            },
+        ),
+    ]
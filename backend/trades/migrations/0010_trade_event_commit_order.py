@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trades', '0009_trade_events'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tradeevent',
+            name='trade_events_requester_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='tradeevent',
+            name='trade_events_recipient_idx',
+        ),
+        migrations.AddField(
+            model_name='tradeevent',
+            name='xid',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tradeeventcursor',
+            name='last_xid',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='tradeevent',
+            index=models.Index(fields=['xid', 'id'], name='trade_events_commit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tradeevent',
+            index=models.Index(fields=['requester_id', 'xid', 'id'], name='trade_events_requester_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tradeevent',
+            index=models.Index(fields=['recipient_id', 'xid', 'id'], name='trade_events_recipient_idx'),
+        ),
+    ]
@@ -1,10 +1,49 @@
-from django.db import models
+from collections import Counter
+
+from django.db import OperationalError, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from books import cache as book_cache
+from books import facets
 from books.models import Book
+from bookswap.commitorder import TransactionId
+from bookswap.models import SyncChange
+from . import realtime
 
 User = get_user_model()
 
 
+class TradeConflict(Exception):
+    """A trade changed, or one of its books was reserved, by a concurrent request."""
+
+
+def involving_books(book_ids):
+    """Condition matching trades requesting or offering any of ``book_ids``."""
+    return Q(requested_book__in=book_ids) | Q(offered_book__in=book_ids) | Q(recipient_offered_book__in=book_ids)
+
+
+class TradeQuerySet(models.QuerySet):
+
+    def involving_books(self, book_ids):
+        return self.filter(involving_books(book_ids))
+
+    def with_message_summary(self):
+        """
+        Annotate ``message_count`` and ``last_message_id`` with correlated
+        subqueries, each answered from the ``(trade, id)`` message index.
+        """
+        messages = TradeMessage.objects.filter(trade=OuterRef('pk')).order_by()
+        return self.annotate(
+            message_count=Coalesce(
+                Subquery(messages.values('trade').annotate(count=Count('pk')).values('count')),
+                0,
+            ),
+            last_message_id=Subquery(messages.order_by('-id').values('id')[:1]),
+        )
+
+
 class Trade(models.Model):
     """Trade model for book exchange requests."""
     STATUS_CHOICES = [
@@ -13,6 +52,7 @@ class Trade(models.Model):
         ('rejected', 'Rejected'),
         ('cancelled', 'Cancelled'),
         ('completed', 'Completed'),
+        ('expired', 'Expired'),
     ]
 
     TRADE_TYPE_CHOICES = [
@@ -67,24 +107,60 @@ class Trade(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TradeQuerySet.as_manager()
+
     class Meta:
         db_table = 'trades'
         ordering = ['-created_at']
+        indexes = [
+            # Trade lists filter on one side of the trade (OR'd for "mine")
+            # plus status, newest first.
+            models.Index(fields=['requester', 'status', '-created_at'], name='trades_requester_status_idx'),
+            models.Index(fields=['recipient', 'status', '-created_at'], name='trades_recipient_status_idx'),
+            models.Index(fields=['requester', '-created_at', '-id'], name='trades_requester_recent_idx'),
+            models.Index(fields=['recipient', '-created_at', '-id'], name='trades_recipient_recent_idx'),
+            models.Index(
+                fields=['recipient', '-created_at', '-id'],
+                name='trades_recipient_pending_idx',
+                condition=models.Q(status='pending'),
+            ),
+            # Delta sync reads each side's changes in (updated_at, id) order.
+            models.Index(fields=['requester', 'updated_at', 'id'], name='trades_requester_updated_idx'),
+            models.Index(fields=['recipient', 'updated_at', 'id'], name='trades_recipient_updated_idx'),
+            # Oldest pending trades first, for the expiry job.
+            models.Index(
+                fields=['created_at', 'id'],
+                name='trades_pending_age_idx',
+                condition=models.Q(status='pending'),
+            ),
+        ]
 
     def __str__(self):
         if self.trade_type == 'donation':
             return f"Donation {self.id}: {self.requester.username} → {self.recipient.username}"
         return f"Trade {self.id}: {self.requester.username} ↔ {self.recipient.username}"
 
+    @property
+    def last_message(self):
+        """The newest message, taken from the ``recent_messages`` prefetch when present."""
+        if hasattr(self, 'recent_messages'):
+            return self.recent_messages[0] if self.recent_messages else None
+        return self.messages.select_related('sender').order_by('-id').first()
+
     @property
     def is_completed(self):
         """Check if trade is completed based on type."""
-        if self.trade_type == 'donation':
+        return self.confirmed_by_all(self.trade_type, self.requester_confirmed, self.recipient_confirmed)
+
+    @staticmethod
+    def confirmed_by_all(trade_type, requester_confirmed, recipient_confirmed):
+        """Check whether every party that has to confirm a trade of this type did."""
+        if trade_type == 'donation':
             # For donations, only recipient needs to confirm
-            return self.recipient_confirmed
+            return recipient_confirmed
         else:
             # For swaps, both parties need to confirm
-            return self.requester_confirmed and self.recipient_confirmed
+            return requester_confirmed and recipient_confirmed
 
     @property
     def can_be_completed(self):
@@ -95,59 +171,228 @@ class Trade(models.Model):
         """Validate trade data."""
         from django.core.exceptions import ValidationError
         
-        if self.requester == self.recipient:
+        if self.requester_id == self.recipient_id:
             raise ValidationError("Cannot trade with yourself.")
         
-        if self.requested_book.owner != self.recipient:
+        if self.requested_book.owner_id != self.recipient_id:
             raise ValidationError("Requested book must belong to the recipient.")
         
-        if self.offered_book and self.offered_book.owner != self.requester:
+        if self.offered_book and self.offered_book.owner_id != self.requester_id:
             raise ValidationError("Offered book must belong to the requester.")
         
-        if self.recipient_offered_book and self.recipient_offered_book.owner != self.recipient:
+        if self.recipient_offered_book and self.recipient_offered_book.owner_id != self.recipient_id:
             raise ValidationError("Recipient offered book must belong to the recipient.")
 
     def save(self, *args, **kwargs):
         self.clean()
-        
-        # Auto-complete trade when both parties confirm
-        if self.is_completed and self.status == 'accepted':
+
+        with transaction.atomic():
+            # Auto-complete trade when both parties confirm
+            if self.pk is not None and self.can_be_completed:
+                self.complete()
+            super().save(*args, **kwargs)
+
+    def notify_changed(self):
+        """
+        Invalidate both parties' cached summaries and push the change to
+        them, once the current transaction commits. Called by every code
+        path that writes trades, including bulk updates.
+        """
+        Trade.notify_all_changed([self])
+
+    @staticmethod
+    def notify_all_changed(trades):
+        """``notify_changed`` for many trades, invalidating each user's summary once."""
+        from . import summary
+
+        summary.invalidate([user_id for trade in trades for user_id in (trade.requester_id, trade.recipient_id)])
+        for trade in trades:
+            realtime.publish_trade(trade)
+
+    def accept(self, trade_type='swap', recipient_offered_book=None):
+        """
+        Accept a pending trade and reserve its books for it.
+
+        Raises ``TradeConflict``, leaving nothing changed, if the trade is no
+        longer pending, another trade reserved one of the books first or the
+        database gave up on a lock (e.g. a deadlock victim on Postgres).
+        """
+        # The recipient may offer back a book already in the trade; each
+        # book is locked and reserved once.
+        book_ids = sorted({
+            book_id for book_id in (
+                self.requested_book_id,
+                self.offered_book_id,
+                recipient_offered_book.pk if recipient_offered_book else None,
+            )
+            if book_id is not None
+        })
+        try:
+            with transaction.atomic():
+                now = timezone.now()
+                competing = self._lock_for_accept(book_ids)
+                accepted = Trade.objects.filter(pk=self.pk, status='pending').update(
+                    status='accepted',
+                    trade_type=trade_type,
+                    recipient_offered_book=recipient_offered_book,
+                    updated_at=now,
+                )
+                if not accepted:
+                    raise TradeConflict("This trade is no longer pending.")
+                self._reserve_books(book_ids, competing, now)
+
+                self.status = 'accepted'
+                self.trade_type = trade_type
+                self.recipient_offered_book = recipient_offered_book
+                self.updated_at = now
+                TradeEvent.record([self], 'accepted', actor_id=self.recipient_id, trade_type=trade_type)
+                SyncChange.record_trades([self])
+                self.notify_changed()
+        except OperationalError as exc:
+            raise TradeConflict("The trade is being updated by another request, try again.") from exc
+
+    def _lock_for_accept(self, book_ids):
+        """
+        Lock, before anything is written, this trade and every pending trade
+        involving ``book_ids``, then the books, each in id order. Concurrent
+        accepts then queue up on the same rows in the same order instead of
+        deadlocking. Returns the competing trades.
+        """
+        trades = list(
+            Trade.objects.select_for_update().filter(
+                Q(pk=self.pk) | Q(involving_books(book_ids), status='pending')
+            ).order_by('pk').only(
+                'status', 'requester', 'recipient', 'requested_book', 'trade_type',
+                'requester_confirmed', 'recipient_confirmed',
+            )
+        )
+        if not any(trade.pk == self.pk and trade.status == 'pending' for trade in trades):
+            raise TradeConflict("This trade is no longer pending.")
+        list(Book.objects.select_for_update().filter(pk__in=book_ids).order_by('pk').values_list('pk'))
+        return [trade for trade in trades if trade.pk != self.pk and trade.status == 'pending']
+
+    def _reserve_books(self, book_ids, competing, now):
+        """
+        Mark ``book_ids`` unavailable and turn down the ``competing`` pending
+        trades involving them.
+
+        Each book is only taken if it is still available, so of two trades
+        racing for the same book exactly one wins; the other gets
+        ``TradeConflict`` instead of retrying.
+        """
+        books = Book.objects.filter(pk__in=book_ids)
+        reserved = books.filter(is_available=True).update(is_available=False, updated_at=now)
+        if reserved != len(book_ids):
+            raise TradeConflict("One of the books has already been reserved by another trade.")
+        facets.move(Counter(books.values_list('genre', 'condition')), is_available=False)
+        book_cache.invalidate_books(book_ids)
+        SyncChange.record(Book, book_ids)
+
+        # Requests for a reserved book are rejected; requests offering
+        # one can no longer be fulfilled and are cancelled.
+        if not competing:
+            return
+        Trade.objects.filter(pk__in=[trade.pk for trade in competing]).update(
+            status=Case(
+                When(requested_book__in=book_ids, then=Value('rejected')),
+                default=Value('cancelled'),
+            ),
+            updated_at=now,
+        )
+        for trade in competing:
+            trade.status = 'rejected' if trade.requested_book_id in book_ids else 'cancelled'
+            trade.updated_at = now
+        for kind in ('rejected', 'cancelled'):
+            TradeEvent.record([trade for trade in competing if trade.status == kind], kind, superseded_by=self.pk)
+        SyncChange.record_trades(competing)
+        Trade.notify_all_changed(competing)
+
+    def confirm(self, user):
+        """
+        Record that ``user`` received their book and complete the trade once
+        every party has confirmed.
+
+        Safe against both parties confirming at the same moment: the flag is
+        set with an UPDATE that locks the row before the trade is re-read.
+        Raises ``TradeConflict``, leaving nothing changed, if the trade is not
+        (or no longer) accepted, or the database turns the confirmation down
+        over a lock; the caller may retry the latter.
+        """
+        field = 'requester_confirmed' if user.pk == self.requester_id else 'recipient_confirmed'
+        try:
+            with transaction.atomic():
+                now = timezone.now()
+                if not Trade.objects.filter(pk=self.pk, status='accepted').update(**{field: True}, updated_at=now):
+                    raise TradeConflict("This trade is not awaiting confirmation.")
+                self.status, self.requester_confirmed, self.recipient_confirmed = Trade.objects.values_list(
+                    'status', 'requester_confirmed', 'recipient_confirmed'
+                ).get(pk=self.pk)
+                self.updated_at = now
+                TradeEvent.record([self], 'confirmed', actor_id=user.pk)
+                if self.can_be_completed:
+                    self.complete()
+                SyncChange.record_trades([self])
+                self.notify_changed()
+        except OperationalError as exc:
+            raise TradeConflict("The trade is being updated by another request, try again.") from exc
+
+    def complete(self):
+        """
+        Mark the trade completed, hand its books over and count it for both
+        users, in one transaction.
+
+        Returns False without changing anything if the trade was already
+        completed, e.g. by a concurrent confirmation.
+        """
+        with transaction.atomic(savepoint=False):
+            now = timezone.now()
+            # The conditional UPDATE locks the row, so only one caller gets past it.
+            claimed = Trade.objects.filter(pk=self.pk).exclude(status='completed').update(
+                status='completed', updated_at=now
+            )
             self.status = 'completed'
+            if not claimed:
+                return False
+            self.updated_at = now
+            TradeEvent.record([self], 'completed')
+            # The trade itself is logged for delta sync by the caller.
 
             # --- Ownership transfer logic ---
-            # Swap
+            # Requested book goes to requester
+            new_owners = {self.requested_book_id: self.requester_id}
             if self.trade_type == 'swap':
-                # Requested book goes to requester
-                self.requested_book.owner = self.requester
-                self.requested_book.is_available = True
-                self.requested_book.save()
                 # If recipient offered a book back, it goes to the requester
-                if self.recipient_offered_book:
-                    self.recipient_offered_book.owner = self.requester
-                    self.recipient_offered_book.is_available = True
-                    self.recipient_offered_book.save()
+                if self.recipient_offered_book_id:
+                    new_owners[self.recipient_offered_book_id] = self.requester_id
                 # If requester offered a book, it goes to the recipient
-                if self.offered_book:
-                    self.offered_book.owner = self.recipient
-                    self.offered_book.is_available = True
-                    self.offered_book.save()
-            # Donation
-            elif self.trade_type == 'donation':
-                self.requested_book.owner = self.requester
-                self.requested_book.is_available = True
-                self.requested_book.save()
-            
+                if self.offered_book_id:
+                    new_owners[self.offered_book_id] = self.recipient_id
+
+            books = Book.objects.filter(pk__in=new_owners)
+            relisted = Counter(
+                books.filter(is_available=False).values_list('genre', 'condition')
+            )
+            book_cache.invalidate_books(new_owners)
+            books.update(
+                owner_id=Case(
+                    *(When(pk=book_id, then=Value(owner_id)) for book_id, owner_id in new_owners.items()),
+                    output_field=models.IntegerField(),
+                ),
+                is_available=True,
+                updated_at=now,
+            )
+            facets.move(relisted, is_available=True)
+            SyncChange.record(Book, new_owners)
+
             # --- Increment successful trades count for both users ---
-            from django.db.models import F
-            self.requester.successful_trades_count = F('successful_trades_count') + 1
-            self.requester.save()
-            self.requester.refresh_from_db()
-            
-            self.recipient.successful_trades_count = F('successful_trades_count') + 1
-            self.recipient.save()
-            self.recipient.refresh_from_db()
-        
-        super().save(*args, **kwargs)
+            User.objects.filter(pk__in=[self.requester_id, self.recipient_id]).update(
+                successful_trades_count=F('successful_trades_count') + 1,
+                updated_at=now,
+            )
+            # Trade counts are nested in book and trade responses, as profiles.
+            book_cache.invalidate_owners([self.requester_id, self.recipient_id])
+            SyncChange.record(User, [self.requester_id, self.recipient_id])
+        return True
 
 
 class TradeMessage(models.Model):
@@ -168,6 +413,120 @@ class TradeMessage(models.Model):
     class Meta:
         db_table = 'trade_messages'
         ordering = ['created_at']
+        indexes = [
+            # Message pages are fetched by id range within one trade.
+            models.Index(fields=['trade', 'id'], name='trade_messages_trade_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"Message {self.id} in Trade {self.trade.id}"
+
+
+class TradeReadState(models.Model):
+    """How far one participant has read a trade's messages."""
+    trade = models.ForeignKey(
+        Trade,
+        on_delete=models.CASCADE,
+        related_name='read_states'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='trade_read_states'
+    )
+    last_read_message_id = models.PositiveBigIntegerField(default=0)
+    # Messages from the other participant after ``last_read_message_id``.
+    unread_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'trade_read_states'
+        constraints = [
+            models.UniqueConstraint(fields=['trade', 'user'], name='trade_read_states_trade_user_uniq'),
+        ]
+        indexes = [
+            # A user's unread total only visits the trades with unread messages.
+            models.Index(
+                fields=['user', 'unread_count'],
+                name='trade_read_states_unread_idx',
+                condition=models.Q(unread_count__gt=0),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} read trade {self.trade_id} up to message {self.last_read_message_id}"
+
+
+class TradeEvent(models.Model):
+    """
+    Append-only log of trade lifecycle changes, written in the same
+    transaction as the change itself. Consumers read it in commit order,
+    see ``trades.events``.
+
+    Trade and user ids are stored as plain columns so events outlive the
+    rows they describe.
+    """
+    KIND_CHOICES = [
+        ('created', 'Created'),
+        ('accepted', 'Accepted'),
+        ('rejected', 'Rejected'),
+        ('cancelled', 'Cancelled'),
+        ('confirmed', 'Confirmed'),
+        ('completed', 'Completed'),
+        ('expired', 'Expired'),
+        ('deleted', 'Deleted'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    # The writing transaction, see ``bookswap.commitorder``.
+    xid = models.BigIntegerField(default=0, editable=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    trade_id = models.PositiveBigIntegerField()
+    requester_id = models.PositiveBigIntegerField()
+    recipient_id = models.PositiveBigIntegerField()
+    # The trade's status right after the event.
+    status = models.CharField(max_length=20, choices=Trade.STATUS_CHOICES)
+    actor_id = models.PositiveBigIntegerField(null=True, blank=True)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'trade_events'
+        indexes = [
+            # Consumers read the whole log, and each participant their own
+            # events, in commit order.
+            models.Index(fields=['xid', 'id'], name='trade_events_commit_idx'),
+            models.Index(fields=['requester_id', 'xid', 'id'], name='trade_events_requester_idx'),
+            models.Index(fields=['recipient_id', 'xid', 'id'], name='trade_events_recipient_idx'),
+        ]
+
+    def __str__(self):
+        return f"Trade {self.trade_id} {self.kind}"
+
+    @classmethod
+    def record(cls, trades, kind, actor_id=None, **data):
+        """Append one ``kind`` event per trade in ``trades``."""
+        if not trades:
+            return []
+        return cls.objects.bulk_create([
+            cls(
+                xid=TransactionId(), kind=kind, trade_id=trade.pk,
+                requester_id=trade.requester_id, recipient_id=trade.recipient_id,
+                status=trade.status, actor_id=actor_id, data=data,
+            )
+            for trade in trades
+        ])
+
+
+class TradeEventCursor(models.Model):
+    """How far a named consumer has read the ``TradeEvent`` log."""
+    name = models.CharField(max_length=100, unique=True)
+    # Position of the last event read, see ``bookswap.commitorder``.
+    last_xid = models.BigIntegerField(default=0)
+    last_event_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'trade_event_cursors'
 
     def __str__(self):
-        return f"Message {self.id} in Trade {self.trade.id}" 
\ No newline at end of file
+        return f"{self.name} at event {self.last_event_id}"
@@ -0,0 +1,105 @@
+"""
+Push trade events to connected clients.
+
+Events are published to the users they concern once the surrounding
+transaction commits, and delivered over the ``/ws/trades/`` WebSocket (see
+``trades/consumers.py``). Delivery goes through the broker named by the
+``TRADE_EVENTS_BROKER`` setting. The default ``InProcessBroker`` only
+reaches connections served by the same process, so deployments running
+several ASGI workers should point it at a broker-backed class with the same
+``subscribe`` / ``unsubscribe`` / ``publish`` interface.
+"""
+import asyncio
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework.fields import DateTimeField
+
+from bookswap.renderers import ORJSONRenderer
+
+
+class InProcessBroker:
+    """
+    Fan events out to subscriber queues living on this process's event loop.
+
+    ``publish`` may be called from any thread (Django runs sync views in a
+    worker thread); delivery is handed to the loop with
+    ``call_soon_threadsafe``. Each subscriber queue is bounded, and events
+    for a client that stopped reading are dropped rather than buffered.
+    """
+    queue_size = 100
+
+    def __init__(self):
+        self.subscribers = {}
+
+    def subscribe(self, user_id):
+        """Return a queue receiving the user's events; call from the event loop."""
+        queue = asyncio.Queue(self.queue_size)
+        self.subscribers.setdefault(user_id, {})[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self.subscribers.get(user_id, {})
+        queues.pop(queue, None)
+        if not queues:
+            self.subscribers.pop(user_id, None)
+
+    def publish(self, user_ids, event):
+        """Send the encoded ``event`` to every connection of ``user_ids``."""
+        for user_id in set(user_ids):
+            for queue, loop in list(self.subscribers.get(user_id, {}).items()):
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+
+    @staticmethod
+    def _deliver(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.TRADE_EVENTS_BROKER)()
+
+
+def encode(event):
+    return ORJSONRenderer().render(event).decode()
+
+
+def publish(user_ids, event):
+    """Publish ``event`` to ``user_ids`` after the current transaction commits."""
+    data = encode(event)
+    transaction.on_commit(lambda: get_broker().publish(user_ids, data))
+
+
+def trade_event(trade):
+    return {
+        'type': 'trade.updated',
+        'trade': {
+            'id': trade.pk,
+            'status': trade.status,
+            'trade_type': trade.trade_type,
+            'requester_confirmed': trade.requester_confirmed,
+            'recipient_confirmed': trade.recipient_confirmed,
+            'is_completed': trade.is_completed,
+            'updated_at': DateTimeField().to_representation(trade.updated_at),
+        },
+    }
+
+
+def publish_trade(trade):
+    """Tell both parties that the trade's status or confirmations changed."""
+    publish([trade.requester_id, trade.recipient_id], trade_event(trade))
+
+
+def publish_message(message, trade):
+    from .serializers import TradeMessageSerializer
+
+    publish([trade.requester_id, trade.recipient_id], {
+        'type': 'trade.message',
+        'trade': trade.pk,
+        'message': TradeMessageSerializer(message).data,
+    })
@@ -1,5 +1,9 @@
-from rest_framework import serializers
-from .models import Trade, TradeMessage
+from django.db import transaction
+from rest_framework import exceptions, serializers, status
+from bookswap.models import SyncChange
+from bookswap.serializers import DynamicFieldsMixin
+from . import unread
+from .models import Trade, TradeConflict, TradeEvent, TradeMessage
 from books.serializers import BookSerializer
 from users.serializers import UserProfileSerializer
 from django.contrib.auth import get_user_model
@@ -8,7 +12,13 @@ from books.models import Book
 User = get_user_model()
 
 
-class TradeMessageSerializer(serializers.ModelSerializer):
+class Conflict(exceptions.APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The trade was changed by another request.'
+    default_code = 'conflict'
+
+
+class TradeMessageSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for trade messages."""
     sender = UserProfileSerializer(read_only=True)
     
@@ -17,15 +27,27 @@ class TradeMessageSerializer(serializers.ModelSerializer):
         fields = ['id', 'sender', 'message', 'created_at']
         read_only_fields = ['id', 'sender', 'created_at']
 
+    def get_compact_fields(self):
+        return {'sender': serializers.PrimaryKeyRelatedField(read_only=True)}
 
-class TradeSerializer(serializers.ModelSerializer):
+
+class TradeEventSerializer(serializers.ModelSerializer):
+    """Serializer for trade log events."""
+    class Meta:
+        model = TradeEvent
+        fields = ['id', 'kind', 'trade_id', 'requester_id', 'recipient_id', 'status', 'actor_id', 'data', 'created_at']
+        read_only_fields = fields
+
+
+class TradeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Trade model."""
     requester = UserProfileSerializer(read_only=True)
     recipient = UserProfileSerializer(read_only=True)
     requested_book = BookSerializer(read_only=True)
     offered_book = BookSerializer(read_only=True)
     recipient_offered_book = BookSerializer(read_only=True)
-    messages = TradeMessageSerializer(many=True, read_only=True)
+    message_count = serializers.SerializerMethodField()
+    last_message = TradeMessageSerializer(read_only=True)
     is_completed = serializers.ReadOnlyField()
     can_be_completed = serializers.ReadOnlyField()
 
@@ -35,10 +57,25 @@ class TradeSerializer(serializers.ModelSerializer):
             'id', 'requester', 'recipient', 'requested_book', 'offered_book',
             'recipient_offered_book', 'message', 'status', 'trade_type',
             'requester_confirmed', 'recipient_confirmed', 'is_completed',
-            'can_be_completed', 'messages', 'created_at', 'updated_at'
+            'can_be_completed', 'message_count', 'last_message', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'requester', 'created_at', 'updated_at']
 
+    def get_message_count(self, trade):
+        # Annotated by ``Trade.objects.with_message_summary()`` on list and detail views.
+        count = getattr(trade, 'message_count', None)
+        return trade.messages.count() if count is None else count
+
+    def get_compact_fields(self):
+        return {
+            'requester': serializers.PrimaryKeyRelatedField(read_only=True),
+            'recipient': serializers.PrimaryKeyRelatedField(read_only=True),
+            'requested_book': BookSerializer(read_only=True, compact=True),
+            'offered_book': BookSerializer(read_only=True, compact=True),
+            'recipient_offered_book': BookSerializer(read_only=True, compact=True),
+            'last_message': TradeMessageSerializer(read_only=True, compact=True),
+        }
+
 
 class TradeCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating a new trade."""
@@ -54,13 +91,13 @@ class TradeCreateSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         
         # Check if requested book belongs to recipient
-        if attrs['requested_book'].owner != attrs['recipient']:
+        if attrs['requested_book'].owner_id != attrs['recipient'].id:
             raise serializers.ValidationError(
                 "Requested book must belong to the recipient."
             )
         
         # Check if offered book belongs to requester (if provided)
-        if attrs.get('offered_book') and attrs['offered_book'].owner != user:
+        if attrs.get('offered_book') and attrs['offered_book'].owner_id != user.id:
             raise serializers.ValidationError(
                 "Offered book must belong to you."
             )
@@ -108,7 +145,7 @@ class TradeUpdateSerializer(serializers.ModelSerializer):
         trade = self.instance
         user = self.context['request'].user
         
-        if value and value.owner != user:
+        if value and value.owner_id != user.id:
             raise serializers.ValidationError(
                 "You can only offer your own books."
             )
@@ -125,9 +162,25 @@ class TradeUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Only the recipient can set the trade type."
             )
-        
+
         return value
 
+    def update(self, instance, validated_data):
+        # Accepting reserves the books under lock; ``accept`` writes the
+        # trade itself, so nothing else is saved on that path.
+        if validated_data.get('status') == 'accepted':
+            try:
+                instance.accept(
+                    trade_type=validated_data.get('trade_type', instance.trade_type),
+                    recipient_offered_book=validated_data.get(
+                        'recipient_offered_book', instance.recipient_offered_book
+                    ),
+                )
+            except TradeConflict as exc:
+                raise Conflict(str(exc))
+            return instance
+        return super().update(instance, validated_data)
+
 
 class TradeAcceptanceSerializer(serializers.ModelSerializer):
     """Serializer for accepting trades with offered book or donation."""
@@ -160,7 +213,7 @@ class TradeAcceptanceSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         
         # Validate the book belongs to the user and is available
-        if value.owner != user or not value.is_available:
+        if value.owner_id != user.id or not value.is_available:
             raise serializers.ValidationError(
                 "You can only offer your own available books."
             )
@@ -198,23 +251,13 @@ class TradeAcceptanceSerializer(serializers.ModelSerializer):
         return attrs
 
     def update(self, instance, validated_data):
-        instance.status = 'accepted'
-        instance.trade_type = validated_data.get('trade_type', 'swap')
-        instance.recipient_offered_book = validated_data.get('recipient_offered_book')
-        
-        # Mark books as unavailable
-        instance.requested_book.is_available = False
-        instance.requested_book.save()
-        
-        if instance.offered_book:
-            instance.offered_book.is_available = False
-            instance.offered_book.save()
-        
-        if instance.recipient_offered_book:
-            instance.recipient_offered_book.is_available = False
-            instance.recipient_offered_book.save()
-        
-        instance.save()
+        try:
+            instance.accept(
+                trade_type=validated_data.get('trade_type', 'swap'),
+                recipient_offered_book=validated_data.get('recipient_offered_book'),
+            )
+        except TradeConflict as exc:
+            raise Conflict(str(exc))
         return instance
 
 
@@ -233,28 +276,32 @@ class TradeConfirmationSerializer(serializers.ModelSerializer):
             )
         return value
 
+    def validate(self, attrs):
+        if self.instance.status != 'accepted':
+            raise serializers.ValidationError(
+                "Can only confirm accepted trades."
+            )
+        return attrs
+
     def update(self, instance, validated_data):
         user = self.context['request'].user
         
         # For donations, only the recipient can confirm
         if instance.trade_type == 'donation':
-            if user != instance.recipient:
+            if user.pk != instance.recipient_id:
                 raise serializers.ValidationError(
                     "Only the recipient can confirm donations."
                 )
-            instance.recipient_confirmed = True
-        else:
-            # For swaps, both parties can confirm
-            if user == instance.requester:
-                instance.requester_confirmed = True
-            elif user == instance.recipient:
-                instance.recipient_confirmed = True
-            else:
-                raise serializers.ValidationError(
-                    "You can only confirm trades you are involved in."
-                )
+        # For swaps, both parties can confirm
+        elif user.pk not in (instance.requester_id, instance.recipient_id):
+            raise serializers.ValidationError(
+                "You can only confirm trades you are involved in."
+            )
         
-        instance.save()
+        try:
+            instance.confirm(user)
+        except TradeConflict as exc:
+            raise Conflict(str(exc))
         return instance
 
 
@@ -274,4 +321,10 @@ class TradeMessageCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data['sender'] = self.context['request'].user
         validated_data['trade'] = self.context['trade']
-        return super().create(validated_data) 
\ No newline at end of file
+        with transaction.atomic():
+            message = super().create(validated_data)
+            unread.message_created(message, validated_data['trade'])
+            # The trade's message count and last message changed.
+            Trade.objects.filter(pk=message.trade_id).update(updated_at=message.created_at)
+            SyncChange.record_trades([validated_data['trade']])
+        return message
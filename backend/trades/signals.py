@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from bookswap.models import SyncChange
+
+from . import realtime, summary
+from .models import Trade, TradeEvent, TradeMessage
+
+# Status changes made through ``Trade.save`` that are logged as events.
+LOGGED_STATUSES = {'accepted', 'rejected', 'cancelled', 'completed', 'expired'}
+
+
+@receiver(pre_save, sender=Trade)
+def remember_status(sender, instance, raw=False, **kwargs):
+    """Remember the stored status so post_save can tell whether it changed."""
+    instance._previous_status = None
+    if instance.pk and not raw:
+        instance._previous_status = Trade.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Trade)
+def log_trade_event(sender, instance, created, raw=False, **kwargs):
+    """Log trades created or moved to a new status by a plain save; the ``Trade`` methods log their own."""
+    if raw:
+        return
+    if created:
+        TradeEvent.record([instance], 'created', actor_id=instance.requester_id, trade_type=instance.trade_type)
+    elif instance.status != instance._previous_status and instance.status in LOGGED_STATUSES:
+        TradeEvent.record([instance], instance.status, previous_status=instance._previous_status)
+
+
+@receiver(post_save, sender=Trade)
+def log_sync_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        SyncChange.record_trades([instance])
+
+
+@receiver(post_save, sender=Trade)
+def push_trade_update(sender, instance, raw=False, **kwargs):
+    """Push saved trades; bulk updates in ``Trade`` notify on their own."""
+    if not raw:
+        instance.notify_changed()
+
+
+@receiver(post_delete, sender=Trade)
+def forget_trade(sender, instance, **kwargs):
+    summary.invalidate([instance.requester_id, instance.recipient_id])
+    SyncChange.record_trades([instance], deleted=True)
+    TradeEvent.record([instance], 'deleted')
+
+
+@receiver(post_save, sender=TradeMessage)
+def push_trade_message(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        trade = instance.trade
+        summary.invalidate([trade.requester_id, trade.recipient_id])
+        realtime.publish_message(instance, trade)
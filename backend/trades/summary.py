@@ -0,0 +1,130 @@
+"""
+Per-user trade inbox summary for ``/api/trades/summary/``.
+
+Counts per status, per type and per inbox bucket come from one
+conditional-aggregation query; the newest trades of every bucket from one
+windowed query. Summaries are cached per user and dropped whenever a trade
+involving the user is written (see ``Trade.notify_changed``).
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When, Window
+from django.db.models.functions import Least, RowNumber
+
+from .fast_serializers import FastTradeSerializer
+from .models import Trade
+
+RECENT_PER_BUCKET = 5
+
+# Backstop for changes the write hooks do not see (edited books, profiles).
+CACHE_TIMEOUT = 300
+
+# Ranks above this mean "not in the bucket".
+_NOT_RANKED = 2 ** 31 - 1
+
+
+def get_buckets(user):
+    """Map each inbox bucket to its condition and the columns partitioning it from the rest."""
+    return {
+        'received': (Q(recipient=user), ['recipient_id']),
+        'sent': (Q(requester=user), ['requester_id']),
+        'pending': (Q(recipient=user, status='pending'), ['recipient_id', 'status']),
+        'completed': (Q(status='completed'), ['status']),
+        'donations': (Q(trade_type='donation'), ['trade_type']),
+    }
+
+
+def count_trades(trades, user):
+    """Count ``trades`` per bucket, status and type in one aggregate query."""
+    aggregates = {'total': Count('pk')}
+    for name, (condition, _) in get_buckets(user).items():
+        aggregates[f'bucket_{name}'] = Count('pk', filter=condition)
+    for status, _ in Trade.STATUS_CHOICES:
+        aggregates[f'status_{status}'] = Count('pk', filter=Q(status=status))
+    for trade_type, _ in Trade.TRADE_TYPE_CHOICES:
+        aggregates[f'type_{trade_type}'] = Count('pk', filter=Q(trade_type=trade_type))
+    counts = trades.order_by().aggregate(**aggregates)
+
+    def group(prefix):
+        return {key[len(prefix):]: value for key, value in counts.items() if key.startswith(prefix)}
+
+    return counts['total'], group('bucket_'), group('status_'), group('type_')
+
+
+def recent_trade_ids(trades, user, limit=RECENT_PER_BUCKET):
+    """Return the ids of the newest ``limit`` trades of every bucket, in one query."""
+    buckets = get_buckets(user)
+    ranks = {
+        f'{name}_rank': Case(
+            When(condition, then=Window(
+                RowNumber(),
+                partition_by=[F(column) for column in columns],
+                order_by=[F('created_at').desc(), F('id').desc()],
+            )),
+            default=Value(_NOT_RANKED),
+        )
+        for name, (condition, columns) in buckets.items()
+    }
+    rows = trades.annotate(**ranks).annotate(
+        best_rank=Least(*(F(name) for name in ranks))
+    ).filter(best_rank__lte=limit).values_list('id', *ranks)
+
+    recent = {name: [] for name in buckets}
+    for trade_id, *bucket_ranks in rows:
+        for name, rank in zip(buckets, bucket_ranks):
+            if rank <= limit:
+                recent[name].append((rank, trade_id))
+    return {name: [trade_id for _, trade_id in sorted(ids)] for name, ids in recent.items()}
+
+
+def build_summary(user, request):
+    trades = Trade.objects.filter(Q(requester=user) | Q(recipient=user))
+    total, bucket_counts, status_counts, type_counts = count_trades(trades, user)
+    recent = recent_trade_ids(trades, user)
+
+    serialized = {}
+    ids = {trade_id for trade_ids in recent.values() for trade_id in trade_ids}
+    if ids:
+        serializer = FastTradeSerializer(request)
+        rows = serializer.prepare(Trade.objects.filter(pk__in=ids).order_by())
+        serialized = dict(zip((row.id for row in rows), serializer.serialize(rows)))
+
+    return {
+        'total': total,
+        'by_status': status_counts,
+        'by_type': type_counts,
+        'buckets': {
+            name: {'count': bucket_counts[name], 'recent': [serialized[trade_id] for trade_id in trade_ids]}
+            for name, trade_ids in recent.items()
+        },
+    }
+
+
+def _version_key(user_id):
+    return f'trades:summary:version:{user_id}'
+
+
+def get_summary(user, request):
+    """Return the user's summary, from the cache when nothing changed since it was built."""
+    version = cache.get(_version_key(user.pk))
+    if version is None:
+        cache.add(_version_key(user.pk), time.time_ns(), None)
+        version = cache.get(_version_key(user.pk))
+    # Serialized trades contain absolute URLs, so the host is part of the key.
+    host = hashlib.md5(request.build_absolute_uri('/').encode()).hexdigest()
+    key = f'trades:summary:{user.pk}:{version}:{host}'
+
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_summary(user, request)
+        cache.set(key, summary, CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate(user_ids):
+    """Drop the cached summaries of ``user_ids`` once the current transaction commits."""
+    keys = [_version_key(user_id) for user_id in set(user_ids)]
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from trades.models import Trade, TradeEvent
+
+User = get_user_model()
+
+
+class TradeAcceptTests(APITestCase):
+    def setUp(self):
+        self.requester = User.objects.create_user(username='requester', password='pw12345!')
+        self.recipient = User.objects.create_user(username='recipient', password='pw12345!')
+        self.requested = Book.objects.create(owner=self.recipient, title='Wanted', author='A')
+        self.trade = Trade.objects.create(
+            requester=self.requester, recipient=self.recipient, requested_book=self.requested,
+        )
+        self.client.force_authenticate(self.recipient)
+
+    def update(self, **data):
+        return self.client.patch(f'/api/trades/{self.trade.pk}/', data)
+
+    def accept(self, **data):
+        return self.update(status='accepted', **data)
+
+    def test_accept_is_the_only_write(self):
+        with mock.patch.object(Trade, 'save') as save:
+            response = self.accept(trade_type='donation')
+        self.assertEqual(response.status_code, 200)
+        save.assert_not_called()
+        self.trade.refresh_from_db()
+        self.assertEqual((self.trade.status, self.trade.trade_type), ('accepted', 'donation'))
+        self.assertEqual(TradeEvent.objects.filter(trade_id=self.trade.pk, kind='accepted').count(), 1)
+
+    def test_offering_back_a_book_in_the_trade(self):
+        # The requested book is reserved once, not counted twice.
+        response = self.accept(trade_type='swap', recipient_offered_book=self.requested.pk)
+        self.assertEqual(response.status_code, 200)
+        self.trade.refresh_from_db()
+        self.assertEqual(self.trade.status, 'accepted')
+        self.assertFalse(Book.objects.get(pk=self.requested.pk).is_available)
+
+    def test_reserved_book_conflicts(self):
+        Book.objects.filter(pk=self.requested.pk).update(is_available=False)
+        self.assertEqual(self.accept(trade_type='donation').status_code, 409)
+        self.trade.refresh_from_db()
+        self.assertEqual(self.trade.status, 'pending')
+
+    def test_other_status_changes_are_saved(self):
+        response = self.update(status='rejected')
+        self.assertEqual(response.status_code, 200)
+        self.trade.refresh_from_db()
+        self.assertEqual(self.trade.status, 'rejected')
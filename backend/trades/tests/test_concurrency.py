@@ -0,0 +1,170 @@
+import threading
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+
+from books.models import Book
+from trades.models import Trade, TradeConflict, TradeEvent
+
+User = get_user_model()
+
+
+def run_together(*calls):
+    """Run ``calls`` in their own threads, released at the same moment; return their results."""
+    barrier = threading.Barrier(len(calls))
+    results = [None] * len(calls)
+
+    def run(index, call):
+        try:
+            barrier.wait()
+            results[index] = call()
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def retrying(pk, change):
+    """
+    Call ``change`` on a fresh copy of trade ``pk`` like a client retrying
+    409s would, until it goes through (True) or the trade has moved on so
+    the view would turn it down (False).
+    """
+    for _ in range(50):
+        try:
+            trade = Trade.objects.get(pk=pk)
+        except OperationalError:
+            # The shared in-memory test database fails plain reads of a
+            # table another connection is writing instead of waiting.
+            continue
+        try:
+            return change(trade)
+        except TradeConflict:
+            continue
+    raise AssertionError(f'Trade {pk} kept conflicting')
+
+
+class ConcurrentAcceptTests(TransactionTestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='pw12345!')
+        self.bob = User.objects.create_user(username='bob', password='pw12345!')
+        self.alices_book = Book.objects.create(owner=self.alice, title='Alice', author='A')
+        self.bobs_book = Book.objects.create(owner=self.bob, title='Bob', author='B')
+        # Each trade involves both books, so each competes with the other.
+        self.for_alice = Trade.objects.create(
+            requester=self.bob, recipient=self.alice,
+            requested_book=self.alices_book, offered_book=self.bobs_book,
+        )
+        self.for_bob = Trade.objects.create(
+            requester=self.alice, recipient=self.bob,
+            requested_book=self.bobs_book, offered_book=self.alices_book,
+        )
+
+    def accept(self, trade):
+        if trade.status != 'pending':
+            return False
+        trade.accept(trade_type='donation')
+        return True
+
+    def test_competing_trades_accepted_at_once(self):
+        results = run_together(
+            lambda: retrying(self.for_alice.pk, self.accept),
+            lambda: retrying(self.for_bob.pk, self.accept),
+        )
+        # The winner's accept rejects the other trade.
+        self.assertEqual(sorted(results), [False, True])
+
+        statuses = sorted(Trade.objects.values_list('status', flat=True))
+        self.assertEqual(statuses, ['accepted', 'rejected'])
+        self.assertEqual(Book.objects.filter(is_available=True).count(), 0)
+        self.assertEqual(TradeEvent.objects.filter(kind='accepted').count(), 1)
+        self.assertEqual(TradeEvent.objects.filter(kind='rejected').count(), 1)
+
+
+@skipUnless(connection.vendor == 'postgresql', "select_for_update only blocks on a database with row locks")
+class RowLockedAcceptTests(TransactionTestCase):
+    """
+    Many trades for one book accepted at once, each tried exactly once:
+    without retries, the row locks alone must let exactly one through.
+    """
+    competitors = 8
+
+    def setUp(self):
+        self.recipient = User.objects.create_user(username='recipient', password='pw12345!')
+        self.book = Book.objects.create(owner=self.recipient, title='Wanted', author='A')
+        self.trades = []
+        for i in range(self.competitors):
+            requester = User.objects.create_user(username=f'requester{i}', password='pw12345!')
+            offered = Book.objects.create(owner=requester, title=f'Offered {i}', author='B')
+            self.trades.append(Trade.objects.create(
+                requester=requester, recipient=self.recipient,
+                requested_book=self.book, offered_book=offered,
+            ))
+
+    def accept(self, trade):
+        def call():
+            try:
+                trade.accept(trade_type='swap')
+            except TradeConflict:
+                return False
+            return True
+        return call
+
+    def test_exactly_one_accept_wins(self):
+        results = run_together(*[self.accept(trade) for trade in self.trades])
+        self.assertEqual(results.count(True), 1)
+
+        winner = self.trades[results.index(True)]
+        statuses = dict(Trade.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses.pop(winner.pk), 'accepted')
+        self.assertEqual(set(statuses.values()), {'rejected'})
+
+        unavailable = Book.objects.filter(is_available=False).values_list('pk', flat=True)
+        self.assertEqual(sorted(unavailable), sorted([self.book.pk, winner.offered_book_id]))
+        self.assertEqual(TradeEvent.objects.filter(kind='accepted').count(), 1)
+        self.assertEqual(TradeEvent.objects.filter(kind='rejected').count(), self.competitors - 1)
+
+
+class ConcurrentConfirmTests(TransactionTestCase):
+    def setUp(self):
+        self.requester = User.objects.create_user(username='requester', password='pw12345!')
+        self.recipient = User.objects.create_user(username='recipient', password='pw12345!')
+        self.requested = Book.objects.create(owner=self.recipient, title='Requested', author='A', is_available=False)
+        self.offered = Book.objects.create(owner=self.requester, title='Offered', author='B', is_available=False)
+        self.trade = Trade.objects.create(
+            requester=self.requester, recipient=self.recipient,
+            requested_book=self.requested, offered_book=self.offered,
+            trade_type='swap', status='accepted',
+        )
+
+    def confirm(self, user):
+        def change(trade):
+            trade.confirm(user)
+            return True
+        return retrying(self.trade.pk, change)
+
+    def test_both_parties_confirm_at_once(self):
+        results = run_together(lambda: self.confirm(self.requester), lambda: self.confirm(self.recipient))
+        self.assertEqual(results, [True, True])
+
+        self.trade.refresh_from_db()
+        self.assertEqual(self.trade.status, 'completed')
+        self.assertTrue(self.trade.requester_confirmed and self.trade.recipient_confirmed)
+        self.assertEqual(TradeEvent.objects.filter(trade_id=self.trade.pk, kind='completed').count(), 1)
+
+        self.requested.refresh_from_db()
+        self.offered.refresh_from_db()
+        self.assertEqual(self.requested.owner, self.requester)
+        self.assertEqual(self.offered.owner, self.recipient)
+        self.assertTrue(self.requested.is_available and self.offered.is_available)
+
+        for user in (self.requester, self.recipient):
+            user.refresh_from_db()
+            self.assertEqual(user.successful_trades_count, 1)
@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from trades.models import Trade, TradeConflict, TradeEvent
+
+User = get_user_model()
+
+
+class TradeConfirmationTests(APITestCase):
+    def setUp(self):
+        self.requester = User.objects.create_user(username='requester', password='pw12345!')
+        self.recipient = User.objects.create_user(username='recipient', password='pw12345!')
+        book = Book.objects.create(owner=self.recipient, title='Wanted', author='A', is_available=False)
+        self.trade = Trade.objects.create(
+            requester=self.requester, recipient=self.recipient, requested_book=book,
+            trade_type='donation', status='accepted',
+        )
+        self.client.force_authenticate(self.recipient)
+
+    def confirm(self):
+        return self.client.post(f'/api/trades/{self.trade.pk}/confirm_trade/', {'confirm_received': True})
+
+    def confirmations(self):
+        return TradeEvent.objects.filter(trade_id=self.trade.pk, kind='confirmed').count()
+
+    def test_confirm_completes_accepted_trade(self):
+        response = self.confirm()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertEqual(self.confirmations(), 1)
+
+    def test_completed_trade_cannot_be_confirmed_again(self):
+        self.assertEqual(self.confirm().status_code, 200)
+        self.assertEqual(self.confirm().status_code, 400)
+        self.assertEqual(self.confirmations(), 1)
+        self.recipient.refresh_from_db()
+        self.assertEqual(self.recipient.successful_trades_count, 1)
+
+    def test_pending_trade_cannot_be_confirmed(self):
+        Trade.objects.filter(pk=self.trade.pk).update(status='pending')
+        self.assertEqual(self.confirm().status_code, 400)
+        self.assertEqual(self.confirmations(), 0)
+
+    def test_confirm_rechecks_status_under_lock(self):
+        # The trade completed between validation and the update.
+        Trade.objects.filter(pk=self.trade.pk).update(status='completed')
+        with self.assertRaises(TradeConflict):
+            self.trade.confirm(self.recipient)
+        self.assertEqual(self.confirmations(), 0)
@@ -0,0 +1,116 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from trades import events
+from trades.models import Trade, TradeEvent, TradeEventCursor
+
+User = get_user_model()
+
+
+def event(trade, xid, kind='accepted'):
+    return TradeEvent.objects.create(
+        xid=xid, kind=kind, trade_id=trade.pk, requester_id=trade.requester_id,
+        recipient_id=trade.recipient_id, status=trade.status,
+    )
+
+
+class TradeEventLogTests(APITestCase):
+    def setUp(self):
+        self.requester = User.objects.create_user(username='requester', password='pw12345!')
+        self.recipient = User.objects.create_user(username='recipient', password='pw12345!')
+        book = Book.objects.create(owner=self.recipient, title='Wanted', author='A')
+        self.trade = Trade.objects.create(requester=self.requester, recipient=self.recipient, requested_book=book)
+        TradeEvent.objects.all().delete()
+
+    def test_recorded_events_carry_the_transaction_id(self):
+        TradeEvent.record([self.trade], 'accepted')
+        # SQLite has no transaction ids; its ids are in commit order already.
+        self.assertEqual(list(TradeEvent.objects.values_list('xid', flat=True)), [0])
+
+    def test_consume_advances_the_cursor(self):
+        first = TradeEvent.record([self.trade], 'accepted')[0]
+        seen = []
+        self.assertEqual(events.consume('test', seen.extend), 1)
+        self.assertEqual(events.consume('test', seen.extend), 0)
+        TradeEvent.record([self.trade], 'confirmed')
+        self.assertEqual(events.consume('test', seen.extend), 1)
+        self.assertEqual([e.kind for e in seen], ['accepted', 'confirmed'])
+        self.assertEqual(seen[0].pk, first.pk)
+        cursor = TradeEventCursor.objects.get(name='test')
+        self.assertEqual((cursor.last_xid, cursor.last_event_id), (0, seen[-1].pk))
+
+    def test_failing_handler_gets_the_batch_again(self):
+        TradeEvent.record([self.trade], 'accepted')
+
+        def fail(batch):
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            events.consume('test', fail)
+        seen = []
+        self.assertEqual(events.consume('test', seen.extend), 1)
+
+    def test_events_of_slow_transactions_are_not_skipped(self):
+        # Transaction 8 commits while 7 is still running.
+        fast = event(self.trade, xid=8)
+        seen = []
+        with mock.patch('bookswap.commitorder.horizon', return_value=7):
+            self.assertEqual(events.consume('test', seen.extend), 0)
+        # 7 logs an event with a higher id, then commits.
+        slow = event(self.trade, xid=7, kind='confirmed')
+        with mock.patch('bookswap.commitorder.horizon', return_value=9):
+            self.assertEqual(events.consume('test', seen.extend), 2)
+        self.assertEqual([e.pk for e in seen], [slow.pk, fast.pk])
+
+    def test_read_batch_stops_at_the_horizon(self):
+        committed, running = event(self.trade, xid=3), event(self.trade, xid=5)
+        with mock.patch('bookswap.commitorder.horizon', return_value=5):
+            self.assertEqual([e.pk for e in events.read_batch()], [committed.pk])
+            self.assertEqual(events.read_batch(after=(3, committed.pk)), [])
+        with mock.patch('bookswap.commitorder.horizon', return_value=6):
+            self.assertEqual([e.pk for e in events.read_batch(after=(3, committed.pk))], [running.pk])
+
+
+class TradeEventEndpointTests(APITestCase):
+    def setUp(self):
+        self.requester = User.objects.create_user(username='requester', password='pw12345!')
+        self.recipient = User.objects.create_user(username='recipient', password='pw12345!')
+        self.other = User.objects.create_user(username='other', password='pw12345!')
+        book = Book.objects.create(owner=self.recipient, title='Wanted', author='A')
+        self.trade = Trade.objects.create(requester=self.requester, recipient=self.recipient, requested_book=book)
+        self.client.force_authenticate(self.requester)
+
+    def test_next_link_returns_newer_events(self):
+        response = self.client.get('/api/trades/events/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e['kind'] for e in response.data['results']], ['created'])
+        self.assertIsNone(response.data['previous'])
+
+        # Caught up: the link is polled for events that have not happened yet.
+        following = self.client.get(response.data['next'])
+        self.assertEqual(following.data['results'], [])
+        self.assertEqual(following.data['next'], response.data['next'])
+
+        TradeEvent.record([self.trade], 'accepted')
+        newer = self.client.get(response.data['next'])
+        self.assertEqual([e['kind'] for e in newer.data['results']], ['accepted'])
+
+    def test_previous_link_returns_older_events(self):
+        TradeEvent.record([self.trade], 'accepted')
+        TradeEvent.record([self.trade], 'confirmed')
+        latest = self.client.get('/api/trades/events/', {'page_size': 2})
+        self.assertEqual([e['kind'] for e in latest.data['results']], ['accepted', 'confirmed'])
+        older = self.client.get(latest.data['previous'])
+        self.assertEqual([e['kind'] for e in older.data['results']], ['created'])
+        self.assertIsNone(older.data['previous'])
+
+    def test_only_own_events_are_listed(self):
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get('/api/trades/events/').data['results'], [])
+
+    def test_invalid_position_is_not_found(self):
+        self.assertEqual(self.client.get('/api/trades/events/', {'after': 'x'}).status_code, 404)
+        self.assertEqual(self.client.get('/api/trades/events/', {'after': '1.-2'}).status_code, 404)
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from bookswap.models import SyncChange
+from trades import expiry
+from trades.models import Trade, TradeEvent
+
+User = get_user_model()
+
+
+class TradeExpiryTests(APITestCase):
+    def setUp(self):
+        self.requester = User.objects.create_user(username='requester', password='pw12345!')
+        self.recipient = User.objects.create_user(username='recipient', password='pw12345!')
+        self.old = [self.trade(days=40) for _ in range(3)]
+        self.recent = self.trade(days=1)
+        self.answered = self.trade(days=40, status='accepted')
+        TradeEvent.objects.all().delete()
+        SyncChange.objects.all().delete()
+
+    def trade(self, days, status='pending'):
+        book = Book.objects.create(owner=self.recipient, title='Wanted', author='A')
+        trade = Trade.objects.create(
+            requester=self.requester, recipient=self.recipient, requested_book=book, status=status,
+        )
+        Trade.objects.filter(pk=trade.pk).update(created_at=timezone.now() - timedelta(days=days))
+        return trade
+
+    def statuses(self):
+        return dict(Trade.objects.values_list('pk', 'status'))
+
+    def logged(self):
+        return (
+            sorted(TradeEvent.objects.filter(kind='expired').values_list('trade_id', flat=True)),
+            sorted(SyncChange.objects.filter(kind='trade').values_list('object_id', flat=True)),
+        )
+
+    def test_expires_old_pending_trades_only(self):
+        stats = expiry.expire_pending_trades(batch_size=2)
+        self.assertEqual((stats['expired'], stats['batches']), (3, 2))
+        statuses = self.statuses()
+        self.assertEqual({statuses[trade.pk] for trade in self.old}, {'expired'})
+        self.assertEqual(statuses[self.recent.pk], 'pending')
+        self.assertEqual(statuses[self.answered.pk], 'accepted')
+        expired = sorted(trade.pk for trade in self.old)
+        self.assertEqual(self.logged(), (expired, expired))
+
+    def test_trades_answered_after_selection_are_left_alone(self):
+        old = self.old[0]
+        selected = [old.pk, self.answered.pk]
+        with mock.patch('trades.expiry.pending_before', return_value=selected), \
+                mock.patch('trades.models.realtime.publish_trade') as publish:
+            self.assertEqual(expiry.expire_batch(timezone.now()), (2, 1))
+        self.assertEqual(self.statuses()[self.answered.pk], 'accepted')
+        self.assertEqual(self.logged(), ([old.pk], [old.pk]))
+        self.assertEqual([call.args[0].pk for call in publish.call_args_list], [old.pk])
+
+    def test_batch_expiring_nothing_does_not_stop_the_run(self):
+        real = expiry.pending_before
+        calls = iter([[self.answered.pk]])
+
+        def pending_before(cutoff, limit):
+            return next(calls, None) or real(cutoff, limit)
+
+        with mock.patch('trades.expiry.pending_before', side_effect=pending_before):
+            stats = expiry.expire_pending_trades(batch_size=1)
+        self.assertEqual((stats['expired'], stats['batches']), (3, 4))
+        self.assertEqual({self.statuses()[trade.pk] for trade in self.old}, {'expired'})
+
+    def test_max_batches(self):
+        stats = expiry.expire_pending_trades(batch_size=1, max_batches=2)
+        self.assertEqual(stats['expired'], 2)
+        self.assertEqual(list(self.statuses().values()).count('pending'), 2)
+
+    def test_command(self):
+        call_command('expire_trades', stdout=mock.Mock())
+        self.assertEqual(list(self.statuses().values()).count('expired'), 3)
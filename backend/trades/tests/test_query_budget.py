@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from trades.models import Trade, TradeMessage, TradeReadState
+
+User = get_user_model()
+
+PAGE_SIZES = (5, 20)
+
+
+class TradeQueryBudgetTests(APITestCase):
+    """Query counts of every read endpoint stay flat whatever the page size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pw12345!')
+        cls.other = User.objects.create_user(username='partner', password='pw12345!')
+        for i in range(25):
+            mine = Book.objects.create(owner=cls.user, title=f'Mine {i}', author='Reader')
+            theirs = Book.objects.create(owner=cls.other, title=f'Theirs {i}', author='Partner')
+            sent = i % 2 == 0
+            trade = Trade.objects.create(
+                requester=cls.user if sent else cls.other,
+                recipient=cls.other if sent else cls.user,
+                requested_book=theirs if sent else mine,
+                offered_book=mine if sent else theirs,
+                trade_type='donation' if i % 3 == 0 else 'swap',
+                status='completed' if i % 4 == 0 else 'pending',
+            )
+            for _ in range(25):
+                TradeMessage.objects.create(trade=trade, sender=cls.other, message='Still interested?')
+        cls.trade = trade
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def assertBudget(self, url, queries):
+        for page_size in PAGE_SIZES:
+            with self.subTest(url=url, page_size=page_size):
+                # Measure a cache miss on an unread trade.
+                cache.clear()
+                TradeReadState.objects.all().delete()
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url, {'page_size': page_size})
+                self.assertEqual(response.status_code, 200)
+
+    def test_list(self):
+        self.assertBudget('/api/trades/', 2)
+
+    def test_retrieve(self):
+        self.assertBudget(f'/api/trades/{self.trade.pk}/', 2)
+
+    def test_list_actions(self):
+        for name in ('sent_trades', 'received_trades', 'pending_trades', 'completed_trades', 'donations'):
+            self.assertBudget(f'/api/trades/{name}/', 2)
+
+    def test_messages(self):
+        self.assertBudget(f'/api/trades/{self.trade.pk}/messages/', 8)
+
+    def test_summary(self):
+        self.assertBudget('/api/trades/summary/', 4)
+
+    def test_unread(self):
+        self.assertBudget('/api/trades/unread/', 1)
+
+    def test_events(self):
+        self.assertBudget('/api/trades/events/', 1)
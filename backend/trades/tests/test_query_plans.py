@@ -0,0 +1,68 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from bookswap.testing import query_plans
+from trades.models import Trade, TradeMessage
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plans are checked on SQLite')
+class TradeQueryPlanTests(APITestCase):
+    """The hot trade and message list queries are answered from indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pw12345!')
+        cls.other = User.objects.create_user(username='partner', password='pw12345!')
+        for i in range(10):
+            sent = i % 2 == 0
+            book = Book.objects.create(owner=cls.other if sent else cls.user, title=f'Book {i}', author='Author')
+            cls.trade = Trade.objects.create(
+                requester=cls.user if sent else cls.other,
+                recipient=cls.other if sent else cls.user,
+                requested_book=book,
+            )
+            TradeMessage.objects.create(trade=cls.trade, sender=cls.other, message='Hello')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def plan(self, url, table='trades'):
+        plans = query_plans(self.client, url, table)
+        self.assertEqual(len(plans), 1, plans)
+        return ' | '.join(plans[0])
+
+    def test_sent(self):
+        plan = self.plan('/api/trades/sent_trades/')
+        self.assertIn('trades USING INDEX trades_requester_recent_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_received(self):
+        plan = self.plan('/api/trades/received_trades/')
+        self.assertIn('trades USING INDEX trades_recipient_recent_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_pending(self):
+        plan = self.plan('/api/trades/pending_trades/')
+        self.assertIn('trades USING INDEX trades_recipient_pending_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_requester_or_recipient(self):
+        # Both sides of the OR are index searches, never a scan of trades.
+        for url, kind in (('/api/trades/', r'\w+'), ('/api/trades/completed_trades/', 'status')):
+            with self.subTest(url=url):
+                plan = self.plan(url)
+                self.assertIn('MULTI-INDEX OR', plan)
+                self.assertRegex(plan, rf'SEARCH trades USING INDEX trades_requester_{kind}_idx \(requester_id=\?')
+                self.assertRegex(plan, rf'SEARCH trades USING INDEX trades_recipient_{kind}_idx \(recipient_id=\?')
+                self.assertNotIn('SCAN trades', plan)
+
+    def test_messages(self):
+        plan = self.plan(f'/api/trades/{self.trade.pk}/messages/', table='trade_messages')
+        self.assertRegex(plan, r'SEARCH trade_messages USING INDEX \w+ \(trade_id=\?')
+        self.assertNotIn('TEMP B-TREE', plan)
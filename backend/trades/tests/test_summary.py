@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from trades import expiry
+from trades.models import Trade, TradeMessage
+
+User = get_user_model()
+
+
+class TradeSummaryCacheTests(APITestCase):
+    """Summaries are served from the cache until a trade of the user is written."""
+
+    def setUp(self):
+        cache.clear()
+        self.requester = User.objects.create_user(username='requester', password='pw12345!')
+        self.recipient = User.objects.create_user(username='recipient', password='pw12345!')
+        self.outsider = User.objects.create_user(username='outsider', password='pw12345!')
+        self.book = Book.objects.create(owner=self.recipient, title='Wanted', author='A')
+        self.trade = Trade.objects.create(requester=self.requester, recipient=self.recipient, requested_book=self.book)
+
+    def summary(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/trades/summary/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def assertCached(self, user):
+        self.client.force_authenticate(user)
+        with self.assertNumQueries(0):
+            self.client.get('/api/trades/summary/')
+
+    def write(self):
+        """Run a write and its on-commit invalidation."""
+        return self.captureOnCommitCallbacks(execute=True)
+
+    def test_repeated_reads_are_cached(self):
+        self.assertEqual(self.summary(self.recipient)['buckets']['pending']['count'], 1)
+        self.assertCached(self.recipient)
+
+    def test_new_trade(self):
+        self.summary(self.recipient)
+        self.summary(self.outsider)
+        other = Book.objects.create(owner=self.recipient, title='Other', author='B')
+        with self.write():
+            Trade.objects.create(requester=self.requester, recipient=self.recipient, requested_book=other)
+        self.assertEqual(self.summary(self.recipient)['total'], 2)
+        self.assertCached(self.outsider)
+
+    def test_accept_updates_both_parties_and_competitors(self):
+        third = User.objects.create_user(username='third', password='pw12345!')
+        competing = Trade.objects.create(requester=third, recipient=self.recipient, requested_book=self.book)
+        for user in (self.requester, self.recipient, third):
+            self.summary(user)
+        with self.write():
+            self.trade.accept(trade_type='donation')
+        self.assertEqual(self.summary(self.requester)['by_status']['accepted'], 1)
+        self.assertEqual(self.summary(self.recipient)['by_status']['rejected'], 1)
+        self.assertEqual(self.summary(third)['buckets']['sent']['recent'][0]['id'], competing.pk)
+        self.assertEqual(self.summary(third)['by_status']['rejected'], 1)
+
+    def test_status_change_by_save(self):
+        self.summary(self.requester)
+        with self.write():
+            self.trade.status = 'cancelled'
+            self.trade.save()
+        self.assertEqual(self.summary(self.requester)['by_status']['cancelled'], 1)
+
+    def test_expiry(self):
+        self.summary(self.requester)
+        Trade.objects.filter(pk=self.trade.pk).update(created_at=timezone.now() - timedelta(days=365))
+        with self.write():
+            expiry.expire_pending_trades()
+        self.assertEqual(self.summary(self.requester)['by_status']['expired'], 1)
+
+    def test_message(self):
+        self.summary(self.recipient)
+        with self.write():
+            TradeMessage.objects.create(trade=self.trade, sender=self.requester, message='Hello')
+        recent = self.summary(self.recipient)['buckets']['received']['recent'][0]
+        self.assertEqual(recent['last_message']['message'], 'Hello')
+
+    def test_delete(self):
+        self.summary(self.recipient)
+        with self.write():
+            self.trade.delete()
+        self.assertEqual(self.summary(self.recipient)['total'], 0)
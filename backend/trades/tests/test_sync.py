@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from trades.models import Trade
+
+User = get_user_model()
+
+
+class TradeDeltaSyncTests(APITestCase):
+    """Trades are resent when a book or profile nested in them changes."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='pw12345!')
+        self.other = User.objects.create_user(username='partner', password='pw12345!')
+        self.book = Book.objects.create(owner=self.other, title='Wanted', author='A')
+        self.trade = Trade.objects.create(requester=self.user, recipient=self.other, requested_book=self.book)
+        self.client.force_authenticate(self.user)
+        self.token = self.client.get('/api/trades/', {'since': ''}).data['since']
+
+    def sync(self):
+        response = self.client.get('/api/trades/', {'since': self.token})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def synced_ids(self):
+        return [trade['id'] for trade in self.sync()['results']]
+
+    def test_nothing_changed(self):
+        self.assertEqual(self.synced_ids(), [])
+
+    def test_book_change_resends_trade(self):
+        stamped = Trade.objects.get(pk=self.trade.pk).updated_at
+        self.book.title = 'Renamed'
+        self.book.save()
+        self.assertEqual(self.synced_ids(), [self.trade.pk])
+        self.assertEqual(Trade.objects.get(pk=self.trade.pk).updated_at, stamped)
+
+    def test_profile_change_resends_trade(self):
+        self.other.bio = 'Collector'
+        self.other.save()
+        self.assertEqual(self.synced_ids(), [self.trade.pk])
+
+    def test_book_owner_profile_change_resends_trade(self):
+        third = User.objects.create_user(username='third', password='pw12345!')
+        offered = Book.objects.create(owner=third, title='Offered', author='B')
+        Trade.objects.filter(pk=self.trade.pk).update(offered_book=offered)
+        third.bio = 'Reader'
+        third.save()
+        self.assertEqual(self.synced_ids(), [self.trade.pk])
+
+    def test_login_does_not_resend_trade(self):
+        self.other.last_login = timezone.now()
+        self.other.save()
+        self.assertEqual(self.synced_ids(), [])
+
+    def test_accept_resends_trade(self):
+        self.trade.accept(trade_type='donation')
+        data = self.sync()
+        self.assertEqual([(trade['id'], trade['status']) for trade in data['results']], [(self.trade.pk, 'accepted')])
+
+    def test_deletion_reaches_both_parties_only(self):
+        pk = self.trade.pk
+        self.trade.delete()
+        self.assertEqual(self.sync()['deleted'], [pk])
+        outsider = User.objects.create_user(username='outsider', password='pw12345!')
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get('/api/trades/', {'since': self.token}).data['deleted'], [])
+
+    def test_other_users_trades_are_not_sent(self):
+        outsider = User.objects.create_user(username='outsider', password='pw12345!')
+        theirs = Book.objects.create(owner=outsider, title='Theirs', author='C')
+        Trade.objects.create(requester=self.other, recipient=outsider, requested_book=theirs)
+        self.assertEqual(self.synced_ids(), [])
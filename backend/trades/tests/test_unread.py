@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from trades import unread
+from trades.models import Trade, TradeMessage, TradeReadState
+
+User = get_user_model()
+
+
+class UnreadCountTests(APITestCase):
+    def setUp(self):
+        self.requester = User.objects.create_user(username='requester', password='pw12345!')
+        self.recipient = User.objects.create_user(username='recipient', password='pw12345!')
+        self.trade = self.new_trade()
+
+    def new_trade(self):
+        book = Book.objects.create(owner=self.recipient, title='Wanted', author='A')
+        return Trade.objects.create(requester=self.requester, recipient=self.recipient, requested_book=book)
+
+    def send(self, sender, text='Hi', trade=None):
+        self.client.force_authenticate(sender)
+        response = self.client.post(f'/api/trades/{(trade or self.trade).pk}/send_message/', {'message': text})
+        self.assertEqual(response.status_code, 201, response.data)
+        return TradeMessage.objects.latest('id').pk
+
+    def unread(self, user):
+        self.client.force_authenticate(user)
+        return self.client.get('/api/trades/unread/').data
+
+    def read(self, user, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get(f'/api/trades/{self.trade.pk}/messages/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_messages_count_for_the_other_participant(self):
+        self.send(self.requester)
+        self.send(self.requester)
+        self.send(self.recipient)
+        other = self.new_trade()
+        self.send(self.requester, trade=other)
+        self.assertEqual(self.unread(self.recipient), {'total': 3, 'trades': {self.trade.pk: 2, other.pk: 1}})
+        self.assertEqual(self.unread(self.requester), {'total': 1, 'trades': {self.trade.pk: 1}})
+
+    def test_fetching_messages_marks_them_read(self):
+        self.send(self.requester)
+        self.send(self.requester)
+        self.read(self.recipient)
+        self.assertEqual(self.unread(self.recipient), {'total': 0, 'trades': {}})
+        # The reader's own messages do not count.
+        self.send(self.recipient)
+        self.assertEqual(self.unread(self.recipient)['total'], 0)
+        self.send(self.requester)
+        self.assertEqual(self.unread(self.recipient)['total'], 1)
+
+    def test_reading_a_page_counts_what_is_after_it(self):
+        ids = [self.send(self.requester, f'Message {i}') for i in range(5)]
+        page = self.read(self.recipient, after_id=0, page_size=2)
+        self.assertEqual([message['id'] for message in page['results']], ids[:2])
+        self.assertEqual(self.unread(self.recipient)['total'], 3)
+
+        # Older pages do not move the cursor back.
+        self.read(self.recipient, after_id=ids[2])
+        self.read(self.recipient, before_id=ids[1])
+        self.assertEqual(self.unread(self.recipient)['total'], 0)
+        state = TradeReadState.objects.get(trade=self.trade, user=self.recipient)
+        self.assertEqual(state.last_read_message_id, ids[-1])
+
+    def test_mark_read_without_a_state_row(self):
+        first = TradeMessage.objects.create(trade=self.trade, sender=self.requester, message='One')
+        TradeMessage.objects.create(trade=self.trade, sender=self.requester, message='Two')
+        unread.mark_read(self.trade, self.recipient, first.pk)
+        self.assertEqual(unread.unread_counts(self.recipient), (1, {self.trade.pk: 1}))
+
+    def test_outsiders_cannot_read(self):
+        self.send(self.requester)
+        outsider = User.objects.create_user(username='outsider', password='pw12345!')
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(f'/api/trades/{self.trade.pk}/messages/').status_code, 404)
+        self.assertEqual(self.unread(self.recipient)['total'], 1)
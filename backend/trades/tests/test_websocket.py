@@ -0,0 +1,98 @@
+import json
+import threading
+import time
+import urllib.request
+
+import uvicorn
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from websockets.exceptions import ConnectionClosed
+from websockets.sync.client import connect
+
+from books.models import Book
+from bookswap.asgi import application
+from trades.consumers import UNAUTHORIZED
+from trades.models import Trade
+
+User = get_user_model()
+
+
+def websocket_scope(path, token=''):
+    return {'type': 'websocket', 'path': path, 'query_string': f'token={token}'.encode(), 'headers': []}
+
+
+class TradeEventsRoutingTests(TestCase):
+    """WebSocket connections through ``bookswap.asgi.application``."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='requester', password='pw12345!')
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def open(self, path, token):
+        communicator = ApplicationCommunicator(application, websocket_scope(path, token))
+        await communicator.send_input({'type': 'websocket.connect'})
+        return communicator
+
+    async def test_authenticated_connection_is_accepted(self):
+        communicator = await self.open('/ws/trades/', self.token)
+        self.assertEqual(await communicator.receive_output(5), {'type': 'websocket.accept'})
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(5)
+
+    async def test_invalid_token_is_closed_with_4401(self):
+        communicator = await self.open('/ws/trades/', 'invalid')
+        self.assertEqual(await communicator.receive_output(5), {'type': 'websocket.accept'})
+        self.assertEqual(await communicator.receive_output(5), {'type': 'websocket.close', 'code': UNAUTHORIZED})
+
+    async def test_unknown_path_is_closed(self):
+        communicator = await self.open('/ws/elsewhere/', self.token)
+        self.assertEqual(await communicator.receive_output(5), {'type': 'websocket.close'})
+
+
+class LiveServerTradeEventsTests(TransactionTestCase):
+    """The API and ``/ws/trades/`` served together by uvicorn, as deployed."""
+
+    def setUp(self):
+        self.requester = User.objects.create_user(username='requester', password='pw12345!')
+        self.recipient = User.objects.create_user(username='recipient', password='pw12345!')
+        self.book = Book.objects.create(owner=self.recipient, title='Wanted', author='A')
+        self.token = str(AccessToken.for_user(self.recipient))
+
+        config = uvicorn.Config(application, host='127.0.0.1', port=0, loop='asyncio', lifespan='off', log_level='warning')
+        self.server = uvicorn.Server(config)
+        thread = threading.Thread(target=self.server.run, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(setattr, self.server, 'should_exit', True)
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            self.assertLess(time.monotonic(), deadline, "uvicorn did not start")
+            time.sleep(0.01)
+        self.port = self.server.servers[0].sockets[0].getsockname()[1]
+
+    def url(self, scheme, path):
+        return f'{scheme}://127.0.0.1:{self.port}{path}'
+
+    def test_trade_changes_are_pushed(self):
+        with connect(self.url('ws', f'/ws/trades/?token={self.token}'), open_timeout=5) as socket:
+            trade = Trade.objects.create(requester=self.requester, recipient=self.recipient, requested_book=self.book)
+            event = json.loads(socket.recv(timeout=5))
+        self.assertEqual(event['type'], 'trade.updated')
+        self.assertEqual((event['trade']['id'], event['trade']['status']), (trade.pk, 'pending'))
+
+    def test_invalid_token_is_closed_with_4401(self):
+        with connect(self.url('ws', '/ws/trades/?token=invalid'), open_timeout=5) as socket:
+            with self.assertRaises(ConnectionClosed) as closed:
+                socket.recv(timeout=5)
+        self.assertEqual(closed.exception.rcvd.code, UNAUTHORIZED)
+
+    def test_api_is_served_alongside(self):
+        request = urllib.request.Request(
+            self.url('http', '/api/trades/summary/'),
+            headers={'Host': 'localhost', 'Authorization': f'Bearer {self.token}'},
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            self.assertEqual(response.status, 200)
+            self.assertIn('buckets', json.loads(response.read()))
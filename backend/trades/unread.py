@@ -0,0 +1,62 @@
+"""
+Incrementally maintained unread message counters.
+
+Each participant's ``TradeReadState`` row is bumped in the transaction that
+creates a message for them and recounted when they fetch the messages, so a
+user's unread total is read from the rows of trades with unread messages
+instead of counting ``trade_messages``.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import TradeMessage, TradeReadState
+
+
+def message_created(message, trade):
+    """Count ``message`` as unread for the participant who did not send it."""
+    recipient_id = trade.recipient_id if message.sender_id == trade.requester_id else trade.requester_id
+    states = TradeReadState.objects.filter(trade=trade, user_id=recipient_id)
+    if states.update(unread_count=F('unread_count') + 1):
+        return
+    try:
+        with transaction.atomic():
+            TradeReadState.objects.create(trade=trade, user_id=recipient_id, unread_count=1)
+    except IntegrityError:
+        # Created concurrently by another request.
+        states.update(unread_count=F('unread_count') + 1)
+
+
+def mark_read(trade, user, message_id):
+    """
+    Move ``user``'s read cursor forward to ``message_id`` and recount the
+    messages from the other participant after it. Moving backwards (reading
+    older pages) changes nothing.
+    """
+    later = TradeMessage.objects.filter(trade=trade, id__gt=message_id).exclude(sender=user).order_by()
+    remaining = Coalesce(Subquery(later.values('trade').annotate(count=Count('pk')).values('count')), 0)
+    states = TradeReadState.objects.filter(trade=trade, user=user)
+    if states.filter(last_read_message_id__lt=message_id).update(
+        last_read_message_id=message_id, unread_count=remaining,
+    ):
+        return
+    if states.exists():
+        return
+    try:
+        with transaction.atomic():
+            TradeReadState.objects.create(
+                trade=trade, user=user, last_read_message_id=message_id, unread_count=later.count(),
+            )
+    except IntegrityError:
+        # Created concurrently by another request.
+        states.filter(last_read_message_id__lt=message_id).update(
+            last_read_message_id=message_id, unread_count=remaining,
+        )
+
+
+def unread_counts(user):
+    """Return ``(total, {trade_id: count})`` over the trades with unread messages."""
+    counts = dict(
+        TradeReadState.objects.filter(user=user, unread_count__gt=0).values_list('trade_id', 'unread_count')
+    )
+    return sum(counts.values()), counts
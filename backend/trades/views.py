@@ -3,16 +3,25 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Trade, TradeMessage
+from bookswap.conditional import ConditionalGetMixin
+from bookswap.models import SyncChange
+from bookswap.pagination import CommitOrderPagination, IdRangePagination
+from bookswap.serializers import customized, is_referenced
+from bookswap.sync import DeltaSyncMixin
+from users.serializers import UserProfileSerializer
+from . import summary as inbox_summary, unread as read_states
+from .fast_serializers import FastTradeSerializer
+from .models import Trade, TradeEvent, TradeMessage
 from .serializers import (
     TradeSerializer, TradeCreateSerializer, TradeUpdateSerializer,
     TradeAcceptanceSerializer, TradeConfirmationSerializer,
-    TradeMessageCreateSerializer, TradeMessageSerializer
+    TradeEventSerializer, TradeMessageCreateSerializer, TradeMessageSerializer
 )
 from django.db import models
+from django.db.models import Prefetch
 
 
-class TradeViewSet(viewsets.ModelViewSet):
+class TradeViewSet(DeltaSyncMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Trade model."""
     queryset = Trade.objects.all()
     permission_classes = [IsAuthenticated]
@@ -20,6 +29,25 @@ class TradeViewSet(viewsets.ModelViewSet):
     filterset_fields = ['status', 'requester', 'recipient', 'trade_type']
     ordering_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
+    # New messages bump the trade's ``updated_at``.
+    conditional_timestamp_fields = [
+        'updated_at', 'requester__updated_at', 'recipient__updated_at',
+        'requested_book__updated_at', 'offered_book__updated_at',
+        'recipient_offered_book__updated_at',
+    ]
+    message_pagination_class = IdRangePagination
+    event_pagination_class = CommitOrderPagination
+
+    # Actions that render full TradeSerializer output and therefore need
+    # every nested user, book and message loaded up front.
+    serialized_actions = [
+        'list', 'retrieve', 'sent_trades', 'received_trades',
+        'pending_trades', 'completed_trades', 'donations',
+    ]
+    fast_list_actions = [
+        'list', 'sent_trades', 'received_trades',
+        'pending_trades', 'completed_trades', 'donations',
+    ]
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -35,29 +63,78 @@ class TradeViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter trades to show only user's trades."""
         user = self.request.user
-        return Trade.objects.filter(
+        queryset = Trade.objects.filter(
             models.Q(requester=user) | models.Q(recipient=user)
         )
+        if self.action in self.serialized_actions:
+            queryset = queryset.select_related(
+                'requester', 'recipient',
+                'requested_book__owner', 'offered_book__owner', 'recipient_offered_book__owner',
+            ).with_message_summary().prefetch_related(
+                Prefetch(
+                    'messages',
+                    queryset=TradeMessage.objects.select_related('sender').order_by('-id')[:1],
+                    to_attr='recent_messages',
+                )
+            )
+        return queryset
+
+    def get_sync_changes(self):
+        user = self.request.user
+        return SyncChange.objects.filter(
+            models.Q(kind='trade') & (models.Q(requester_id=user.pk) | models.Q(recipient_id=user.pk))
+            | models.Q(kind__in=['book', 'user'])
+        )
+
+    def get_nesting_rows(self, kind, object_ids):
+        # Trade responses nest both parties' profiles and the books, with
+        # their owners' profiles.
+        if kind == 'book':
+            fields = ['requested_book', 'offered_book', 'recipient_offered_book']
+        elif kind == 'user':
+            fields = [
+                'requester', 'recipient', 'requested_book__owner',
+                'offered_book__owner', 'recipient_offered_book__owner',
+            ]
+        else:
+            return ()
+        condition = models.Q()
+        for field in fields:
+            condition |= models.Q(**{f'{field}__in': object_ids})
+        user = self.request.user
+        trades = Trade.objects.filter(models.Q(requester=user) | models.Q(recipient=user))
+        rows = trades.filter(condition).values_list('pk', *fields)
+        return [(object_id, row[0]) for row in rows for object_id in row[1:] if object_id in object_ids]
+
+    def get_fast_list_serializer(self):
+        if self.action in self.fast_list_actions and not customized(self.request):
+            return FastTradeSerializer(self.request)
+        return None
+
+    def get_included(self, trades):
+        """Side-load every user that compact responses reference by id."""
+        request = self.request
+        users = {}
+        for trade in trades:
+            for field in ('requester', 'recipient'):
+                if is_referenced(request, field):
+                    users[getattr(trade, f'{field}_id')] = getattr(trade, field)
+            for field in ('requested_book', 'offered_book', 'recipient_offered_book'):
+                if is_referenced(request, field):
+                    book = getattr(trade, field)
+                    if book is not None:
+                        users[book.owner_id] = book.owner
+            if is_referenced(request, 'last_message') and trade.last_message is not None:
+                users[trade.last_message.sender_id] = trade.last_message.sender
+        if not users:
+            return {}
+        serializer = UserProfileSerializer(users.values(), many=True, context=self.get_serializer_context())
+        return {'users': serializer.data}
 
     def perform_create(self, serializer):
         """Set the requester to the current user when creating a trade."""
         serializer.save(requester=self.request.user)
 
-    def perform_update(self, serializer):
-        """Handle trade status updates."""
-        trade = self.get_object()
-        new_status = serializer.validated_data.get('status')
-        
-        if new_status == 'accepted':
-            # Mark books as unavailable
-            trade.requested_book.is_available = False
-            trade.requested_book.save()
-            if trade.offered_book:
-                trade.offered_book.is_available = False
-                trade.offered_book.save()
-        
-        serializer.save()
-
     @action(detail=True, methods=['post'])
     def accept_trade(self, request, pk=None):
         """Accept a trade with offered book or donation."""
@@ -86,11 +163,29 @@ class TradeViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'])
     def messages(self, request, pk=None):
-        """Get messages for a specific trade."""
+        """Get one page of a trade's messages, see ``IdRangePagination``."""
         trade = self.get_object()
-        messages = trade.messages.all()
+        paginator = self.message_pagination_class()
+        messages = paginator.paginate_queryset(trade.messages.select_related('sender'), request, self)
+        if messages:
+            read_states.mark_read(trade, request.user, messages[-1].id)
         serializer = TradeMessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def events(self, request):
+        """Get one page of the log of the user's trade changes; ``next`` links to newer events."""
+        user = request.user
+        log = TradeEvent.objects.filter(models.Q(requester_id=user.pk) | models.Q(recipient_id=user.pk))
+        paginator = self.event_pagination_class()
+        events = paginator.paginate_queryset(log, request, self)
+        return paginator.get_paginated_response(TradeEventSerializer(events, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def unread(self, request):
+        """Get the user's unread message total and the count per trade."""
+        total, per_trade = read_states.unread_counts(request.user)
+        return Response({'total': total, 'trades': per_trade})
 
     @action(detail=True, methods=['post'])
     def send_message(self, request, pk=None):
@@ -106,19 +201,22 @@ class TradeViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Get trade counts and the newest trades of every inbox bucket."""
+        return Response(inbox_summary.get_summary(request.user, request))
+
     @action(detail=False, methods=['get'])
     def sent_trades(self, request):
         """Get trades sent by current user."""
         trades = self.get_queryset().filter(requester=request.user)
-        serializer = self.get_serializer(trades, many=True)
-        return Response(serializer.data)
+        return self.list_response(trades)
 
     @action(detail=False, methods=['get'])
     def received_trades(self, request):
         """Get trades received by current user."""
         trades = self.get_queryset().filter(recipient=request.user)
-        serializer = self.get_serializer(trades, many=True)
-        return Response(serializer.data)
+        return self.list_response(trades)
 
     @action(detail=False, methods=['get'])
     def pending_trades(self, request):
@@ -127,8 +225,7 @@ class TradeViewSet(viewsets.ModelViewSet):
             recipient=request.user,
             status='pending'
         )
-        serializer = self.get_serializer(trades, many=True)
-        return Response(serializer.data)
+        return self.list_response(trades)
 
     @action(detail=False, methods=['get'])
     def completed_trades(self, request):
@@ -137,8 +234,7 @@ class TradeViewSet(viewsets.ModelViewSet):
             models.Q(requester=request.user) | models.Q(recipient=request.user),
             status='completed'
         )
-        serializer = self.get_serializer(trades, many=True)
-        return Response(serializer.data)
+        return self.list_response(trades)
 
     @action(detail=False, methods=['get'])
     def donations(self, request):
@@ -147,5 +243,4 @@ class TradeViewSet(viewsets.ModelViewSet):
             models.Q(requester=request.user) | models.Q(recipient=request.user),
             trade_type='donation'
         )
-        serializer = self.get_serializer(trades, many=True)
-        return Response(serializer.data) 
\ No newline at end of file
+        return self.list_response(trades)
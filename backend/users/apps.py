@@ -3,4 +3,9 @@ from django.apps import AppConfig
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'users' 
\ No newline at end of file
+    name = 'users'
+
+    def ready(self):
+        from mediastore.references import track
+
+        track(self.get_model('User'), 'avatar', 'avatar_variants')
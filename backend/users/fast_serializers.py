@@ -0,0 +1,37 @@
+from bookswap.fastpath import datetime_formatter, file_url_formatter, variants_url_formatter
+from .models import User
+
+PROFILE_COLUMNS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'bio', 'location',
+    'avatar', 'avatar_variants', 'successful_trades_count', 'created_at',
+)
+
+
+def compile_profile(columns, prefix, request):
+    """Compile a row builder equivalent to ``UserProfileSerializer``."""
+    (
+        i_id, i_username, i_email, i_first_name, i_last_name, i_bio, i_location,
+        i_avatar, i_avatar_variants, i_trades, i_created_at,
+    ) = columns.add(*(prefix + name for name in PROFILE_COLUMNS))
+    avatar_url = file_url_formatter(User, 'avatar', request)
+    avatar_variant_urls = variants_url_formatter(User, 'avatar', request)
+    format_datetime = datetime_formatter()
+    reliability_for = User.reliability_for
+
+    def build(row):
+        return {
+            'id': row[i_id],
+            'username': row[i_username],
+            'email': row[i_email],
+            'first_name': row[i_first_name],
+            'last_name': row[i_last_name],
+            'bio': row[i_bio],
+            'location': row[i_location],
+            'avatar': avatar_url(row[i_avatar]),
+            'avatar_variants': avatar_variant_urls(row[i_avatar_variants]),
+            'successful_trades_count': row[i_trades],
+            'reliability_score': reliability_for(row[i_trades]),
+            'created_at': format_datetime(row[i_created_at]),
+        }
+
+    return build
@@ -7,6 +7,8 @@ class User(AbstractUser):
     bio = models.TextField(max_length=500, blank=True)
     location = models.CharField(max_length=100, blank=True)
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    # Resized copies of ``avatar``, filled in by ``bookswap.images``.
+    avatar_variants = models.JSONField(default=dict, blank=True)
     successful_trades_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -20,11 +22,16 @@ class User(AbstractUser):
     @property
     def reliability_score(self):
         """Calculate reliability score based on successful trades."""
-        if self.successful_trades_count == 0:
+        return self.reliability_for(self.successful_trades_count)
+
+    @staticmethod
+    def reliability_for(successful_trades_count):
+        """Reliability label for a given number of successful trades."""
+        if successful_trades_count == 0:
             return "New User"
-        elif self.successful_trades_count < 5:
+        elif successful_trades_count < 5:
             return "Reliable"
-        elif self.successful_trades_count < 10:
+        elif successful_trades_count < 10:
             return "Very Reliable"
         else:
             return "Highly Reliable" 
\ No newline at end of file
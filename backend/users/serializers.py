@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from bookswap.images import ProcessedImagesMixin, variant_urls
 from .models import User
 
 
@@ -52,15 +53,21 @@ class UserLoginSerializer(serializers.Serializer):
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile."""
     reliability_score = serializers.ReadOnlyField()
+    avatar_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'bio', 'location', 'avatar', 'successful_trades_count', 'reliability_score', 'created_at')
+        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'bio', 'location', 'avatar', 'avatar_variants', 'successful_trades_count', 'reliability_score', 'created_at')
         read_only_fields = ('id', 'created_at', 'successful_trades_count', 'reliability_score')
 
+    def get_avatar_variants(self, obj):
+        return variant_urls(obj.avatar_variants, obj.avatar.storage, self.context.get('request'))
 
-class UserUpdateSerializer(serializers.ModelSerializer):
+
+class UserUpdateSerializer(ProcessedImagesMixin, serializers.ModelSerializer):
     """Serializer for updating user profile."""
+    processed_image_fields = {'avatar': 'avatar_variants'}
+
     class Meta:
         model = User
         fields = ('first_name', 'last_name', 'bio', 'location', 'avatar') 
\ No newline at end of file
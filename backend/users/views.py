@@ -4,6 +4,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from bookswap.conditional import build_validators, not_modified, set_validators
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -50,8 +51,12 @@ def login(request):
 @permission_classes([IsAuthenticated])
 def profile(request):
     """Get current user profile."""
+    etag, last_modified = build_validators(request, request.user.updated_at)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
     serializer = UserProfileSerializer(request.user)
-    return Response(serializer.data)
+    return set_validators(Response(serializer.data), etag, last_modified)
 
 
 @api_view(['PUT', 'PATCH'])
@@ -40,10 +40,23 @@ const BookCard = ({ book }) => {
       <div className="flex flex-col h-full">
         {/* Book Cover */}
         <div className="aspect-w-3 aspect-h-4 mb-4">
-          {book.cover_image ? (
+          {book.cover_variants?.card ? (
+            <picture>
+              <source srcSet={book.cover_variants.card.webp} type="image/webp" />
+              <img
+                src={book.cover_variants.card.jpeg}
+                alt={`Cover of ${book.title}`}
+                width={book.cover_variants.card.width}
+                height={book.cover_variants.card.height}
+                loading="lazy"
+                className="w-full h-48 object-cover rounded-lg"
+              />
+            </picture>
+          ) : book.cover_image ? (
             <img
               src={book.cover_image}
               alt={`Cover of ${book.title}`}
+              loading="lazy"
               className="w-full h-48 object-cover rounded-lg"
             />
           ) : (
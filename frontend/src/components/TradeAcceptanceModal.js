@@ -9,7 +9,7 @@ const TradeAcceptanceModal = ({ isOpen, onClose, trade, onSuccess }) => {
 
   const { data: myBooks, isLoading } = useQuery(
     ['my-available-books'],
-    () => booksAPI.getMyBooks().then(books => books.filter(book => book.is_available)),
+    () => booksAPI.getMyBooks({ available: 'true' }),
     {
       enabled: isOpen,
     }
@@ -20,6 +20,7 @@ const TradeAcceptanceModal = ({ isOpen, onClose, trade, onSuccess }) => {
     {
       onSuccess: () => {
         queryClient.invalidateQueries(['trades']);
+        queryClient.invalidateQueries(['trade-summary']);
         onSuccess();
         onClose();
       },
@@ -12,6 +12,7 @@ const TradeCard = ({ trade, onAccept, onReject, onConfirm, onCancel }) => {
       accepted: 'bg-green-100 text-green-800',
       rejected: 'bg-red-100 text-red-800',
       cancelled: 'bg-gray-100 text-gray-800',
+      expired: 'bg-gray-100 text-gray-500',
       completed: 'bg-blue-100 text-blue-800',
     };
 
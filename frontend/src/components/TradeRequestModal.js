@@ -12,7 +12,7 @@ const TradeRequestModal = ({ isOpen, onClose, book, onSuccess }) => {
 
   const { data: myBooks, isLoading } = useQuery(
     ['my-available-books'],
-    () => booksAPI.getMyBooks().then(books => books.filter(book => book.is_available))
+    () => booksAPI.getMyBooks({ available: 'true' })
   );
 
   const createTradeMutation = useMutation(
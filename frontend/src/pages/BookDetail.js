@@ -93,7 +93,16 @@ const BookDetail = () => {
         <div className="grid grid-cols-1 lg:grid-cols-3 gap-6">
           {/* Cover Image */}
           <div className="lg:col-span-1">
-            {book.cover_image ? (
+            {book.cover_variants?.detail ? (
+              <picture>
+                <source srcSet={book.cover_variants.detail.webp} type="image/webp" />
+                <img
+                  src={book.cover_variants.detail.jpeg}
+                  alt={book.title}
+                  className="w-full h-64 object-cover rounded-lg shadow-md"
+                />
+              </picture>
+            ) : book.cover_image ? (
               <img
                 src={book.cover_image}
                 alt={book.title}
@@ -23,7 +23,17 @@ const Home = () => {
   );
 
   const handleFilterChange = (newFilters) => {
-    setFilters(prev => ({ ...prev, ...newFilters }));
+    // Any filter change starts again from the first page.
+    setFilters(({ cursor, page, ...prev }) => ({ ...prev, ...newFilters }));
+  };
+
+  const goToPage = (url) => {
+    const params = new URL(url).searchParams;
+    setFilters(prev => ({
+      ...prev,
+      cursor: params.get('cursor') || undefined,
+      page: params.get('page') || undefined,
+    }));
   };
 
   if (isLoading) {
@@ -78,23 +88,20 @@ const Home = () => {
       </div>
 
       {/* Pagination */}
-      {books?.count > 20 && (
+      {(books?.next || books?.previous) && (
         <div className="mt-8 flex justify-center">
           <nav className="flex items-center space-x-2">
             {books.previous && (
               <button
-                onClick={() => setFilters(prev => ({ ...prev, page: books.previous.split('page=')[1] }))}
+                onClick={() => goToPage(books.previous)}
                 className="px-3 py-2 text-sm font-medium text-gray-500 bg-white border border-gray-300 rounded-md hover:bg-gray-50"
               >
                 Previous
               </button>
             )}
-            <span className="px-3 py-2 text-sm text-gray-700">
-              Page {Math.floor(books.count / 20) + 1} of {Math.ceil(books.count / 20)}
-            </span>
             {books.next && (
               <button
-                onClick={() => setFilters(prev => ({ ...prev, page: books.next.split('page=')[1] }))}
+                onClick={() => goToPage(books.next)}
                 className="px-3 py-2 text-sm font-medium text-gray-500 bg-white border border-gray-300 rounded-md hover:bg-gray-50"
               >
                 Next
@@ -1,40 +1,81 @@
-import React, { useState } from 'react';
-import { useQuery, useMutation, useQueryClient } from 'react-query';
+import React, { useEffect, useState } from 'react';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from 'react-query';
 import { tradesAPI } from '../services/api';
 import TradeCard from '../components/TradeCard';
 import TradeAcceptanceModal from '../components/TradeAcceptanceModal';
 
+// One trade feed, a page at a time; `trades` holds every page loaded so far.
+const useTradeFeed = (key, fetchPage, enabled) => {
+  const query = useInfiniteQuery(
+    [key],
+    ({ pageParam }) => fetchPage(pageParam),
+    { enabled, getNextPageParam: (lastPage) => lastPage.next || undefined }
+  );
+  return { ...query, trades: query.data?.pages.flatMap(page => page.results) };
+};
+
 const Trades = () => {
   const [activeTab, setActiveTab] = useState('received');
   const [selectedTrade, setSelectedTrade] = useState(null);
   const [showAcceptanceModal, setShowAcceptanceModal] = useState(false);
   const queryClient = useQueryClient();
 
-  const { data: receivedTrades, isLoading: loadingReceived } = useQuery(
-    ['received-trades'],
-    () => tradesAPI.getReceivedTrades()
+  // Tab counts come from the summary; only the open tab's list is fetched.
+  const { data: summary, isLoading: loadingSummary } = useQuery(
+    ['trade-summary'],
+    () => tradesAPI.getSummary()
   );
 
-  const { data: sentTrades, isLoading: loadingSent } = useQuery(
-    ['sent-trades'],
-    () => tradesAPI.getSentTrades()
-  );
+  const receivedFeed = useTradeFeed('received-trades', tradesAPI.getReceivedTrades, activeTab === 'received');
+  const { trades: receivedTrades, isLoading: loadingReceived } = receivedFeed;
 
-  const { data: completedTrades, isLoading: loadingCompleted } = useQuery(
-    ['completed-trades'],
-    () => tradesAPI.getCompletedTrades()
-  );
+  const sentFeed = useTradeFeed('sent-trades', tradesAPI.getSentTrades, activeTab === 'sent');
+  const { trades: sentTrades, isLoading: loadingSent } = sentFeed;
 
-  const { data: donations, isLoading: loadingDonations } = useQuery(
-    ['donations'],
-    () => tradesAPI.getDonations()
-  );
+  const completedFeed = useTradeFeed('completed-trades', tradesAPI.getCompletedTrades, activeTab === 'completed');
+  const { trades: completedTrades, isLoading: loadingCompleted } = completedFeed;
+
+  const donationsFeed = useTradeFeed('donations', tradesAPI.getDonations, activeTab === 'donations');
+  const { trades: donations, isLoading: loadingDonations } = donationsFeed;
+
+  const activeFeed = { received: receivedFeed, sent: sentFeed, completed: completedFeed, donations: donationsFeed }[activeTab];
+
+  const countFor = (bucket) => summary?.buckets[bucket]?.count || 0;
+
+  // Live updates: refetch the lists and counts whenever one of the user's
+  // trades changes, reconnecting with backoff if the socket drops.
+  useEffect(() => {
+    let socket;
+    let retry;
+    let delay = 1000;
+    let stopped = false;
+    const connect = () => {
+      socket = tradesAPI.subscribe(() => {
+        ['received-trades', 'sent-trades', 'completed-trades', 'donations', 'trade-summary']
+          .forEach(key => queryClient.invalidateQueries([key]));
+      });
+      socket.onopen = () => { delay = 1000; };
+      socket.onclose = (event) => {
+        // 4401: the token expired; the next API call sends the user to log in.
+        if (stopped || event.code === 4401) return;
+        retry = setTimeout(connect, delay);
+        delay = Math.min(delay * 2, 30000);
+      };
+    };
+    connect();
+    return () => {
+      stopped = true;
+      clearTimeout(retry);
+      socket.close();
+    };
+  }, [queryClient]);
 
   const rejectTradeMutation = useMutation(
     (tradeId) => tradesAPI.update(tradeId, { status: 'rejected' }),
     {
       onSuccess: () => {
         queryClient.invalidateQueries(['received-trades']);
+        queryClient.invalidateQueries(['trade-summary']);
       },
     }
   );
@@ -44,6 +85,7 @@ const Trades = () => {
     {
       onSuccess: () => {
         queryClient.invalidateQueries(['sent-trades']);
+        queryClient.invalidateQueries(['trade-summary']);
       },
     }
   );
@@ -55,6 +97,7 @@ const Trades = () => {
         queryClient.invalidateQueries(['received-trades']);
         queryClient.invalidateQueries(['sent-trades']);
         queryClient.invalidateQueries(['completed-trades']);
+        queryClient.invalidateQueries(['trade-summary']);
       },
     }
   );
@@ -102,7 +145,7 @@ const Trades = () => {
     }
   };
 
-  const isLoading = loadingReceived || loadingSent || loadingCompleted || loadingDonations;
+  const isLoading = loadingSummary || loadingReceived || loadingSent || loadingCompleted || loadingDonations;
 
   if (isLoading) {
     return (
@@ -132,7 +175,7 @@ const Trades = () => {
                 : 'border-transparent text-gray-500 hover:text-gray-700 hover:border-gray-300'
             }`}
           >
-            Received ({receivedTrades?.length || 0})
+            Received ({countFor('received')})
           </button>
           <button
             onClick={() => setActiveTab('sent')}
@@ -142,7 +185,7 @@ const Trades = () => {
                 : 'border-transparent text-gray-500 hover:text-gray-700 hover:border-gray-300'
             }`}
           >
-            Sent ({sentTrades?.length || 0})
+            Sent ({countFor('sent')})
           </button>
           <button
             onClick={() => setActiveTab('completed')}
@@ -152,7 +195,7 @@ const Trades = () => {
                 : 'border-transparent text-gray-500 hover:text-gray-700 hover:border-gray-300'
             }`}
           >
-            Completed ({completedTrades?.length || 0})
+            Completed ({countFor('completed')})
           </button>
           <button
             onClick={() => setActiveTab('donations')}
@@ -162,7 +205,7 @@ const Trades = () => {
                 : 'border-transparent text-gray-500 hover:text-gray-700 hover:border-gray-300'
             }`}
           >
-            Donations ({donations?.length || 0})
+            Donations ({countFor('donations')})
           </button>
         </nav>
       </div>
@@ -296,6 +339,18 @@ const Trades = () => {
             )}
           </div>
         )}
+
+        {activeFeed.hasNextPage && (
+          <div className="text-center mt-6">
+            <button
+              onClick={() => activeFeed.fetchNextPage()}
+              className="btn btn-secondary"
+              disabled={activeFeed.isFetchingNextPage}
+            >
+              {activeFeed.isFetchingNextPage ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Acceptance Modal */}
@@ -57,6 +57,17 @@ export const authAPI = {
   updateProfile: (profileData) => api.patch('/auth/profile/update/', profileData).then(res => res.data),
 };
 
+// Follows `next` links to the last page; for views that need every row (pickers, own collection)
+const getAllPages = async (url, params = {}) => {
+  let page = (await api.get(url, { params: { page_size: 100, ...params } })).data;
+  const results = [...page.results];
+  while (page.next) {
+    page = (await api.get(page.next)).data;
+    results.push(...page.results);
+  }
+  return results;
+};
+
 // Books API
 export const booksAPI = {
   getAll: (params = {}) => api.get('/books/', { params }).then(res => res.data),
@@ -69,8 +80,12 @@ export const booksAPI = {
   },
   delete: (id) => api.delete(`/books/${id}/`).then(res => res.data),
   deleteImage: (id) => api.delete(`/books/${id}/delete_image/`).then(res => res.data),
-  getMyBooks: () => api.get('/books/my_books/').then(res => res.data),
-  getAvailableBooks: () => api.get('/books/available_books/').then(res => res.data),
+  getMyBooks: (params = {}) => getAllPages('/books/my_books/', params),
+  getAvailableBooks: (params = {}) => getAllPages('/books/available_books/', params),
+  autocomplete: (q) => api.get('/books/autocomplete/', { params: { q } }).then(res => res.data.results),
+  getFacets: (params = {}) => api.get('/books/facets/', { params }).then(res => res.data),
+  // Changes since `since` (empty string for everything): { results, deleted, since, has_more }.
+  sync: (since = '') => api.get('/books/', { params: { since } }).then(res => res.data),
 };
 
 // Trades API
@@ -80,17 +95,59 @@ export const tradesAPI = {
   create: (tradeData) => api.post('/trades/', tradeData).then(res => res.data),
   update: (id, tradeData) => api.patch(`/trades/${id}/`, tradeData).then(res => res.data),
   delete: (id) => api.delete(`/trades/${id}/`).then(res => res.data),
-  getSentTrades: () => api.get('/trades/sent_trades/').then(res => res.data),
-  getReceivedTrades: () => api.get('/trades/received_trades/').then(res => res.data),
-  getPendingTrades: () => api.get('/trades/pending_trades/').then(res => res.data),
-  getCompletedTrades: () => api.get('/trades/completed_trades/').then(res => res.data),
-  getDonations: () => api.get('/trades/donations/').then(res => res.data),
+  // Trade feeds return one page ({ results, next }); pass `next` to get the following one
+  getSentTrades: (page) => api.get(page || '/trades/sent_trades/').then(res => res.data),
+  getReceivedTrades: (page) => api.get(page || '/trades/received_trades/').then(res => res.data),
+  getPendingTrades: (page) => api.get(page || '/trades/pending_trades/').then(res => res.data),
+  getCompletedTrades: (page) => api.get(page || '/trades/completed_trades/').then(res => res.data),
+  getDonations: (page) => api.get(page || '/trades/donations/').then(res => res.data),
+  getSummary: () => api.get('/trades/summary/').then(res => res.data),
+  getUnread: () => api.get('/trades/unread/').then(res => res.data),
+  sync: (since = '') => api.get('/trades/', { params: { since } }).then(res => res.data),
   
   // New enhanced trade methods
   acceptTrade: (id, acceptanceData) => api.post(`/trades/${id}/accept_trade/`, acceptanceData).then(res => res.data),
   confirmTrade: (id, confirmationData) => api.post(`/trades/${id}/confirm_trade/`, confirmationData).then(res => res.data),
-  getMessages: (id) => api.get(`/trades/${id}/messages/`).then(res => res.data),
+  getMessages: (id, params = {}) => api.get(`/trades/${id}/messages/`, { params }).then(res => res.data),
   sendMessage: (id, messageData) => api.post(`/trades/${id}/send_message/`, messageData).then(res => res.data),
+
+  // Live trade events ('trade.message', 'trade.updated'); returns the socket so callers can close it
+  subscribe: (onEvent) => {
+    const url = new URL('../ws/trades/', API_BASE_URL.replace(/\/?$/, '/'));
+    url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:';
+    url.searchParams.set('token', localStorage.getItem('token') || '');
+    const socket = new WebSocket(url);
+    socket.onmessage = (event) => onEvent(JSON.parse(event.data));
+    return socket;
+  },
+};
+
+const UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024;
+
+// Resumable uploads: resolves to the upload id to send as `cover_upload`
+export const uploadsAPI = {
+  upload: async (file, onProgress) => {
+    const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+    const sha256 = Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+    const session = (await api.post('/uploads/', { filename: file.name, size: file.size, sha256 })).data;
+    let offset = session.received;
+    while (offset < file.size) {
+      try {
+        const chunk = file.slice(offset, offset + UPLOAD_CHUNK_SIZE);
+        const res = await api.put(`/uploads/${session.id}/`, chunk, {
+          headers: { 'Content-Type': 'application/octet-stream', 'Upload-Offset': String(offset) },
+        });
+        offset = res.data.received;
+      } catch (error) {
+        if (!error.response || error.response.status !== 409) throw error;
+        // Part of a chunk may have arrived; continue from what the server holds
+        offset = (await api.get(`/uploads/${session.id}/`)).data.received;
+      }
+      if (onProgress) onProgress(offset / file.size);
+    }
+    await api.post(`/uploads/${session.id}/complete/`);
+    return session.id;
+  },
 };
 
 export default api; 
\ No newline at end of file